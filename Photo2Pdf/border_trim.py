@@ -0,0 +1,194 @@
+"""
+自动裁剪纯色边框
+移植自 Remove BlackWhite Borders Web/script.js 的 findBorderPixelLimits 和比例对齐，
+用于批量转换前的预处理（在转换进程池的工作进程中执行）
+
+- 边框像素: 每个通道与边框颜色之差都不超过容差
+- 内容区域: 所有非边框像素的外接矩形（与网页版逐行逐列扫描的结果相同）
+- auto模式先检测白色边框，未裁剪掉任何内容时再检测黑色边框
+- 内容区域的宽高比与常用比例相差不到5%时，可按该比例居中收缩
+
+使用NumPy向量化计算；未安装NumPy时使用Pillow的ImageChops，结果相同
+"""
+
+from PIL import Image, ImageChops
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+# 边框颜色预设，auto表示先白后黑
+BORDER_COLORS = {
+    'white': WHITE,
+    'black': BLACK
+}
+
+# 常用宽高比及名称，与网页版相同
+COMMON_RATIOS = [
+    ('16:9', 16 / 9),
+    ('9:16', 9 / 16),
+    ('4:3', 4 / 3),
+    ('3:4', 3 / 4),
+    ('1:1', 1 / 1),
+    ('3:2', 3 / 2),
+    ('2:3', 2 / 3)
+]
+
+# 匹配宽高比的相对容差
+ASPECT_RATIO_TOLERANCE = 0.05
+
+
+def parse_border_color(value):
+    """
+    解析边框颜色配置
+    
+    Args:
+        value (str): auto / white / black，或逗号分隔的 R, G, B
+    
+    Returns:
+        颜色元组，auto时返回None
+    """
+    value = str(value).strip().lower()
+    if value in ('', 'auto'):
+        return None
+    if value in BORDER_COLORS:
+        return BORDER_COLORS[value]
+    color = tuple(int(part) for part in value.split(','))
+    if len(color) != 3 or not all(0 <= part <= 255 for part in color):
+        raise ValueError(f"无效的边框颜色: {value}")
+    return color
+
+
+def _content_box_numpy(image, color, tolerance):
+    pixels = np.asarray(image)
+    height, width = pixels.shape[:2]
+    values = [_gray_level(color)] if pixels.ndim == 2 else list(color)
+    
+    # 展平为 高 x (宽*通道数) 的二维数组，上下界按通道平铺成一行，
+    # 按行、按列归约都在连续内存上进行，比沿长度为3的通道维归约快一个数量级
+    rows_view = pixels.reshape(height, -1)
+    lower = np.tile(np.array([max(0, v - tolerance) for v in values], dtype=np.uint8), width)
+    upper = np.tile(np.array([min(255, v + tolerance) for v in values], dtype=np.uint8), width)
+    content = (rows_view < lower) | (rows_view > upper)
+    
+    rows = np.flatnonzero(content.any(axis=1))
+    if rows.size == 0:
+        return None
+    columns = content[rows[0]:rows[-1] + 1].any(axis=0).reshape(width, len(values)).any(axis=1)
+    columns = np.flatnonzero(columns)
+    return int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1
+
+
+def _content_box_pillow(image, color, tolerance):
+    fill = _gray_level(color) if image.mode == 'L' else color
+    difference = ImageChops.difference(image, Image.new(image.mode, image.size, fill))
+    table = [255 if value > tolerance else 0 for value in range(256)] * len(image.getbands())
+    return difference.point(table).getbbox()
+
+
+def _gray_level(color):
+    """RGB颜色对应的灰度值（与Pillow的L模式转换公式一致）"""
+    red, green, blue = color
+    return (red * 299 + green * 587 + blue * 114) // 1000
+
+
+def find_border_limits(image, color, tolerance=10):
+    """
+    检测指定颜色边框内的内容区域
+    
+    Args:
+        image (PIL.Image.Image): L或RGB模式的图像
+        color (tuple): 边框颜色 (R, G, B)
+        tolerance (int): 每个通道允许的差值 (0-255)
+    
+    Returns:
+        tuple: 内容区域 (左, 上, 右, 下)，右和下不包含；整张图像都是边框时返回None
+    """
+    if np is not None:
+        return _content_box_numpy(image, color, tolerance)
+    return _content_box_pillow(image, color, tolerance)
+
+
+def find_content_box(image, border_color=None, tolerance=10):
+    """
+    检测内容区域，border_color为None时先检测白色边框，未裁剪掉任何内容时再检测黑色边框
+    
+    Returns:
+        tuple: 内容区域 (左, 上, 右, 下)，没有有效内容时返回None
+    """
+    if border_color is not None:
+        return find_border_limits(image, border_color, tolerance)
+    
+    full = (0, 0) + image.size
+    box = find_border_limits(image, WHITE, tolerance)
+    if box is not None and box != full:
+        return box
+    return find_border_limits(image, BLACK, tolerance)
+
+
+def closest_aspect_ratio(width, height):
+    """
+    查找与内容宽高比相差不到5%的最接近的常用比例
+    
+    Returns:
+        tuple: (名称, 比例值)，没有匹配时返回None
+    """
+    if width <= 0 or height <= 0:
+        return None
+    current = width / height
+    best = None
+    best_difference = float('inf')
+    for name, value in COMMON_RATIOS:
+        difference = abs(current - value)
+        if difference / value < ASPECT_RATIO_TOLERANCE and difference < best_difference:
+            best = (name, value)
+            best_difference = difference
+    return best
+
+
+def snap_to_aspect_ratio(box, ratio):
+    """在内容区域内按指定比例居中收缩（网页版的performStrictRatioCrop）"""
+    left, top, right, bottom = box
+    width = right - left
+    height = bottom - top
+    new_width = width
+    new_height = width / ratio
+    if new_height > height:
+        new_height = height
+        new_width = height * ratio
+    
+    new_left = round(left + (width - new_width) / 2)
+    new_top = round(top + (height - new_height) / 2)
+    return new_left, new_top, new_left + round(new_width), new_top + round(new_height)
+
+
+def trim_borders(image, border_color=None, tolerance=10, snap_aspect_ratio=False):
+    """
+    裁剪图像的纯色边框
+    
+    Args:
+        image (PIL.Image.Image): L或RGB模式的图像
+        border_color (tuple): 边框颜色，None表示自动（先白后黑）
+        tolerance (int): 每个通道允许的差值 (0-255)
+        snap_aspect_ratio (bool): 内容区域接近常用比例时是否按该比例收缩
+    
+    Returns:
+        tuple: (裁剪后的图像, 内容区域)；没有边框或没有有效内容时返回原图像和None
+    """
+    box = find_content_box(image, border_color, tolerance)
+    if box is None:
+        return image, None
+    
+    if snap_aspect_ratio:
+        match = closest_aspect_ratio(box[2] - box[0], box[3] - box[1])
+        if match is not None:
+            box = snap_to_aspect_ratio(box, match[1])
+    
+    if box == (0, 0) + image.size:
+        return image, None
+    return image.crop(box), box
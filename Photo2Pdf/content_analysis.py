@@ -0,0 +1,97 @@
+"""
+图像内容分析
+按像素统计为每页选择编码方式，使用NumPy向量化计算
+
+- 黑白文档扫描: 1位黑白，CCITT G4（不可用时为1位Flate）
+- 截图、图表等平涂图像: Flate无损压缩
+- 照片: JPEG
+- 无彩色的图像按灰度编码，数据量为RGB的三分之一
+
+NumPy为可选依赖，未安装时所有图像按照片处理（与未启用内容分析时相同）
+"""
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 内容类型
+CONTENT_PHOTO = 'photo'
+CONTENT_FLAT = 'flat'
+CONTENT_BILEVEL = 'bilevel'
+
+# 通道间最大差值不超过此值的像素视为无彩色（容忍扫描仪和JPEG的色偏）
+GRAY_TOLERANCE = 16
+
+# 有彩色像素的比例低于此值时按灰度编码
+COLOR_PIXEL_RATIO = 0.001
+
+# 灰度值落在两端（<=64或>=192）的像素比例达到此值、且以白色为主时视为黑白文档
+BILEVEL_RATIO = 0.97
+
+# 与左侧相邻像素完全相同的比例达到此值时视为平涂图像（照片的传感器噪声使该比例接近0）
+FLAT_RATIO = 0.5
+
+# 黑白二值化的阈值
+BILEVEL_THRESHOLD = 128
+
+# 分析时最多抽样的行数，大图像只统计等间隔的部分行
+SAMPLE_ROWS = 512
+
+
+def _sample_rows(image):
+    """等间隔抽取图像的部分行，返回uint8数组（L模式为二维，RGB模式为三维）"""
+    if image.height > SAMPLE_ROWS:
+        # 最近邻缩放只在垂直方向取样，像素值和每行内的相邻关系保持不变
+        image = image.resize((image.width, SAMPLE_ROWS), Image.NEAREST)
+    return np.asarray(image)
+
+
+def analyze_image(image):
+    """
+    分析图像内容
+    
+    Args:
+        image (PIL.Image.Image): L或RGB模式的图像
+    
+    Returns:
+        tuple: (内容类型, 是否无彩色)
+    """
+    if np is None or image.mode not in ('L', 'RGB'):
+        return CONTENT_PHOTO, image.mode == 'L'
+    
+    pixels = _sample_rows(image)
+    if pixels.ndim == 3:
+        # 按通道切片逐元素计算，比沿长度为3的最后一维归约快一个数量级
+        red, green, blue = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+        spread = np.maximum(np.maximum(red, green), blue) - np.minimum(np.minimum(red, green), blue)
+        grayscale = bool(np.count_nonzero(spread > GRAY_TOLERANCE) < COLOR_PIXEL_RATIO * spread.size)
+        # 无彩色时三个通道几乎相同，取绿色通道近似亮度
+        gray = green
+        same = ((red[:, 1:] == red[:, :-1]) & (green[:, 1:] == green[:, :-1])
+                & (blue[:, 1:] == blue[:, :-1]))
+    else:
+        grayscale = True
+        gray = pixels
+        same = pixels[:, 1:] == pixels[:, :-1]
+    
+    if grayscale:
+        histogram = np.bincount(gray.ravel(), minlength=256)
+        dark = histogram[:65].sum()
+        light = histogram[192:].sum()
+        if dark + light >= BILEVEL_RATIO * gray.size and light >= dark:
+            return CONTENT_BILEVEL, True
+    
+    if same.size and np.count_nonzero(same) >= FLAT_RATIO * same.size:
+        return CONTENT_FLAT, grayscale
+    return CONTENT_PHOTO, grayscale
+
+
+def to_bilevel(image, threshold=BILEVEL_THRESHOLD):
+    """按阈值将图像转换为1位黑白图像（不抖动，文字边缘保持清晰）"""
+    if image.mode != 'L':
+        image = image.convert('L')
+    return image.point([255 if value >= threshold else 0 for value in range(256)], '1')
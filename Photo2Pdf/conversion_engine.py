@@ -0,0 +1,783 @@
+"""
+图像转PDF转换引擎
+命令行版本(photo2pdf.py)和GUI版本(photo2pdf_gui.py)共用的转换核心
+
+- 配置加载: load_config读取config.ini，两个前端使用同一份配置解析
+- 目录扫描: scan_images单次遍历目录树
+- 单页编码: JPEG原样嵌入、解码阶段缩小、透明背景填充
+- ConversionEngine: 读取 → 编码 → 写入 三阶段流水线（见pipeline），支持按顺序汇报进度事件、
+  取消、增量跳过和流式合并
+"""
+
+from PIL import Image, UnidentifiedImageError
+import io
+import os
+import re
+import time
+import json
+import hashlib
+import threading
+import configparser
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+import queue
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pdf_stream import StreamingPDFWriter, encode_ccitt, encode_flate, encode_jpeg, jpeg_color_space
+from content_analysis import CONTENT_BILEVEL, CONTENT_PHOTO, analyze_image, to_bilevel
+from border_trim import parse_border_color, trim_borders
+from pipeline import FileReader, PipelineStats
+
+
+# 配置默认值
+DEFAULT_CONFIG = {
+    'quality': 95,
+    'optimize': True,
+    'jpeg_passthrough': True,
+    'adaptive_encoding': True,
+    'background_color': (255, 255, 255),
+    'max_image_size': 0,
+    'trim_borders': False,
+    'border_color': 'auto',
+    'border_tolerance': 10,
+    'snap_aspect_ratio': False,
+    'default_output_dir': 'pdf',
+    'default_merge_filename': 'merged_images.pdf',
+    'overwrite_existing': True,
+    'natural_sort': False,
+    'window_width': 600,
+    'window_height': 500,
+    'listbox_height': 8,
+    'result_text_height': 6,
+    'enable_multithreading': True,
+    'max_concurrent_files': 4,
+    'read_ahead': 8,
+    'scan_threads': 1
+}
+
+# 配置文件各节包含的配置项
+CONFIG_SECTIONS = {
+    '图像处理': ['quality', 'optimize', 'jpeg_passthrough', 'adaptive_encoding', 'background_color',
+             'max_image_size', 'trim_borders', 'border_color', 'border_tolerance', 'snap_aspect_ratio'],
+    '文件处理': ['default_output_dir', 'default_merge_filename', 'overwrite_existing', 'natural_sort'],
+    'GUI设置': ['window_width', 'window_height', 'listbox_height', 'result_text_height'],
+    '性能设置': ['enable_multithreading', 'max_concurrent_files', 'read_ahead', 'scan_threads']
+}
+
+
+def _parse_option(config, section, key, default):
+    """按默认值的类型解析配置项"""
+    if isinstance(default, bool):
+        return config.getboolean(section, key, fallback=default)
+    if isinstance(default, int):
+        return config.getint(section, key, fallback=default)
+    if isinstance(default, tuple):
+        # 颜色等逗号分隔的整数元组
+        try:
+            return tuple(map(int, config.get(section, key).split(',')))
+        except (configparser.Error, ValueError):
+            return default
+    return config.get(section, key, fallback=default)
+
+
+def load_config(config_path=None):
+    """
+    加载配置文件
+    
+    Args:
+        config_path (str): 配置文件路径，默认为程序目录下的config.ini
+    
+    Returns:
+        dict: 配置字典，缺失的配置项使用默认值
+    """
+    config = configparser.ConfigParser()
+    config_path = Path(config_path) if config_path else Path(__file__).parent / 'config.ini'
+    parsed_config = dict(DEFAULT_CONFIG)
+    
+    if not config_path.exists():
+        print("警告: 配置文件不存在，使用默认设置")
+        return parsed_config
+    
+    try:
+        config.read(config_path, encoding='utf-8')
+        for section, keys in CONFIG_SECTIONS.items():
+            if not config.has_section(section):
+                continue
+            for key in keys:
+                parsed_config[key] = _parse_option(config, section, key, DEFAULT_CONFIG[key])
+        return parsed_config
+    except Exception as e:
+        print(f"警告: 读取配置文件失败，使用默认设置: {e}")
+        return dict(DEFAULT_CONFIG)
+
+
+# 支持的图像格式（小写扩展名，匹配时忽略大小写）
+SUPPORTED_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp', '.gif'}
+
+
+def natural_sort_key(path):
+    """自然排序键：数字部分按数值比较，page2排在page10之前"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', str(path))]
+
+
+def _scan_directory(directory, extensions):
+    """
+    扫描单个目录（不递归）
+    
+    Returns:
+        tuple: (图像文件路径列表, 子目录路径列表)
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # 不跟随符号链接目录，避免循环链接导致无限遍历
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                        files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"警告: 无法读取目录 {directory} - {e}")
+    return files, subdirs
+
+
+def scan_images(directory, recursive=False, natural_sort=False, workers=1):
+    """
+    扫描目录中的图像文件
+    
+    使用os.scandir单次遍历目录树，扩展名匹配忽略大小写，每个文件只出现一次
+    
+    Args:
+        directory (str): 扫描的目录
+        recursive (bool): 是否递归扫描子目录
+        natural_sort (bool): 是否按自然顺序排序（否则按路径字符串排序）
+        workers (int): 并行遍历子目录的线程数，网络磁盘和大型归档目录上可加快扫描
+    
+    Returns:
+        list: 排序后的图像文件Path列表
+    """
+    extensions = SUPPORTED_FORMATS
+    image_files, subdirs = _scan_directory(directory, extensions)
+    
+    if recursive and subdirs:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = {pool.submit(_scan_directory, d, extensions) for d in subdirs}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        files, children = future.result()
+                        image_files.extend(files)
+                        pending.update(pool.submit(_scan_directory, d, extensions) for d in children)
+        else:
+            stack = list(reversed(subdirs))
+            while stack:
+                files, children = _scan_directory(stack.pop(), extensions)
+                image_files.extend(files)
+                stack.extend(reversed(children))
+    
+    image_files.sort(key=natural_sort_key if natural_sort else None)
+    return [Path(f) for f in image_files]
+
+
+def to_rgb(image, background_color):
+    """
+    将图像转换为RGB模式
+    
+    透明图像以背景颜色填充，调色板等其他模式直接转换
+    
+    Args:
+        image (PIL.Image.Image): 图像对象
+        background_color (tuple): 透明区域的填充颜色 (R, G, B)
+    """
+    if image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, background_color)
+        background.paste(image, mask=image.split()[-1])  # 使用alpha通道作为遮罩
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def fit_image(image, max_size):
+    """
+    按最长边限制缩小图像，在解码阶段完成缩放
+    
+    - JPEG: draft()让解码器直接按1/2、1/4、1/8比例进行DCT缩放，不解码全尺寸像素
+    - 其他格式: thumbnail()先用reduce()按整数倍快速缩小，再用高质量滤波缩放到目标尺寸
+    - 调色板(P)和1位图像先转换为RGB/L，否则Pillow只能按最近邻缩放
+    
+    Args:
+        image (PIL.Image.Image): 刚打开、尚未加载的图像对象
+        max_size (int): 最长边的最大像素数，0表示不限制
+    
+    Returns:
+        PIL.Image.Image: 缩小后的图像（未超出限制时返回原图像）
+    """
+    width, height = image.size
+    if max_size <= 0 or max(width, height) <= max_size:
+        return image
+    
+    scale = max_size / max(width, height)
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if image.format == 'JPEG':
+        # draft选择不小于目标尺寸的最大缩放比例，随后再精确缩放
+        image.draft(image.mode, target)
+    elif image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    elif image.mode == '1':
+        image = image.convert('L')
+    image.thumbnail(target, Image.LANCZOS, reducing_gap=2.0)
+    return image
+
+
+class EncodedPage(NamedTuple):
+    """
+    已编码的PDF页面图像
+    
+    - page_size: 页面尺寸（像素），缩小后的图像仍为原图尺寸
+    - filter_name / bits_per_component / decode_parms: 见StreamingPDFWriter.add_encoded_image
+    """
+    data: bytes
+    width: int
+    height: int
+    color_space: str
+    page_size: tuple
+    filter_name: str = 'DCTDecode'
+    bits_per_component: int = 8
+    decode_parms: str = None
+
+
+def _encode_adaptive(image, config, page_size):
+    """
+    按内容分析结果选择编码方式（见content_analysis）
+    
+    - 黑白文档: CCITT G4，libtiff不可用时为1位Flate
+    - 平涂图像: PNG预测的Flate无损压缩
+    - 照片: JPEG
+    无彩色的图像均按灰度编码
+    """
+    content, grayscale = analyze_image(image)
+    if content == CONTENT_BILEVEL:
+        image = to_bilevel(image)
+        ccitt = encode_ccitt(image)
+        if ccitt is not None:
+            data, decode_parms = ccitt
+            return EncodedPage(data, image.width, image.height, 'DeviceGray', page_size,
+                               'CCITTFaxDecode', 1, decode_parms)
+    elif grayscale and image.mode != 'L':
+        image = image.convert('L')
+    
+    if content == CONTENT_PHOTO:
+        data, color_space, width, height = encode_jpeg(image, config['quality'], config['optimize'])
+        return EncodedPage(data, width, height, color_space, page_size)
+    
+    data, color_space, bits, decode_parms = encode_flate(image, config['optimize'])
+    return EncodedPage(data, image.width, image.height, color_space, page_size,
+                       'FlateDecode', bits, decode_parms)
+
+
+def encode_page(image_path, config, data=None):
+    """
+    将图像文件编码为PDF页面图像
+    
+    启用jpeg_passthrough时，RGB和灰度JPEG直接嵌入原始数据（只读取文件头获取尺寸，
+    不解码也不重新编码）；其他图像转换为RGB后，启用adaptive_encoding时按内容
+    选择CCITT G4、Flate或JPEG编码，否则按配置的质量编码为JPEG
+    
+    最长边超过max_image_size的图像在解码时缩小，页面尺寸保持原图大小
+    
+    启用trim_borders时先裁剪纯色边框（见border_trim），页面尺寸为裁剪后的区域；
+    没有可裁剪边框的JPEG仍原样嵌入
+    
+    模块级函数，可在子进程中执行：合并时各页在进程池中并行编码，由主进程按顺序写入
+    
+    Args:
+        image_path (str): 图像文件路径
+        config (dict): 转换配置
+        data (bytes): 已读取的文件内容，为None时从image_path读取
+    
+    Returns:
+        EncodedPage: 已编码的页面图像
+    """
+    max_size = config.get('max_image_size', 0)
+    with _open_image(image_path, data) as image:
+        original_size = image.size
+        oversized = 0 < max_size < max(original_size)
+        
+        trim = config.get('trim_borders', False)
+        
+        color_space = None
+        if config.get('jpeg_passthrough', True) and not oversized:
+            color_space = jpeg_color_space(image)
+        if color_space is not None and not trim:
+            return _read_jpeg_page(image_path, image, color_space, data)
+        
+        image = fit_image(image, max_size)
+        if image.mode != 'L':
+            image = to_rgb(image, config['background_color'])
+        page_size = original_size
+        if trim:
+            scale_x = original_size[0] / image.width
+            scale_y = original_size[1] / image.height
+            image, box = trim_borders(image, parse_border_color(config.get('border_color', 'auto')),
+                                      config.get('border_tolerance', 10),
+                                      config.get('snap_aspect_ratio', False))
+            if box is None and color_space is not None:
+                return _read_jpeg_page(image_path, image, color_space, data)
+            if box is not None:
+                page_size = (round(image.width * scale_x), round(image.height * scale_y))
+        
+        if config.get('adaptive_encoding', True):
+            return _encode_adaptive(image, config, page_size)
+        data, color_space, width, height = encode_jpeg(image, config['quality'], config['optimize'])
+        return EncodedPage(data, width, height, color_space, page_size)
+
+
+def _open_image(image_path, data=None):
+    """
+    打开图像文件或已读取的文件内容
+    
+    从内存打开失败时Pillow的错误信息中只有BytesIO对象，改为包含文件路径
+    """
+    if data is None:
+        return Image.open(image_path)
+    try:
+        return Image.open(io.BytesIO(data))
+    except UnidentifiedImageError:
+        raise UnidentifiedImageError(f"cannot identify image file '{image_path}'") from None
+
+
+def passthrough_page(image_path, config, data=None):
+    """
+    判断图像能否原样嵌入，只解析文件头，不解码像素
+    
+    Args:
+        image_path (str): 图像文件路径
+        config (dict): 转换配置
+        data (bytes): 已读取的文件内容，为None时从image_path读取
+    
+    Returns:
+        EncodedPage: 可原样嵌入时返回页面图像，否则返回None（需要由encode_page编码）
+    """
+    if not config.get('jpeg_passthrough', True) or config.get('trim_borders', False):
+        return None
+    max_size = config.get('max_image_size', 0)
+    with _open_image(image_path, data) as image:
+        if 0 < max_size < max(image.size):
+            return None
+        color_space = jpeg_color_space(image)
+        if color_space is None:
+            return None
+        return _read_jpeg_page(image_path, image, color_space, data)
+
+
+def _read_jpeg_page(image_path, image, color_space, data=None):
+    """以JPEG文件原始数据作为页面图像（不解码）"""
+    if data is None:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    return EncodedPage(data, image.width, image.height, color_space, image.size)
+
+
+def _encode_task(task):
+    """
+    进程池任务：由已读取的文件内容编码一页，返回(页面, 错误信息, 编码耗时)
+    
+    异常在子进程内转换为错误信息，单个文件失败不影响其他文件
+    """
+    image_path, data, config = task
+    start = time.perf_counter()
+    try:
+        page, error = encode_page(image_path, config, data), None
+    except Exception as e:
+        page, error = None, str(e)
+    return page, error, time.perf_counter() - start
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """计算文件内容的BLAKE2b摘要"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_digest(data):
+    """计算已读入内容的BLAKE2b摘要，与file_digest的结果一致"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ConversionManifest:
+    """
+    增量转换清单
+    
+    记录每个已转换图像的大小、修改时间和内容摘要，保存在输出目录中；
+    源文件仅修改时间变化而内容未变（如复制、解压归档）时可通过摘要判断无需重新转换
+    """
+    
+    FILENAME = '.photo2pdf_manifest.json'
+    
+    def __init__(self, directory):
+        self.path = Path(directory) / self.FILENAME
+        self.entries = {}
+        self.changed = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def is_up_to_date(self, image_path, pdf_path):
+        """
+        判断PDF是否已是最新
+        
+        1. PDF不存在: 需要转换
+        2. PDF比源文件新: 无需转换
+        3. 源文件大小和修改时间与清单记录一致: 无需转换
+        4. 源文件内容摘要与清单记录一致: 无需转换（同时更新记录的修改时间）
+        """
+        try:
+            pdf_stat = os.stat(pdf_path)
+            image_stat = os.stat(image_path)
+        except OSError:
+            return False
+        if pdf_stat.st_mtime_ns >= image_stat.st_mtime_ns:
+            return True
+        
+        entry = self.entries.get(str(image_path))
+        if entry is None or entry['size'] != image_stat.st_size:
+            return False
+        if entry['mtime_ns'] == image_stat.st_mtime_ns:
+            return True
+        if entry['digest'] == file_digest(image_path):
+            entry['mtime_ns'] = image_stat.st_mtime_ns
+            self.changed = True
+            return True
+        return False
+    
+    def record(self, image_path, data=None, stat=None):
+        """
+        记录转换成功的图像
+        
+        Args:
+            image_path (str): 图像路径
+            data (bytes): 转换时读取的文件内容，提供时直接计算摘要，不再重新读取文件
+            stat (os.stat_result): 读取该内容时的文件状态；转换期间文件被修改时，
+                记录的仍是实际转换的版本，下次运行会重新转换
+        """
+        try:
+            image_stat = stat if stat is not None else os.stat(image_path)
+            digest = data_digest(data) if data is not None else file_digest(image_path)
+        except OSError:
+            return
+        self.entries[str(image_path)] = {
+            'size': image_stat.st_size,
+            'mtime_ns': image_stat.st_mtime_ns,
+            'digest': digest
+        }
+        self.changed = True
+    
+    def save(self):
+        """写入清单（先写临时文件再替换，避免中断导致清单损坏）"""
+        if not self.changed:
+            return
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.changed = False
+
+
+
+def filter_up_to_date(tasks, manifest=None):
+    """
+    过滤掉PDF已是最新的任务（增量模式）
+    
+    有清单时按清单判断（见ConversionManifest.is_up_to_date），否则只比较修改时间
+    
+    Args:
+        tasks (list): (图像路径, PDF路径) 元组列表
+        manifest (ConversionManifest): 增量转换清单
+    
+    Returns:
+        tuple: (需要转换的任务列表, 跳过的任务数)
+    """
+    pending = []
+    skipped = 0
+    for image_path, pdf_path in tasks:
+        if manifest is not None:
+            up_to_date = manifest.is_up_to_date(str(image_path), str(pdf_path))
+        else:
+            up_to_date = os.path.exists(pdf_path) and os.path.getmtime(pdf_path) >= os.path.getmtime(image_path)
+        if up_to_date:
+            skipped += 1
+        else:
+            pending.append((image_path, pdf_path))
+    return pending, skipped
+
+
+class EngineEvent(NamedTuple):
+    """
+    转换进度事件
+    
+    - kind: 'converted'（单个PDF转换成功）、'page'（合并PDF写入一页）、'failed'（失败）
+    - current / total: 已处理的图像数 / 图像总数
+    """
+    kind: str
+    current: int
+    total: int
+    image_path: str
+    output_path: str
+    error: str = None
+
+
+class EngineResult(NamedTuple):
+    """转换结果：成功数、失败的文件列表、是否被取消"""
+    processed: int
+    failed_files: list
+    cancelled: bool
+
+
+def _abandon_pool(pool, error):
+    """放弃异常的进程池，剩余任务改为串行执行"""
+    print(f"警告: 工作进程异常退出，剩余文件改为串行处理: {error}")
+    pool.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+class ConversionEngine:
+    """
+    转换引擎
+    
+    每次转换为三阶段流水线（见pipeline）：读取线程按顺序预读文件内容，进程池并行解码和编码，
+    调用线程按原始顺序写入PDF；磁盘读取、CPU编码和输出写入互相重叠，结果顺序与串行转换一致。
+    预读文件数和在途编码任务数（进程数×2）都有上限，内存占用与图像总数无关
+    
+    进度事件在调用convert/merge的线程中回调；cancel()可在任意线程调用，
+    未开始的任务立即撤销，正在执行的任务完成后停止；stats为最近一次转换的各阶段统计
+    
+    用法:
+        engine = ConversionEngine(config, on_event=handler)
+        engine.convert([(image_path, pdf_path), ...])
+        engine.merge([image_path, ...], pdf_path)
+        print(engine.stats.format_summary())
+    """
+    
+    def __init__(self, config, on_event=None):
+        """
+        Args:
+            config (dict): 转换配置，见load_config
+            on_event (callable): 进度事件回调，参数为EngineEvent
+        """
+        self.config = config
+        self.on_event = on_event
+        self.stats = None
+        self._cancelled = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    
+    def cancel(self):
+        """取消正在进行的转换"""
+        self._cancelled.set()
+    
+    def worker_count(self, task_count):
+        """
+        计算使用的进程数
+        
+        - 未启用多进程或只有一个任务时为1（在当前进程中执行）
+        - max_concurrent_files为0或负数时使用全部CPU核心
+        """
+        if not self.config.get('enable_multithreading', True) or task_count < 2:
+            return 1
+        workers = self.config.get('max_concurrent_files', 4)
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        return max(1, min(workers, task_count))
+    
+    def _emit(self, *args):
+        if self.on_event is not None:
+            self.on_event(EngineEvent(*args))
+    
+    def _passthrough(self, image_path, data):
+        """在主进程中按文件头判断JPEG能否原样嵌入，避免文件内容往返工作进程"""
+        start = time.perf_counter()
+        try:
+            page = passthrough_page(image_path, self.config, data)
+        except Exception:
+            # 无法识别的文件交给编码阶段，由其报告错误
+            return None
+        if page is not None:
+            self.stats.encode.add(time.perf_counter() - start)
+        return page
+    
+    def _encode_pages(self, image_paths):
+        """
+        流水线执行读取和编码阶段，按原始顺序逐个产出 (图像路径, 页面, 错误信息, (文件内容, 文件状态))
+        
+        文件内容和状态来自读取阶段，供增量清单记录实际转换的版本
+        
+        受限环境无法创建进程池或工作进程异常退出时，剩余页面退回当前进程串行编码
+        （已产出的结果不会重复执行）
+        """
+        workers = self.worker_count(len(image_paths))
+        read_ahead = max(1, self.config.get('read_ahead', 8))
+        stats = self.stats = PipelineStats(workers, read_ahead)
+        
+        pool = None
+        if workers > 1:
+            try:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, ImportError, NotImplementedError) as e:
+                print(f"警告: 无法启用多进程转换，改为串行处理: {e}")
+        # 串行编码时不提前取出文件，预读只发生在读取线程中
+        window_size = workers * 2 if pool is not None else 1
+        
+        stop = threading.Event()
+        reader = FileReader(image_paths, read_ahead, stats.read, stop)
+        reader.start()
+        # (图像路径, 文件内容, 文件状态, 任务)，任务为Future、原样嵌入的页面、读取错误或None（串行编码）
+        window = deque()
+        exhausted = False
+        try:
+            while not self.cancelled:
+                # 填满编码窗口：窗口为空时等待读取线程，否则只取已读好的文件
+                while not exhausted and len(window) < window_size:
+                    try:
+                        item = reader.get(block=not window)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        exhausted = True
+                        break
+                    image_path, data, task, stat = item
+                    if task is None:
+                        task = self._passthrough(image_path, data)
+                    if task is None and pool is not None:
+                        # 只有需要解码或编码的图像才发送到工作进程
+                        try:
+                            task = pool.submit(_encode_task, (image_path, data, self.config))
+                        except (RuntimeError, BrokenProcessPool) as e:
+                            pool = _abandon_pool(pool, e)
+                            window_size = 1
+                    window.append((image_path, data, stat, task))
+                if not window:
+                    break
+                
+                stats.read.sample(reader.queue.qsize())
+                stats.encode.sample(len(window))
+                stats.write.sample(sum(1 for *_, task in window if isinstance(task, Future) and task.done()))
+                
+                image_path, data, stat, task = window.popleft()
+                if isinstance(task, str):
+                    # 读取失败
+                    yield image_path, None, task, (None, None)
+                    continue
+                if isinstance(task, EncodedPage):
+                    yield image_path, task, None, (data, stat)
+                    continue
+                
+                page = error = None
+                if isinstance(task, Future):
+                    try:
+                        page, error, elapsed = task.result()
+                        stats.encode.add(elapsed)
+                    except (BrokenProcessPool, CancelledError) as e:
+                        # 进程池已失效，窗口中其余任务也会失败，统一在当前进程中重新编码
+                        if pool is not None:
+                            pool = _abandon_pool(pool, e)
+                            window_size = 1
+                        task = None
+                if not isinstance(task, Future):
+                    page, error, elapsed = _encode_task((image_path, data, self.config))
+                    stats.encode.add(elapsed)
+                yield image_path, page, error, (data, stat)
+        finally:
+            stop.set()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            stats.finish()
+    
+    def convert(self, tasks, manifest=None):
+        """
+        将每个图像转换为单独的PDF
+        
+        Args:
+            tasks (list): (图像路径, PDF路径) 元组列表
+            manifest (ConversionManifest): 增量转换清单，转换成功的图像记录到清单中
+        
+        Returns:
+            EngineResult: 转换结果
+        """
+        pdf_paths = [str(pdf) for _, pdf in tasks]
+        total = len(tasks)
+        processed = 0
+        failed_files = []
+        current = 0
+        for image_path, page, error, (data, stat) in self._encode_pages([str(image) for image, _ in tasks]):
+            pdf_path = pdf_paths[current]
+            current += 1
+            if error is None:
+                start = time.perf_counter()
+                try:
+                    with StreamingPDFWriter(pdf_path) as writer:
+                        writer.add_encoded_image(page.data, page.width, page.height, page.color_space,
+                                                 page.filter_name, page.page_size,
+                                                 page.bits_per_component, page.decode_parms)
+                except OSError as e:
+                    error = str(e)
+                self.stats.write.add(time.perf_counter() - start)
+            
+            if error is None:
+                processed += 1
+                if manifest is not None:
+                    manifest.record(image_path, data, stat)
+                self._emit('converted', current, total, image_path, pdf_path)
+            else:
+                failed_files.append(image_path)
+                self._emit('failed', current, total, image_path, pdf_path, error)
+        return EngineResult(processed, failed_files, current < total)
+    
+    def merge(self, image_paths, pdf_path):
+        """
+        将多个图像按顺序合并为一个PDF
+        
+        各页在进程池中并行编码，调用线程按顺序流式写入；无法读取的图像跳过，
+        没有成功写入任何页面或转换被取消时删除不完整的输出文件
+        
+        Args:
+            image_paths (list): 图像文件路径列表
+            pdf_path (str): 输出PDF文件路径
+        
+        Returns:
+            EngineResult: 转换结果，processed为写入的页数
+        """
+        total = len(image_paths)
+        failed_files = []
+        current = 0
+        with StreamingPDFWriter(str(pdf_path)) as writer:
+            for image_path, page, error, _ in self._encode_pages([str(image) for image in image_paths]):
+                current += 1
+                if error is None:
+                    start = time.perf_counter()
+                    writer.add_encoded_image(page.data, page.width, page.height, page.color_space,
+                                             page.filter_name, page.page_size,
+                                             page.bits_per_component, page.decode_parms)
+                    self.stats.write.add(time.perf_counter() - start)
+                    self._emit('page', current, total, image_path, str(pdf_path))
+                else:
+                    failed_files.append(image_path)
+                    self._emit('failed', current, total, image_path, str(pdf_path), error)
+            
+            cancelled = current < total
+            if cancelled or writer.page_count == 0:
+                writer.abort()
+        return EngineResult(writer.page_count, failed_files, cancelled)
@@ -0,0 +1,249 @@
+"""
+流式PDF写入器
+逐页编码图像并立即追加到PDF文件，最后写入交叉引用表（xref）
+合并数千张图像时内存占用只与单页大小有关
+RGB和灰度JPEG可原样嵌入（DCTDecode），无需解码和重新编码
+截图等平涂图像使用PNG预测的Flate压缩，黑白文档使用CCITT G4压缩
+"""
+
+import io
+import os
+import struct
+from PIL import Image
+
+
+# 可原样嵌入PDF的JPEG模式及对应的颜色空间
+# CMYK JPEG常带有Adobe反相标记，需要额外的/Decode数组，仍走重新编码流程
+JPEG_COLOR_SPACES = {
+    'RGB': 'DeviceRGB',
+    'L': 'DeviceGray'
+}
+
+
+def jpeg_color_space(image):
+    """
+    判断图像能否以JPEG原样嵌入PDF
+
+    Image.open只解析文件头，调用时不会解码像素数据
+
+    Args:
+        image (PIL.Image.Image): 刚打开、尚未加载的图像对象
+
+    Returns:
+        str: 可原样嵌入时返回PDF颜色空间，否则返回None
+    """
+    if image.format != 'JPEG':
+        return None
+    return JPEG_COLOR_SPACES.get(image.mode)
+
+
+def encode_jpeg(image, quality=95, optimize=False):
+    """
+    将Pillow图像编码为JPEG
+
+    RGB和灰度图像直接编码，其他模式先转换为RGB
+
+    Returns:
+        tuple: (JPEG数据, PDF颜色空间, 宽度, 高度)
+    """
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality, optimize=optimize)
+    color_space = 'DeviceGray' if image.mode == 'L' else 'DeviceRGB'
+    return buffer.getvalue(), color_space, image.width, image.height
+
+
+def encode_flate(image, optimize=False):
+    """
+    将图像编码为带PNG预测器的Flate数据（无损）
+
+    PNG的IDAT数据与PDF的FlateDecode + /Predictor 15完全相同，
+    借助Pillow的PNG编码器逐行选择最优滤波，截图等平涂图像压缩率远高于JPEG
+
+    Args:
+        image (PIL.Image.Image): 1 / L / RGB模式的图像
+        optimize (bool): 是否使用最高压缩级别（更小，编码稍慢）
+
+    Returns:
+        tuple: (Flate数据, PDF颜色空间, 每分量位数, 解码参数)
+    """
+    if image.mode not in ('1', 'L', 'RGB'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=optimize)
+    png = buffer.getbuffer()
+
+    # 拼接所有IDAT块：长度(4) + 类型(4) + 数据 + CRC(4)，跳过8字节的文件签名
+    chunks = []
+    position = 8
+    while position < len(png):
+        length, chunk_type = struct.unpack('>I4s', png[position:position + 8])
+        if chunk_type == b'IDAT':
+            chunks.append(bytes(png[position + 8:position + 8 + length]))
+        position += 12 + length
+
+    colors = 3 if image.mode == 'RGB' else 1
+    bits = 1 if image.mode == '1' else 8
+    decode_parms = f'/Predictor 15 /Colors {colors} /BitsPerComponent {bits} /Columns {image.width}'
+    color_space = 'DeviceRGB' if image.mode == 'RGB' else 'DeviceGray'
+    return b''.join(chunks), color_space, bits, decode_parms
+
+
+def encode_ccitt(image):
+    """
+    将黑白图像编码为CCITT G4数据
+
+    通过Pillow的libtiff编码器生成单条带（strip）TIFF，再取出其中的压缩数据；
+    Pillow未编译libtiff或无法写入单条带时返回None，由调用方改用Flate
+
+    Args:
+        image (PIL.Image.Image): 1模式的图像
+
+    Returns:
+        tuple: (G4数据, 解码参数)，不可用时返回None
+    """
+    buffer = io.BytesIO()
+    try:
+        image.save(buffer, 'TIFF', compression='group4', strip_size=2 ** 31 - 1)
+    except (OSError, ValueError):
+        return None
+    buffer.seek(0)
+    with Image.open(buffer) as tiff:
+        offsets = tiff.tag_v2.get(273)
+        counts = tiff.tag_v2.get(279)
+        photometric = tiff.tag_v2.get(262)
+    if not offsets or len(offsets) != 1:
+        return None
+
+    data = buffer.getvalue()[offsets[0]:offsets[0] + counts[0]]
+    # TIFF以0为黑(BlackIsZero)时，编码中的"黑"游程对应白色像素
+    black_is_1 = 'true' if photometric == 1 else 'false'
+    decode_parms = f'/K -1 /Columns {image.width} /Rows {image.height} /BlackIs1 {black_is_1}'
+    return data, decode_parms
+
+
+class StreamingPDFWriter:
+    """
+    流式PDF写入器
+
+    每页由三个对象组成：图像XObject、内容流和页面对象，写入后不再保留在内存中；
+    页面树（对象2）和文档目录（对象1）在关闭时写入，只需记录各对象的字节偏移
+
+    用法:
+        data, color_space, width, height = encode_jpeg(image, quality=95)
+        with StreamingPDFWriter(pdf_path) as writer:
+            writer.add_encoded_image(data, width, height, color_space)
+    """
+
+    def __init__(self, pdf_path, resolution=72.0):
+        """
+        Args:
+            pdf_path (str): 输出PDF文件路径
+            resolution (float): 图像分辨率(DPI)，决定页面尺寸，与Pillow保存PDF的默认值一致
+        """
+        self.pdf_path = pdf_path
+        self.resolution = resolution
+        self.page_count = 0
+        self._file = open(pdf_path, 'wb')
+        self._offsets = {}
+        self._page_ids = []
+        # 对象1为文档目录、对象2为页面树，关闭时写入
+        self._next_id = 3
+        self._closed = False
+        self._file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _begin_object(self, obj_id):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f'{obj_id} 0 obj\n'.encode('ascii'))
+
+    def _write_object(self, obj_id, body):
+        self._begin_object(obj_id)
+        self._file.write(body.encode('ascii'))
+        self._file.write(b'\nendobj\n')
+
+    def _write_stream(self, obj_id, header, data):
+        self._begin_object(obj_id)
+        self._file.write(f'<< {header} /Length {len(data)} >>\nstream\n'.encode('ascii'))
+        self._file.write(data)
+        self._file.write(b'\nendstream\nendobj\n')
+
+    def _allocate(self, count):
+        first = self._next_id
+        self._next_id += count
+        return range(first, first + count)
+
+    def add_encoded_image(self, data, width, height, color_space='DeviceRGB', filter_name='DCTDecode',
+                          page_size=None, bits_per_component=8, decode_parms=None):
+        """
+        添加已编码的图像作为新页面
+
+        Args:
+            data (bytes): 图像流数据（如JPEG文件内容）
+            width (int): 图像宽度（像素）
+            height (int): 图像高度（像素）
+            color_space (str): PDF颜色空间，DeviceRGB / DeviceGray / DeviceCMYK
+            filter_name (str): 图像流的解码过滤器，DCTDecode / FlateDecode / CCITTFaxDecode
+            page_size (tuple): 页面尺寸（宽, 高，单位为像素），默认与图像尺寸相同；
+                缩小后的图像传入原始尺寸，页面大小保持不变，只提高了有效DPI
+            bits_per_component (int): 每个颜色分量的位数，黑白图像为1
+            decode_parms (str): 解码参数字典的内容，如Flate的预测器参数
+        """
+        image_id, content_id, page_id = self._allocate(3)
+        page_width, page_height = page_size or (width, height)
+        page_width = page_width * 72.0 / self.resolution
+        page_height = page_height * 72.0 / self.resolution
+
+        header = (f'/Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                  f'/ColorSpace /{color_space} /BitsPerComponent {bits_per_component} /Filter /{filter_name}')
+        if decode_parms:
+            header += f' /DecodeParms << {decode_parms} >>'
+        self._write_stream(image_id, header, data)
+        content = f'q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q'.encode('ascii')
+        self._write_stream(content_id, '', content)
+        self._write_object(
+            page_id,
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.4f} {page_height:.4f}] '
+            f'/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>'
+        )
+        self._page_ids.append(page_id)
+        self.page_count += 1
+
+    def close(self):
+        """写入页面树、文档目录、交叉引用表和文件尾"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+            self._write_object(2, f'<< /Type /Pages /Kids [{kids}] /Count {self.page_count} >>')
+            self._write_object(1, '<< /Type /Catalog /Pages 2 0 R >>')
+
+            xref_offset = self._file.tell()
+            size = self._next_id
+            lines = [f'xref\n0 {size}\n', '0000000000 65535 f \n']
+            for obj_id in range(1, size):
+                lines.append(f'{self._offsets[obj_id]:010d} 00000 n \n')
+            lines.append(f'trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n')
+            self._file.write(''.join(lines).encode('ascii'))
+        finally:
+            self._file.close()
+
+    def abort(self):
+        """放弃写入并删除不完整的输出文件"""
+        self._closed = True
+        self._file.close()
+        try:
+            os.remove(self.pdf_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
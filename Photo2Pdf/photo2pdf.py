@@ -1,85 +1,43 @@
 """
 图像转PDF工具
 支持将PNG、JPG、JPEG、BMP、TIFF等格式的图像文件转换为PDF格式
+批量转换时按配置文件[性能设置]使用多进程并行处理
 """
 
-from PIL import Image
 import os
-import sys
 import argparse
 from pathlib import Path
-import glob
-import configparser
+import multiprocessing
+from conversion_engine import (
+    SUPPORTED_FORMATS, ConversionEngine, ConversionManifest,
+    filter_up_to_date, load_config, scan_images
+)
+
 
 class Photo2PDF:
     """图像转PDF转换器"""
     
     # 支持的图像格式
-    SUPPORTED_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp', '.gif'}
+    SUPPORTED_FORMATS = SUPPORTED_FORMATS
     
     def __init__(self):
         self.processed_count = 0
         self.failed_count = 0
+        self.skipped_count = 0
         self.failed_files = []
         
+        # 增量转换清单（仅在不覆盖已存在文件的目录批量转换中使用）
+        self.manifest = None
+        
         # 加载配置文件
         self.config = self._load_config()
         
+        # 命令行和GUI共用的转换引擎，进度事件在当前线程中回调
+        self.engine = ConversionEngine(self.config, self._on_event)
+        
     def _load_config(self):
         """加载配置文件"""
-        config = configparser.ConfigParser()
-        config_path = Path(__file__).parent / 'config.ini'
-        
-        # 设置默认值
-        defaults = {
-            'quality': 95,
-            'optimize': True,
-            'background_color': (255, 255, 255),
-            'max_image_size': 10000,
-            'default_output_dir': 'pdf',
-            'default_merge_filename': 'merged_images.pdf',
-            'overwrite_existing': True
-        }
-        
-        if config_path.exists():
-            try:
-                config.read(config_path, encoding='utf-8')
-                
-                # 解析配置值
-                parsed_config = {}
-                
-                # 图像处理设置
-                if config.has_section('图像处理'):
-                    parsed_config['quality'] = config.getint('图像处理', 'quality', fallback=defaults['quality'])
-                    parsed_config['optimize'] = config.getboolean('图像处理', 'optimize', fallback=defaults['optimize'])
-                    
-                    # 解析背景颜色
-                    bg_color_str = config.get('图像处理', 'background_color', fallback='255, 255, 255')
-                    try:
-                        parsed_config['background_color'] = tuple(map(int, bg_color_str.split(',')))
-                    except:
-                        parsed_config['background_color'] = defaults['background_color']
-                    
-                    parsed_config['max_image_size'] = config.getint('图像处理', 'max_image_size', fallback=defaults['max_image_size'])
-                else:
-                    parsed_config.update({k: v for k, v in defaults.items() if k in ['quality', 'optimize', 'background_color', 'max_image_size']})
-                
-                # 文件处理设置
-                if config.has_section('文件处理'):
-                    parsed_config['default_output_dir'] = config.get('文件处理', 'default_output_dir', fallback=defaults['default_output_dir'])
-                    parsed_config['default_merge_filename'] = config.get('文件处理', 'default_merge_filename', fallback=defaults['default_merge_filename'])
-                    parsed_config['overwrite_existing'] = config.getboolean('文件处理', 'overwrite_existing', fallback=defaults['overwrite_existing'])
-                else:
-                    parsed_config.update({k: v for k, v in defaults.items() if k in ['default_output_dir', 'default_merge_filename', 'overwrite_existing']})
-                
-                return parsed_config
-                
-            except Exception as e:
-                print(f"警告: 读取配置文件失败，使用默认设置: {e}")
-                return defaults
-        else:
-            print("警告: 配置文件不存在，使用默认设置")
-            return defaults
+        return load_config()
     
     def image_to_pdf(self, image_path, pdf_path):
         """
@@ -92,33 +50,42 @@ class Photo2PDF:
         Returns:
             bool: 转换是否成功
         """
-        try:
-            # 打开图像文件
-            image = Image.open(image_path)
-              # 处理图像模式
-            if image.mode == 'RGBA':
-                # 使用配置的背景颜色处理透明图像
-                background = Image.new('RGB', image.size, self.config['background_color'])
-                background.paste(image, mask=image.split()[-1])  # 使用alpha通道作为遮罩
-                image = background
-            elif image.mode == 'P':
-                # 处理调色板模式
-                image = image.convert('RGB')
-            elif image.mode != 'RGB':
-                # 其他模式转为RGB
-                image = image.convert('RGB')
-            
-            # 保存为PDF，使用配置的质量和优化设置
-            image.save(pdf_path, "PDF", quality=self.config['quality'], optimize=self.config['optimize'])
-            print(f"✓ 成功转换: {os.path.basename(image_path)} -> {os.path.basename(pdf_path)}")
+        result = self.engine.convert([(image_path, pdf_path)])
+        return result.processed == 1
+    
+    def _on_event(self, event):
+        """输出单个文件的转换结果并更新统计"""
+        if event.kind == 'converted':
+            print(f"✓ 成功转换: {os.path.basename(event.image_path)} -> {os.path.basename(event.output_path)}")
             self.processed_count += 1
-            return True
-            
-        except Exception as e:
-            print(f"✗ 转换失败: {os.path.basename(image_path)} - 错误: {str(e)}")
+        elif event.kind == 'page':
+            # 合并模式：每写入一页计为一个成功处理的文件
+            self.processed_count += 1
+        elif event.kind == 'failed':
+            print(f"✗ 转换失败: {os.path.basename(event.image_path)} - 错误: {event.error}")
             self.failed_count += 1
-            self.failed_files.append(image_path)
-            return False
+            self.failed_files.append(event.image_path)
+    
+    def convert_tasks(self, tasks):
+        """
+        批量转换图像，按任务顺序输出结果
+        
+        解码、转换和保存都在转换引擎的进程池中执行，充分利用多核CPU；
+        结果按提交顺序汇总，输出顺序与串行转换一致
+        
+        overwrite_existing为false时为增量模式：跳过PDF已是最新的图像
+        （PDF比源文件新，或源文件内容与清单记录一致）
+        
+        Args:
+            tasks (list): (图像路径, PDF路径) 元组列表
+        """
+        if not self.config.get('overwrite_existing', True):
+            tasks, skipped = filter_up_to_date(tasks, self.manifest)
+            self.skipped_count += skipped
+            if skipped:
+                print(f"跳过 {skipped} 个已是最新的文件，需要转换 {len(tasks)} 个文件")
+        
+        self.engine.convert(tasks, self.manifest)
     
     def batch_convert_directory(self, input_dir, output_dir=None, recursive=False):
         """
@@ -141,12 +108,7 @@ class Photo2PDF:
             output_path.mkdir(parents=True, exist_ok=True)
         
         # 获取所有支持的图像文件
-        pattern = "**/*" if recursive else "*"
-        image_files = []
-        
-        for ext in self.SUPPORTED_FORMATS:
-            image_files.extend(input_path.glob(f"{pattern}{ext}"))
-            image_files.extend(input_path.glob(f"{pattern}{ext.upper()}"))
+        image_files = self.scan_images(input_path, recursive)
         
         if not image_files:
             print(f"在目录 {input_dir} 中未找到支持的图像文件")
@@ -155,6 +117,7 @@ class Photo2PDF:
         print(f"找到 {len(image_files)} 个图像文件")
         print("开始批量转换...")
         
+        tasks = []
         for image_file in image_files:
             # 生成PDF文件路径
             if output_dir is None:
@@ -165,7 +128,23 @@ class Photo2PDF:
                 pdf_file = output_path / rel_path.with_suffix('.pdf')
                 pdf_file.parent.mkdir(parents=True, exist_ok=True)
             
-            self.image_to_pdf(str(image_file), str(pdf_file))
+            tasks.append((image_file, pdf_file))
+        
+        # 增量模式：清单保存在输出目录中，中断后已转换的记录也会保留
+        if not self.config.get('overwrite_existing', True):
+            self.manifest = ConversionManifest(output_path)
+        try:
+            self.convert_tasks(tasks)
+        finally:
+            if self.manifest is not None:
+                self.manifest.save()
+                self.manifest = None
+    
+    def scan_images(self, directory, recursive=False):
+        """按配置的排序方式和扫描线程数扫描目录中的图像文件"""
+        return scan_images(str(directory), recursive,
+                           natural_sort=self.config.get('natural_sort', False),
+                           workers=self.config.get('scan_threads', 1))
     
     def batch_convert_files(self, file_list, output_dir=None):
         """
@@ -181,6 +160,7 @@ class Photo2PDF:
         
         print(f"开始转换 {len(file_list)} 个文件...")
         
+        tasks = []
         for image_file in file_list:
             image_path = Path(image_file)
             if not image_path.exists():
@@ -193,42 +173,35 @@ class Photo2PDF:
             else:
                 pdf_file = image_path.with_suffix('.pdf')
             
-            self.image_to_pdf(str(image_path), str(pdf_file))
+            tasks.append((image_path, pdf_file))
+        
+        self.convert_tasks(tasks)
     
     def merge_images_to_pdf(self, image_list, pdf_path):
         """
         将多个图像合并为一个PDF文件
         
+        各页在进程池中并行编码，按顺序逐页追加写入，内存占用只与在途页数有关；
+        无法读取的图像跳过并计入失败
+        
         Args:
             image_list (list): 图像文件路径列表
             pdf_path (str): 输出PDF文件路径
         """
+        existing = []
+        for image_path in image_list:
+            if not os.path.exists(image_path):
+                print(f"警告: 文件不存在 - {image_path}")
+                continue
+            existing.append(image_path)
+        
         try:
-            images = []
-            
-            for image_path in image_list:
-                if not os.path.exists(image_path):
-                    print(f"警告: 文件不存在 - {image_path}")
-                    continue
-                
-                image = Image.open(image_path)
-                  # 处理图像模式
-                if image.mode == 'RGBA':
-                    background = Image.new('RGB', image.size, self.config['background_color'])
-                    background.paste(image, mask=image.split()[-1])
-                    image = background
-                elif image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                images.append(image)
-            
-            if not images:
+            result = self.engine.merge(existing, pdf_path)
+            if result.processed == 0:
                 print("错误: 没有有效的图像文件")
                 return False
-              # 保存合并的PDF，使用配置的质量和优化设置
-            images[0].save(pdf_path, "PDF", save_all=True, append_images=images[1:], 
-                          quality=self.config['quality'], optimize=self.config['optimize'])
-            print(f"✓ 成功合并 {len(images)} 个图像到: {os.path.basename(pdf_path)}")
+            
+            print(f"✓ 成功合并 {result.processed} 个图像到: {os.path.basename(pdf_path)}")
             return True
             
         except Exception as e:
@@ -241,6 +214,8 @@ class Photo2PDF:
         print("转换完成！")
         print(f"成功转换: {self.processed_count} 个文件")
         print(f"转换失败: {self.failed_count} 个文件")
+        if self.skipped_count:
+            print(f"跳过(已是最新): {self.skipped_count} 个文件")
         
         if self.failed_files:
             print("\n失败的文件:")
@@ -257,10 +232,20 @@ def main():
     parser.add_argument('-r', '--recursive', action='store_true', help='递归处理子目录')
     parser.add_argument('-m', '--merge', action='store_true', help='将所有图像合并为一个PDF文件')
     parser.add_argument('--merge-output', help='合并PDF的输出文件名')
+    parser.add_argument('--natural-sort', action='store_true', help='按自然顺序排序文件（page2排在page10之前）')
+    parser.add_argument('--trim', action='store_true', help='转换前自动裁剪纯色边框（等同于trim_borders = true）')
+    parser.add_argument('--stats', action='store_true', help='转换完成后输出读取、编码、写入各阶段的利用率和队列深度')
+    parser.add_argument('--incremental', action='store_true', help='增量模式：跳过PDF已是最新的图像（等同于overwrite_existing = false）')
     
     args = parser.parse_args()
     
     converter = Photo2PDF()
+    if args.natural_sort:
+        converter.config['natural_sort'] = True
+    if args.incremental:
+        converter.config['overwrite_existing'] = False
+    if args.trim:
+        converter.config['trim_borders'] = True
     
     # 如果没有提供输入参数，使用当前目录
     if not args.input:
@@ -277,21 +262,13 @@ def main():
         
         elif input_path.is_dir():
             if args.merge:
-                # 合并模式：将目录中所有图像合并为一个PDF
-                pattern = "**/*" if args.recursive else "*"
-                image_files = []
-                
-                for ext in converter.SUPPORTED_FORMATS:
-                    image_files.extend(input_path.glob(f"{pattern}{ext}"))
-                    image_files.extend(input_path.glob(f"{pattern}{ext.upper()}"))
+                # 合并模式：将目录中所有图像按排序后的顺序合并为一个PDF
+                image_files = converter.scan_images(input_path, args.recursive)
                 
                 if not image_files:
                     print(f"在目录 {args.input} 中未找到支持的图像文件")
                     return
                 
-                # 按文件名排序
-                image_files.sort()
-                
                 # 确定输出文件名
                 if args.merge_output:
                     output_pdf = args.merge_output
@@ -310,6 +287,8 @@ def main():
             return
         
         converter.print_summary()
+        if args.stats and converter.engine.stats is not None:
+            print(converter.engine.stats.format_summary())
         
     except KeyboardInterrupt:
         print("\n操作被用户中断")
@@ -318,4 +297,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，子进程需要此调用才能正确启动
+    multiprocessing.freeze_support()
     main()
@@ -3,13 +3,15 @@ from tkinter import ttk, filedialog, messagebox
 import os
 from pathlib import Path
 import threading
-from PIL import Image
-import configparser
+import multiprocessing
+from conversion_engine import (
+    SUPPORTED_FORMATS, ConversionEngine, filter_up_to_date, load_config, scan_images
+)
 
 class Photo2PDFGUI:
     """图像转PDF转换器GUI版本"""
     
-    SUPPORTED_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp', '.gif'}
+    SUPPORTED_FORMATS = SUPPORTED_FORMATS
     
     def __init__(self, root):
         self.root = root
@@ -22,84 +24,14 @@ class Photo2PDFGUI:
         self.output_directory = tk.StringVar()
         self.conversion_mode = tk.StringVar(value="individual")  # individual 或 merge
         self.processing = False
+        self.engine = None
         
-        # 加载配置文件
-        self.config = self._load_config()
+        # 加载配置文件并应用窗口大小设置
+        self.config = load_config()
+        self.root.geometry(f"{self.config['window_width']}x{self.config['window_height']}")
         
         self.setup_ui()
     
-    def _load_config(self):
-        """加载配置文件"""
-        config = configparser.ConfigParser()
-        config_path = Path(__file__).parent / 'config.ini'
-        
-        # 设置默认值
-        defaults = {
-            'quality': 95,
-            'optimize': True,
-            'background_color': (255, 255, 255),
-            'max_image_size': 10000,
-            'default_output_dir': 'pdf',
-            'default_merge_filename': 'merged_images.pdf',
-            'overwrite_existing': True,
-            'window_width': 600,
-            'window_height': 500,
-            'listbox_height': 8,
-            'result_text_height': 6
-        }
-        
-        if config_path.exists():
-            try:
-                config.read(config_path, encoding='utf-8')
-                
-                # 解析配置值
-                parsed_config = {}
-                
-                # 图像处理设置
-                if config.has_section('图像处理'):
-                    parsed_config['quality'] = config.getint('图像处理', 'quality', fallback=defaults['quality'])
-                    parsed_config['optimize'] = config.getboolean('图像处理', 'optimize', fallback=defaults['optimize'])
-                    
-                    # 解析背景颜色
-                    bg_color_str = config.get('图像处理', 'background_color', fallback='255, 255, 255')
-                    try:
-                        parsed_config['background_color'] = tuple(map(int, bg_color_str.split(',')))
-                    except:
-                        parsed_config['background_color'] = defaults['background_color']
-                    
-                    parsed_config['max_image_size'] = config.getint('图像处理', 'max_image_size', fallback=defaults['max_image_size'])
-                else:
-                    parsed_config.update({k: v for k, v in defaults.items() if k in ['quality', 'optimize', 'background_color', 'max_image_size']})
-                
-                # 文件处理设置
-                if config.has_section('文件处理'):
-                    parsed_config['default_output_dir'] = config.get('文件处理', 'default_output_dir', fallback=defaults['default_output_dir'])
-                    parsed_config['default_merge_filename'] = config.get('文件处理', 'default_merge_filename', fallback=defaults['default_merge_filename'])
-                    parsed_config['overwrite_existing'] = config.getboolean('文件处理', 'overwrite_existing', fallback=defaults['overwrite_existing'])
-                else:
-                    parsed_config.update({k: v for k, v in defaults.items() if k in ['default_output_dir', 'default_merge_filename', 'overwrite_existing']})
-                
-                # GUI设置
-                if config.has_section('GUI设置'):
-                    parsed_config['window_width'] = config.getint('GUI设置', 'window_width', fallback=defaults['window_width'])
-                    parsed_config['window_height'] = config.getint('GUI设置', 'window_height', fallback=defaults['window_height'])
-                    parsed_config['listbox_height'] = config.getint('GUI设置', 'listbox_height', fallback=defaults['listbox_height'])
-                    parsed_config['result_text_height'] = config.getint('GUI设置', 'result_text_height', fallback=defaults['result_text_height'])
-                    
-                    # 应用窗口大小设置
-                    self.root.geometry(f"{parsed_config['window_width']}x{parsed_config['window_height']}")
-                else:
-                    parsed_config.update({k: v for k, v in defaults.items() if k in ['window_width', 'window_height', 'listbox_height', 'result_text_height']})
-                
-                return parsed_config
-                
-            except Exception as e:
-                print(f"警告: 读取配置文件失败，使用默认设置: {e}")
-                return defaults
-        else:
-            print("警告: 配置文件不存在，使用默认设置")
-            return defaults
-    
     def setup_ui(self):
         """设置用户界面"""
         # 主框架
@@ -170,6 +102,10 @@ class Photo2PDFGUI:
         self.convert_button = ttk.Button(button_frame, text="开始转换", command=self.start_conversion)
         self.convert_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.cancel_button = ttk.Button(button_frame, text="取消", command=self.cancel_conversion,
+                                        state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         ttk.Button(button_frame, text="退出", command=self.root.quit).pack(side=tk.LEFT)
         
         # 结果显示区域
@@ -218,12 +154,9 @@ class Photo2PDFGUI:
         folder = filedialog.askdirectory(title="选择包含图像的文件夹")
         if folder:
             # 获取文件夹中的所有图像文件
-            folder_path = Path(folder)
-            image_files = []
-            
-            for ext in self.SUPPORTED_FORMATS:
-                image_files.extend(folder_path.glob(f"*{ext}"))
-                image_files.extend(folder_path.glob(f"*{ext.upper()}"))
+            image_files = scan_images(folder,
+                                      natural_sort=self.config['natural_sort'],
+                                      workers=self.config['scan_threads'])
             
             added_count = 0
             for file in image_files:
@@ -256,19 +189,20 @@ class Photo2PDFGUI:
         self.result_text.insert(tk.END, message + "\n")
         self.result_text.config(state=tk.DISABLED)
         self.result_text.see(tk.END)
-        self.root.update()
     
     def update_status(self, message):
         """更新状态标签"""
         self.status_label.config(text=message)
-        self.root.update()
     
     def update_progress(self, current, total):
         """更新进度条"""
         if total > 0:
             progress = (current / total) * 100
             self.progress_var.set(progress)
-        self.root.update()
+    
+    def _post(self, func, *args):
+        """从转换线程投递界面更新，由Tk主循环在主线程中执行"""
+        self.root.after(0, func, *args)
     
     def start_conversion(self):
         """开始转换过程"""
@@ -283,128 +217,94 @@ class Photo2PDFGUI:
             messagebox.showwarning("警告", "请选择输出目录")
             return
         
-        # 在新线程中运行转换，避免界面冻结
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.config(state=tk.DISABLED)
+        
+        # 转换在进程池中执行，后台线程只负责分发任务和投递进度事件，避免界面冻结
         self.processing = True
         self.convert_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.engine = ConversionEngine(self.config, lambda event: self._post(self.handle_event, event))
         
-        thread = threading.Thread(target=self.convert_images)
+        thread = threading.Thread(target=self.convert_images,
+                                  args=(self.engine, list(self.selected_files), self.conversion_mode.get()))
         thread.daemon = True
         thread.start()
     
-    def convert_images(self):
-        """执行图像转换"""
+    def cancel_conversion(self):
+        """取消转换：未开始的文件不再处理，正在处理的文件完成后停止"""
+        if self.engine is not None:
+            self.engine.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.update_status("正在取消...")
+    
+    def handle_event(self, event):
+        """显示转换引擎的进度事件"""
+        name = Path(event.image_path).name
+        if event.kind == 'converted':
+            self.log_result(f"✓ {name} -> {Path(event.output_path).name}")
+        elif event.kind == 'page':
+            self.log_result(f"✓ 已加载: {name}")
+        else:
+            self.log_result(f"✗ 转换失败: {name} - {event.error}")
+        self.update_progress(event.current, event.total)
+    
+    def convert_images(self, engine, files, mode):
+        """执行图像转换（在后台线程中运行）"""
         try:
-            self.result_text.config(state=tk.NORMAL)
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.config(state=tk.DISABLED)
-            
             output_dir = Path(self.output_directory.get())
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            if self.conversion_mode.get() == "merge":
+            if mode == "merge":
                 # 合并模式
-                self.update_status("正在合并图像为PDF...")
-                self.merge_images_to_pdf()
+                self._post(self.update_status, "正在合并图像为PDF...")
+                output_file = output_dir / self.config['default_merge_filename']
+                result = engine.merge(files, output_file)
+                if result.cancelled:
+                    summary = "\n转换已取消，未生成合并文件"
+                elif result.processed:
+                    summary = f"\n✓ 成功合并 {result.processed} 个图像到: {output_file.name}"
+                else:
+                    summary = "错误: 没有成功加载任何图像"
             else:
                 # 单独转换模式
-                self.update_status("正在转换图像...")
-                self.convert_individual_images()
+                self._post(self.update_status, "正在转换图像...")
+                tasks = [(image_path, output_dir / f"{Path(image_path).stem}.pdf") for image_path in files]
+                skipped = 0
+                if not self.config['overwrite_existing']:
+                    tasks, skipped = filter_up_to_date(tasks)
+                    if skipped:
+                        self._post(self.log_result, f"跳过 {skipped} 个已是最新的文件")
+                result = engine.convert(tasks)
+                summary = f"\n转换完成! 成功: {result.processed}/{len(tasks)}"
+                if result.cancelled:
+                    summary = f"\n转换已取消，已成功: {result.processed}/{len(tasks)}"
             
-            self.update_status("转换完成")
-            self.progress_var.set(100)
-            messagebox.showinfo("完成", "图像转换完成！")
+            if engine.stats is not None:
+                summary += "\n" + engine.stats.format_summary()
+            self._post(self.finish_conversion, summary, None, result.cancelled)
             
         except Exception as e:
-            self.log_result(f"转换过程中发生错误: {str(e)}")
-            messagebox.showerror("错误", f"转换失败: {str(e)}")
-        
-        finally:
-            self.processing = False
-            self.convert_button.config(state=tk.NORMAL)
-            self.progress_var.set(0)
-    
-    def convert_individual_images(self):
-        """单独转换每个图像"""
-        success_count = 0
-        total_files = len(self.selected_files)
-        
-        for i, image_path in enumerate(self.selected_files):
-            try:
-                # 生成PDF文件路径
-                image_file = Path(image_path)
-                pdf_file = Path(self.output_directory.get()) / f"{image_file.stem}.pdf"
-                
-                # 转换图像
-                if self.convert_single_image(image_path, str(pdf_file)):
-                    success_count += 1
-                    self.log_result(f"✓ {image_file.name} -> {pdf_file.name}")
-                else:
-                    self.log_result(f"✗ 转换失败: {image_file.name}")
-                
-                self.update_progress(i + 1, total_files)
-                
-            except Exception as e:
-                self.log_result(f"✗ 转换失败: {Path(image_path).name} - {str(e)}")
-        
-        self.log_result(f"\n转换完成! 成功: {success_count}/{total_files}")
+            self._post(self.finish_conversion, f"转换过程中发生错误: {str(e)}", e, False)
     
-    def merge_images_to_pdf(self):
-        """将所有图像合并为一个PDF"""
-        try:
-            output_file = Path(self.output_directory.get()) / "merged_images.pdf"
-            images = []
-            
-            total_files = len(self.selected_files)
-            
-            for i, image_path in enumerate(self.selected_files):
-                try:
-                    image = Image.open(image_path)
-                      # 处理图像模式
-                    if image.mode == 'RGBA':
-                        background = Image.new('RGB', image.size, self.config['background_color'])
-                        background.paste(image, mask=image.split()[-1])
-                        image = background
-                    elif image.mode != 'RGB':
-                        image = image.convert('RGB')
-                    
-                    images.append(image)
-                    self.log_result(f"✓ 已加载: {Path(image_path).name}")
-                    self.update_progress(i + 1, total_files)
-                    
-                except Exception as e:
-                    self.log_result(f"✗ 加载失败: {Path(image_path).name} - {str(e)}")
-            
-            if images:                # 保存合并的PDF，使用配置的质量和优化设置
-                images[0].save(str(output_file), "PDF", save_all=True, 
-                             append_images=images[1:], quality=self.config['quality'], optimize=self.config['optimize'])
-                self.log_result(f"\n✓ 成功合并 {len(images)} 个图像到: {output_file.name}")
-            else:
-                self.log_result("错误: 没有成功加载任何图像")
-                
-        except Exception as e:
-            self.log_result(f"合并失败: {str(e)}")
-            raise
-    
-    def convert_single_image(self, image_path, pdf_path):
-        """转换单个图像文件"""
-        try:
-            image = Image.open(image_path)
-              # 处理图像模式
-            if image.mode == 'RGBA':
-                background = Image.new('RGB', image.size, self.config['background_color'])
-                background.paste(image, mask=image.split()[-1])
-                image = background
-            elif image.mode == 'P':
-                image = image.convert('RGB')
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # 保存为PDF，使用配置的质量和优化设置
-            image.save(pdf_path, "PDF", quality=self.config['quality'], optimize=self.config['optimize'])
-            return True
-            
-        except Exception:
-            return False
+    def finish_conversion(self, summary, error, cancelled):
+        """转换结束后恢复界面状态"""
+        self.log_result(summary)
+        self.processing = False
+        self.engine = None
+        self.convert_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_var.set(0)
+        
+        if error is not None:
+            self.update_status("转换失败")
+            messagebox.showerror("错误", f"转换失败: {str(error)}")
+        elif cancelled:
+            self.update_status("转换已取消")
+        else:
+            self.update_status("转换完成")
+            messagebox.showinfo("完成", "图像转换完成！")
 
 
 def main():
@@ -415,4 +315,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 转换在子进程中执行，打包为可执行文件后需要此调用
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,157 @@
+"""
+转换流水线的读取阶段和各阶段统计
+
+流水线分为三个阶段，阶段之间使用有界队列，磁盘读取、CPU编码和输出写入互相重叠：
+- 读取: 后台线程按顺序预读图像文件内容，最多预读read_ahead个文件
+- 编码: 进程池解码、裁剪和编码页面，在途任务数为 进程数×2
+- 写入: 调用线程按原始顺序写入PDF
+
+每个阶段记录处理数、忙碌时间和队列深度：
+- 读取阶段利用率接近100%、编码队列经常为空时，瓶颈在输入存储（USB、网络磁盘），可增大read_ahead
+- 编码阶段利用率接近100%时，瓶颈在CPU，可增加进程数
+- 写入队列经常积压时，瓶颈在输出存储
+"""
+
+import os
+import queue
+import threading
+import time
+
+
+class StageStats:
+    """
+    单个阶段的统计
+
+    - busy: 累计忙碌秒数（编码阶段为所有工作进程之和）
+    - 队列深度在每次取出结果时采样
+    """
+
+    def __init__(self, name, capacity=1):
+        """
+        Args:
+            name (str): 阶段名称
+            capacity (int): 并行度，计算利用率时的分母（编码阶段为进程数）
+        """
+        self.name = name
+        self.capacity = capacity
+        self.items = 0
+        self.busy = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+
+    def add(self, seconds):
+        """记录处理完成的一项及其耗时"""
+        self.items += 1
+        self.busy += seconds
+
+    def sample(self, depth):
+        """记录一次队列深度"""
+        self.depth_total += depth
+        self.depth_samples += 1
+        self.depth_max = max(self.depth_max, depth)
+
+    @property
+    def depth_mean(self):
+        return self.depth_total / self.depth_samples if self.depth_samples else 0.0
+
+    def utilization(self, elapsed):
+        """忙碌时间占 总耗时×并行度 的比例"""
+        if elapsed <= 0:
+            return 0.0
+        return min(1.0, self.busy / (elapsed * self.capacity))
+
+
+class PipelineStats:
+    """一次转换的流水线统计"""
+
+    def __init__(self, workers=1, read_ahead=1):
+        self.read = StageStats('读取')
+        self.encode = StageStats('编码', workers)
+        self.write = StageStats('写入')
+        self.read_ahead = read_ahead
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def stages(self):
+        return self.read, self.encode, self.write
+
+    def format_summary(self):
+        """
+        生成各阶段的统计表
+
+        Returns:
+            str: 多行文本，每个阶段一行
+        """
+        lines = [f"流水线统计: 耗时 {self.elapsed:.2f} 秒, 编码进程 {self.encode.capacity} 个, "
+                 f"预读 {self.read_ahead} 个文件"]
+        for stage in self.stages:
+            lines.append(
+                f"  {stage.name}: {stage.items} 项, 忙碌 {stage.busy:.2f} 秒, "
+                f"利用率 {stage.utilization(self.elapsed):.0%}, "
+                f"队列深度 平均 {stage.depth_mean:.1f} / 最大 {stage.depth_max}"
+            )
+        return '\n'.join(lines)
+
+
+class FileReader(threading.Thread):
+    """
+    读取阶段：按顺序预读文件内容到有界队列
+
+    队列中的每一项为 (文件路径, 文件内容, 错误信息, 文件状态)，全部读完后放入None；
+    文件状态在读取前从已打开的文件取得，与文件内容对应同一版本（增量清单据此记录）；
+    stop被设置后（转换结束或取消）停止读取，不再阻塞在已满的队列上
+    """
+
+    def __init__(self, paths, read_ahead, stats, stop):
+        """
+        Args:
+            paths (list): 文件路径列表
+            read_ahead (int): 最多预读的文件数
+            stats (StageStats): 读取阶段统计
+            stop (threading.Event): 停止信号
+        """
+        super().__init__(name='photo2pdf-reader', daemon=True)
+        self.paths = paths
+        self.stats = stats
+        self.stop = stop
+        self.queue = queue.Queue(maxsize=max(1, read_ahead))
+
+    def run(self):
+        for path in self.paths:
+            if self.stop.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                with open(path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    item = (path, f.read(), None, stat)
+            except OSError as e:
+                item = (path, None, str(e), None)
+            self.stats.add(time.perf_counter() - start)
+            if not self._put(item):
+                return
+        self._put(None)
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, block=True):
+        """
+        取出下一项
+
+        Returns:
+            tuple: (文件路径, 文件内容, 错误信息, 文件状态)；全部读完时为None；
+                block为False且暂无可用项时抛出queue.Empty
+        """
+        return self.queue.get(block)
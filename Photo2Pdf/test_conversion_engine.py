@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试转换引擎的扫描和增量判断（conversion_engine）
+"""
+
+import os
+
+from PIL import Image
+
+from conversion_engine import (
+    ConversionEngine, ConversionManifest, file_digest, filter_up_to_date, load_config, scan_images
+)
+
+SECOND = 1_000_000_000
+
+
+def _touch(path, data=b'image', mtime_ns=None):
+    path.write_bytes(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_scan_images_natural_sort(tmp_path):
+    """自然排序时page2排在page10之前，扩展名忽略大小写"""
+    for name in ('page10.jpg', 'page2.PNG', 'Page1.jpeg', 'notes.txt'):
+        _touch(tmp_path / name)
+
+    names = [p.name for p in scan_images(str(tmp_path), natural_sort=True)]
+    assert names == ['Page1.jpeg', 'page2.PNG', 'page10.jpg']
+
+    names = [p.name for p in scan_images(str(tmp_path))]
+    assert names == ['Page1.jpeg', 'page10.jpg', 'page2.PNG']
+
+
+def test_scan_images_recursive(tmp_path):
+    """递归扫描时串行和并行遍历得到相同的结果"""
+    for sub in ('a', 'b', 'b/c'):
+        (tmp_path / sub).mkdir()
+    for name in ('1.jpg', 'a/2.jpg', 'b/10.png', 'b/c/3.bmp'):
+        _touch(tmp_path / name)
+
+    assert [p.name for p in scan_images(str(tmp_path))] == ['1.jpg']
+    serial = scan_images(str(tmp_path), recursive=True, natural_sort=True)
+    parallel = scan_images(str(tmp_path), recursive=True, natural_sort=True, workers=4)
+    assert serial == parallel
+    assert len(serial) == 4
+
+
+def test_manifest_up_to_date(tmp_path):
+    """清单按 修改时间 -> 大小和修改时间 -> 内容摘要 的顺序判断"""
+    image = _touch(tmp_path / 'a.jpg', b'original', mtime_ns=10 * SECOND)
+    pdf = tmp_path / 'a.pdf'
+    manifest = ConversionManifest(tmp_path)
+
+    # PDF不存在
+    assert not manifest.is_up_to_date(str(image), str(pdf))
+
+    # PDF比源文件新
+    _touch(pdf, b'%PDF', mtime_ns=20 * SECOND)
+    assert manifest.is_up_to_date(str(image), str(pdf))
+
+    # 源文件更新且没有清单记录
+    os.utime(image, ns=(30 * SECOND, 30 * SECOND))
+    assert not manifest.is_up_to_date(str(image), str(pdf))
+
+    # 记录后大小和修改时间一致
+    manifest.record(str(image))
+    assert manifest.is_up_to_date(str(image), str(pdf))
+
+    # 仅修改时间变化、内容不变：无需转换，并更新记录的修改时间
+    os.utime(image, ns=(40 * SECOND, 40 * SECOND))
+    manifest.changed = False
+    assert manifest.is_up_to_date(str(image), str(pdf))
+    assert manifest.entries[str(image)]['mtime_ns'] == 40 * SECOND
+    assert manifest.changed
+
+    # 大小相同但内容变化
+    _touch(image, b'modified', mtime_ns=50 * SECOND)
+    assert not manifest.is_up_to_date(str(image), str(pdf))
+
+    # 大小变化
+    _touch(image, b'longer content', mtime_ns=60 * SECOND)
+    assert not manifest.is_up_to_date(str(image), str(pdf))
+
+
+def test_manifest_save_and_reload(tmp_path):
+    """清单保存后可重新加载，未修改时不写盘"""
+    image = _touch(tmp_path / 'a.jpg', mtime_ns=10 * SECOND)
+    manifest = ConversionManifest(tmp_path)
+    manifest.save()
+    assert not manifest.path.exists()
+
+    manifest.record(str(image))
+    manifest.save()
+    assert not manifest.changed
+    assert ConversionManifest(tmp_path).entries == manifest.entries
+
+    manifest.path.write_text('{broken', encoding='utf-8')
+    assert ConversionManifest(tmp_path).entries == {}
+
+
+def test_filter_up_to_date(tmp_path):
+    """无清单时只比较修改时间"""
+    old = _touch(tmp_path / 'old.jpg', mtime_ns=10 * SECOND)
+    new = _touch(tmp_path / 'new.jpg', mtime_ns=30 * SECOND)
+    missing = _touch(tmp_path / 'missing.jpg', mtime_ns=10 * SECOND)
+    _touch(tmp_path / 'old.pdf', mtime_ns=20 * SECOND)
+    _touch(tmp_path / 'new.pdf', mtime_ns=20 * SECOND)
+
+    tasks = [(image, image.with_suffix('.pdf')) for image in (old, new, missing)]
+    pending, skipped = filter_up_to_date(tasks)
+    assert skipped == 1
+    assert [image for image, _ in pending] == [new, missing]
+
+    manifest = ConversionManifest(tmp_path)
+    assert filter_up_to_date(tasks, manifest) == (pending, 1)
+
+
+def test_manifest_records_the_converted_version(tmp_path):
+    """记录读取时的内容和状态：转换期间源文件被修改时，下次运行仍会重新转换"""
+    image = _touch(tmp_path / 'a.jpg', b'original', mtime_ns=10 * SECOND)
+    pdf = _touch(tmp_path / 'a.pdf', b'%PDF', mtime_ns=5 * SECOND)
+    read_stat = os.stat(image)
+
+    # 转换期间源文件被替换为同样大小的新内容
+    _touch(image, b'modified', mtime_ns=11 * SECOND)
+    manifest = ConversionManifest(tmp_path)
+    manifest.record(str(image), b'original', read_stat)
+
+    assert manifest.entries[str(image)]['mtime_ns'] == 10 * SECOND
+    assert not manifest.is_up_to_date(str(image), str(pdf))
+
+
+def test_engine_records_digest_of_read_bytes(tmp_path):
+    """转换引擎使用读取阶段的内容记录清单，与重新读取文件得到的摘要一致"""
+    config = load_config(str(tmp_path / 'missing.ini'))
+    config['max_concurrent_files'] = 1
+    tasks = []
+    for i in range(3):
+        image = tmp_path / f'{i}.png'
+        Image.new('RGB', (8, 8), (i * 40, 0, 0)).save(image)
+        tasks.append((image, tmp_path / f'{i}.pdf'))
+
+    manifest = ConversionManifest(tmp_path)
+    result = ConversionEngine(config).convert(tasks, manifest)
+
+    assert result.processed == 3
+    for image, pdf in tasks:
+        entry = manifest.entries[str(image)]
+        assert entry['digest'] == file_digest(image)
+        assert entry['size'] == image.stat().st_size
+        assert pdf.exists()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式PDF写入器（pdf_stream）
+"""
+
+import re
+
+from PIL import Image
+
+from pdf_stream import StreamingPDFWriter, encode_ccitt, encode_flate, encode_jpeg
+
+
+def _write_sample(path):
+    """写入JPEG、Flate和CCITT三种页面"""
+    photo = Image.new('RGB', (40, 30), (200, 100, 50))
+    gray = Image.new('L', (20, 20), 128)
+    bilevel = Image.new('1', (64, 8), 1)
+
+    with StreamingPDFWriter(str(path)) as writer:
+        data, color_space, width, height = encode_jpeg(photo, quality=90)
+        writer.add_encoded_image(data, width, height, color_space)
+
+        data, color_space, bits, parms = encode_flate(gray)
+        writer.add_encoded_image(data, 20, 20, color_space, 'FlateDecode',
+                                 bits_per_component=bits, decode_parms=parms)
+
+        # Pillow未编译libtiff时与转换引擎一样改用Flate
+        ccitt = encode_ccitt(bilevel)
+        if ccitt is not None:
+            data, parms = ccitt
+            writer.add_encoded_image(data, 64, 8, 'DeviceGray', 'CCITTFaxDecode',
+                                     page_size=(128, 16), bits_per_component=1, decode_parms=parms)
+        else:
+            data, color_space, bits, parms = encode_flate(bilevel)
+            writer.add_encoded_image(data, 64, 8, color_space, 'FlateDecode',
+                                     page_size=(128, 16), bits_per_component=bits, decode_parms=parms)
+    return writer
+
+
+def test_xref_offsets_point_at_objects(tmp_path):
+    """交叉引用表中的每个偏移都指向对应的对象头"""
+    pdf_path = tmp_path / 'out.pdf'
+    writer = _write_sample(pdf_path)
+    pdf = pdf_path.read_bytes()
+
+    startxref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', pdf).group(1))
+    assert pdf[startxref:].startswith(b'xref\n')
+
+    xref = pdf[startxref:].split(b'trailer')[0].decode('ascii').splitlines()
+    first, size = map(int, xref[1].split())
+    assert first == 0
+    entries = xref[2:]
+    assert len(entries) == size == 3 + 3 * writer.page_count
+    assert entries[0] == '0000000000 65535 f '
+
+    for obj_id, entry in enumerate(entries[1:], start=1):
+        offset, generation, kind = entry.split()
+        assert len(entry) == 19 and kind == 'n' and generation == '00000'
+        assert pdf[int(offset):].startswith(f'{obj_id} 0 obj\n'.encode('ascii'))
+
+    assert f'<< /Size {size} /Root 1 0 R >>'.encode('ascii') in pdf
+
+
+def test_page_tree_and_media_box(tmp_path):
+    """页面树按添加顺序列出页面，page_size决定页面尺寸"""
+    pdf_path = tmp_path / 'out.pdf'
+    writer = _write_sample(pdf_path)
+    pdf = pdf_path.read_bytes()
+
+    assert writer.page_count == 3
+    assert b'/Kids [5 0 R 8 0 R 11 0 R] /Count 3' in pdf
+    assert b'/MediaBox [0 0 40.0000 30.0000]' in pdf
+    assert b'/MediaBox [0 0 128.0000 16.0000]' in pdf
+    assert b'/Width 64 /Height 8' in pdf
+
+
+def test_abort_removes_partial_file(tmp_path):
+    """写入过程中出错时删除不完整的输出文件"""
+    pdf_path = tmp_path / 'out.pdf'
+    try:
+        with StreamingPDFWriter(str(pdf_path)) as writer:
+            writer.add_encoded_image(b'data', 1, 1)
+            raise RuntimeError('中断')
+    except RuntimeError:
+        pass
+    assert not pdf_path.exists()
@@ -0,0 +1,318 @@
+"""
+转换器性能基准测试
+
+测量内容：
+- scan_folder: 目录扫描吞吐量
+- FileHandler.add_folder: 扫描并加入文件列表的吞吐量
+- Converter.convert_files: 不同引擎参数（线程数、提交窗口、输出模式）下的
+  吞吐量（文件/秒、MB/秒）、单文件转换延迟分位数（p50/p90/p99）
+- 每次测量的峰值内存（RSS）
+
+合成代码库：
+- 按指定的文件数量、大小分布（fixed/uniform/lognormal）和语言生成目录树
+- 可按比例生成内容重复的文件，用于衡量去重效果
+- 固定随机种子，多次运行生成完全相同的代码库
+
+隔离策略：
+- 每次测量都在全新的子进程中执行，峰值内存互不影响
+- 同一配置重复测量多次，汇总中位数、最小值和最大值
+
+使用示例：
+    python -m benchmarks.converter_benchmark --files 5000 --workers 1,4,8 --chunk-sizes 10,50,200
+    python -m benchmarks.converter_benchmark --modes plain,minify,outline --output result.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块，峰值内存记录为None
+    resource = None
+
+SIZE_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+MODES = ('plain', 'minify', 'outline', 'gzip')
+
+# 每种语言的扩展名和代码片段，{i}替换为序号
+_SNIPPETS = {
+    'python': ('.py', '# helper {i}\ndef func_{i}(value: int) -> int:\n'
+                      '    """Return value plus {i}."""\n    return value + {i}\n\n'),
+    'javascript': ('.js', '// helper {i}\nexport function func{i}(value) {{\n'
+                          '  return value + {i};\n}}\n\n'),
+    'go': ('.go', '// Func{i} adds {i}.\nfunc Func{i}(v int) int {{\n\treturn v + {i}\n}}\n\n'),
+    'java': ('.java', '    /** Adds {i}. */\n    public static int func{i}(int v) {{\n'
+                      '        return v + {i};\n    }}\n\n'),
+    'markdown': ('.md', '## Section {i}\n\nSome text for section {i}.\n\n'),
+}
+
+
+def _peak_rss_mb(who: int = 0) -> Optional[float]:
+    """峰值内存（MB），who为resource.RUSAGE_SELF或RUSAGE_CHILDREN"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who or resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 2)
+
+
+def _percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': round(ordered[-1], 3)}
+
+
+def _sample_size(rng: random.Random, distribution: str, mean: int) -> int:
+    if distribution == 'fixed':
+        return mean
+    if distribution == 'uniform':
+        return rng.randint(1, mean * 2)
+    # 对数正态：多数文件较小，少数文件很大，接近真实代码库
+    return max(1, int(rng.lognormvariate(0, 1) * mean / 1.65))
+
+
+def generate_tree(root: str, file_count: int, languages: List[str], distribution: str = 'lognormal',
+                  mean_size: int = 4096, duplicate_ratio: float = 0.0, seed: int = 0) -> Dict:
+    """
+    生成合成代码库
+
+    - 每个子目录最多100个文件，两级目录结构
+    - duplicate_ratio比例的文件复制已生成文件的内容
+    - 返回生成统计（文件数、总字节数）
+    """
+    rng = random.Random(seed)
+    total_bytes = 0
+    generated: List[str] = []
+
+    for i in range(file_count):
+        language = languages[i % len(languages)]
+        ext, snippet = _SNIPPETS[language]
+        directory = os.path.join(root, f"pkg_{i // 10000:02d}", f"mod_{i // 100:04d}")
+        os.makedirs(directory, exist_ok=True)
+
+        if generated and rng.random() < duplicate_ratio:
+            content = generated[rng.randrange(len(generated))]
+        else:
+            target = _sample_size(rng, distribution, mean_size)
+            parts = []
+            size = 0
+            n = 0
+            while size < target:
+                part = snippet.format(i=i * 1000 + n)
+                parts.append(part)
+                size += len(part)
+                n += 1
+            content = ''.join(parts)
+            if len(generated) < 1000:
+                generated.append(content)
+
+        with open(os.path.join(directory, f"file_{i:06d}{ext}"), 'w', encoding='utf-8') as f:
+            f.write(content)
+        total_bytes += len(content.encode('utf-8'))
+
+    return {'files': file_count, 'bytes': total_bytes}
+
+
+def run_child(config: Dict) -> Dict:
+    """子进程内执行一次测量"""
+    sys.path.insert(0, PROJECT_ROOT)
+    stage = config['stage']
+    root = config['root']
+    result = {'stage': stage}
+
+    if stage == 'scan':
+        from core.file_handler import scan_folder
+        start = time.perf_counter()
+        count = sum(1 for _ in scan_folder(root, True))
+        result['elapsed_s'] = time.perf_counter() - start
+        result['files'] = count
+
+    elif stage == 'add_folder':
+        from core.file_handler import FileHandler
+        start = time.perf_counter()
+        count = FileHandler().add_folder(root, True)
+        result['elapsed_s'] = time.perf_counter() - start
+        result['files'] = count
+
+    else:
+        from core.converter import Converter
+        from core.file_handler import FileInfo, scan_folder
+
+        latencies: List[float] = []
+
+        class TimedConverter(Converter):
+            """记录每个文件的转换耗时"""
+
+            def _convert_entry(self, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return super()._convert_entry(*args, **kwargs)
+                finally:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        files = [FileInfo(path=p, marked=True) for p in sorted(scan_folder(root, True))]
+        converter = TimedConverter(max_workers=config['workers'])
+        converter.chunk_size = config['chunk_size']
+        converter.set_output_directory(root)
+        converter.dedupe = config.get('dedupe', True)
+        mode = config.get('mode', 'plain')
+        converter.minify = mode == 'minify'
+        converter.outline = mode == 'outline'
+        converter.compression = 'gzip' if mode == 'gzip' else None
+
+        start = time.perf_counter()
+        outcome = converter.convert_files(files, config['output'])
+        result['elapsed_s'] = time.perf_counter() - start
+        result['files'] = outcome['converted']
+        result['output_bytes'] = sum(os.path.getsize(p) for p in outcome['outputs'])
+        result['latency_ms'] = _percentiles(latencies)
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    if resource is not None and config.get('mode') == 'outline':
+        # 大纲模式的解析在工作进程中执行，单独记录工作进程的峰值内存
+        result['peak_rss_children_mb'] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return result
+
+
+def _run_once(config: Dict) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', json.dumps(config)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples: List[Dict], input_bytes: int) -> Dict:
+    elapsed = [s['elapsed_s'] for s in samples]
+    median = statistics.median(elapsed)
+    files = samples[0]['files']
+    summary = {
+        'elapsed_s': {
+            'median': round(median, 4),
+            'min': round(min(elapsed), 4),
+            'max': round(max(elapsed), 4)
+        },
+        'files_per_s': round(files / median, 1) if median else None,
+        'mb_per_s': round(input_bytes / 1024 / 1024 / median, 2) if median else None,
+        'peak_rss_mb': max((s['peak_rss_mb'] for s in samples if s['peak_rss_mb'] is not None),
+                           default=None)
+    }
+    if 'latency_ms' in samples[0]:
+        # 取耗时中位数那次测量的延迟分布
+        summary['latency_ms'] = min(samples, key=lambda s: abs(s['elapsed_s'] - median))['latency_ms']
+        summary['output_bytes'] = samples[0]['output_bytes']
+    return summary
+
+
+def run_benchmark(args) -> Dict:
+    results = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'cpu_count': os.cpu_count(),
+        'tree': {
+            'files': args.files,
+            'languages': args.languages,
+            'distribution': args.distribution,
+            'mean_size': args.mean_size,
+            'duplicate_ratio': args.duplicate_ratio,
+            'seed': args.seed
+        },
+        'runs': args.runs,
+        'stages': []
+    }
+
+    with tempfile.TemporaryDirectory(prefix='pyw2md_convert_') as tmp:
+        root = os.path.join(tmp, 'repo')
+        tree = generate_tree(root, args.files, args.languages, args.distribution,
+                             args.mean_size, args.duplicate_ratio, args.seed)
+        results['tree']['bytes'] = tree['bytes']
+
+        configs = [{'stage': 'scan'}, {'stage': 'add_folder'}]
+        for mode in args.modes:
+            for workers in args.workers:
+                for chunk_size in args.chunk_sizes:
+                    configs.append({
+                        'stage': 'convert',
+                        'mode': mode,
+                        'workers': workers,
+                        'chunk_size': chunk_size,
+                        'dedupe': not args.no_dedup
+                    })
+
+        for config in configs:
+            config['root'] = root
+            config['output'] = os.path.join(tmp, 'bundle.md')
+            samples = [_run_once(config) for _ in range(args.runs)]
+            entry = {k: v for k, v in config.items() if k not in ('root', 'output')}
+            entry['summary'] = _summarize(samples, tree['bytes'])
+            entry['samples'] = samples
+            results['stages'].append(entry)
+
+    return results
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(v) for v in text.split(',') if v]
+
+
+def _str_list(choices):
+    def parse(text: str) -> List[str]:
+        values = [v for v in text.split(',') if v]
+        for value in values:
+            if value not in choices:
+                raise argparse.ArgumentTypeError(f"无效取值 {value}，可选: {', '.join(choices)}")
+        return values
+    return parse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='pyw2md 转换器性能基准测试')
+    parser.add_argument('--files', type=int, default=2000, help='合成代码库的文件数量')
+    parser.add_argument('--languages', type=_str_list(tuple(_SNIPPETS)),
+                        default=['python', 'javascript', 'go', 'java'], help='逗号分隔的语言列表')
+    parser.add_argument('--distribution', choices=SIZE_DISTRIBUTIONS, default='lognormal',
+                        help='文件大小分布')
+    parser.add_argument('--mean-size', type=int, default=4096, help='平均文件大小（字节）')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.0, help='内容重复文件的比例')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--workers', type=_int_list, default=[4], help='逗号分隔的线程数列表')
+    parser.add_argument('--chunk-sizes', type=_int_list, default=[50], help='逗号分隔的提交窗口列表')
+    parser.add_argument('--modes', type=_str_list(MODES), default=['plain'], help='逗号分隔的输出模式')
+    parser.add_argument('--no-dedup', action='store_true', help='关闭内容去重')
+    parser.add_argument('--runs', type=int, default=3, help='每种配置的测量次数')
+    parser.add_argument('--output', help='结果JSON输出路径，默认输出到标准输出')
+    parser.add_argument('--child', metavar='CONFIG', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return 0
+
+    results = run_benchmark(args)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
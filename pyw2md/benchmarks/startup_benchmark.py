@@ -0,0 +1,211 @@
+"""
+启动性能基准测试
+
+测量内容：
+- 入口模块导入耗时（main / ui.app），以及延迟到首次绘制后的文件监控模块导入耗时
+- 文件列表恢复耗时：会话索引快照（session）、批量stat + add_stat_entries（pipeline）
+  与旧的逐个add_file流程（legacy）对比；session模式另外记录后台快照校验耗时
+- 进程总耗时（包含解释器启动）
+
+冷启动策略：
+- 每次测量都在全新的子进程中执行，模块导入不受进程内缓存影响
+- 测试文件在临时目录中新建
+- 指定 --drop-caches 时在每次测量前同步并清空系统页缓存（Linux，需要root权限），
+  结果中的 cache_dropped 字段记录是否清空成功
+
+使用示例：
+    python -m benchmarks.startup_benchmark --files 5000 --runs 5 --drop-caches
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _timed_import(module: str):
+    """导入模块并返回耗时（毫秒），依赖缺失时返回None"""
+    start = time.perf_counter()
+    try:
+        __import__(module)
+    except ImportError:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def _legacy_restore(paths: List[str]):
+    """旧版启动恢复流程：逐个exists + add_file（线性查重，多次stat）"""
+    from core.file_handler import FileInfo
+
+    files = []
+    for path in paths:
+        if os.path.exists(path) and os.path.isfile(path):
+            if any(f.path == path for f in files):
+                continue
+            info = FileInfo(path=path)
+            info._cached_size = os.path.getsize(path)
+            info._cached_mtime = os.path.getmtime(path)
+            files.append(info)
+    return files
+
+
+def run_child(mode: str, list_file: str) -> Dict:
+    """子进程内执行一次测量"""
+    sys.path.insert(0, PROJECT_ROOT)
+    result = {'mode': mode}
+
+    result['import_main_ms'] = _timed_import('main')
+    result['import_ui_ms'] = _timed_import('ui.app')
+
+    with open(list_file, 'r', encoding='utf-8') as f:
+        paths = json.load(f)
+
+    start = time.perf_counter()
+    if mode == 'legacy':
+        count = len(_legacy_restore(paths))
+    elif mode == 'session':
+        from config.session_store import SessionStore
+        from core.file_handler import FileHandler, validate_snapshot
+        snapshot = SessionStore(os.path.join(os.path.dirname(list_file), 'session.db')).load()
+        count = FileHandler().add_file_infos(snapshot)
+        result['restore_ms'] = (time.perf_counter() - start) * 1000
+        validate_start = time.perf_counter()
+        validate_snapshot((f.path, f._cached_size, f._cached_mtime) for f in snapshot)
+        result['background_validate_ms'] = (time.perf_counter() - validate_start) * 1000
+    else:
+        from core.file_handler import FileHandler, stat_paths
+        stat_start = time.perf_counter()
+        entries = stat_paths(paths)
+        result['stat_ms'] = (time.perf_counter() - stat_start) * 1000
+        count = FileHandler().add_stat_entries(entries)
+    result.setdefault('restore_ms', (time.perf_counter() - start) * 1000)
+    result['restored_files'] = count
+
+    # 首次绘制后才导入的模块
+    result['deferred_import_ms'] = _timed_import('core.file_watcher')
+    return result
+
+
+def drop_page_cache() -> bool:
+    """清空系统页缓存，成功返回True"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return True
+    except OSError:
+        return False
+
+
+def create_files(directory: str, count: int) -> List[str]:
+    """在临时目录中生成测试文件，每个子目录100个文件"""
+    paths = []
+    for i in range(count):
+        sub = os.path.join(directory, f"pkg_{i // 100:04d}")
+        os.makedirs(sub, exist_ok=True)
+        path = os.path.join(sub, f"module_{i:06d}.py")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"def func_{i}():\n    return {i}\n")
+        paths.append(path)
+    return paths
+
+
+def _write_session(db_file: str, paths: List[str]):
+    """生成会话索引，供session模式读取"""
+    sys.path.insert(0, PROJECT_ROOT)
+    from config.session_store import SessionStore
+    from core.file_handler import FileHandler, stat_paths
+
+    handler = FileHandler()
+    handler.add_stat_entries(stat_paths(paths))
+    SessionStore(db_file).save(handler.files)
+
+
+def _summarize(samples: List[Dict]) -> Dict:
+    summary = {}
+    keys = [k for k, v in samples[0].items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and k != 'restored_files']
+    for key in keys:
+        values = [s[key] for s in samples if s.get(key) is not None]
+        if values:
+            summary[key] = {
+                'median': round(statistics.median(values), 3),
+                'min': round(min(values), 3),
+                'max': round(max(values), 3)
+            }
+    return summary
+
+
+def run_benchmark(file_count: int, runs: int, drop_caches: bool) -> Dict:
+    results = {
+        'files': file_count,
+        'runs': runs,
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'modes': {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix='pyw2md_startup_') as tmp:
+        paths = create_files(os.path.join(tmp, 'src'), file_count)
+        list_file = os.path.join(tmp, 'recent_files.json')
+        with open(list_file, 'w', encoding='utf-8') as f:
+            json.dump(paths, f)
+        _write_session(os.path.join(tmp, 'session.db'), paths)
+
+        for mode in ('session', 'pipeline', 'legacy'):
+            samples = []
+            for _ in range(runs):
+                dropped = drop_page_cache() if drop_caches else False
+                start = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', mode, list_file],
+                    cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+                )
+                sample = json.loads(proc.stdout.strip().splitlines()[-1])
+                sample['process_wall_ms'] = (time.perf_counter() - start) * 1000
+                sample['cache_dropped'] = dropped
+                samples.append(sample)
+
+            results['modes'][mode] = {
+                'cache_dropped': all(s['cache_dropped'] for s in samples),
+                'summary': _summarize(samples),
+                'samples': samples
+            }
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='pyw2md 启动性能基准测试')
+    parser.add_argument('--files', type=int, default=2000, help='最近文件列表中的文件数量')
+    parser.add_argument('--runs', type=int, default=5, help='每种模式的测量次数')
+    parser.add_argument('--drop-caches', action='store_true', help='每次测量前清空系统页缓存')
+    parser.add_argument('--output', help='结果JSON输出路径，默认输出到标准输出')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'LIST_FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return 0
+
+    results = run_benchmark(args.files, args.runs, args.drop_caches)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
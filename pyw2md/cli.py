@@ -0,0 +1,160 @@
+"""
+代码转Markdown工具 - 命令行入口
+
+设计思路：
+- 无界面运行，只导入core层模块，不加载CustomTkinter等UI依赖
+- 单任务模式：直接通过参数指定根目录、筛选规则、模板和输出文件
+- 批处理模式：从JSON任务文件加载多个导出任务并发执行
+- 退出码反映执行结果，便于在CI流水线中使用
+
+使用示例：
+    python cli.py src tests -i "*.py" -e "*/migrations/*" -o bundle.md
+    python cli.py --jobs jobs.json --workers 16 --parallel-jobs 8
+    python main.py cli --list-templates
+    python cli.py src -o bundle.md --trace bundle.trace.json
+    python cli.py src -o bundle.md --resume   # 中断后从断点继续
+"""
+
+import sys
+import argparse
+import logging
+from typing import List, Optional
+
+from core.converter import get_available_template_names
+from core.token_budget import BUDGET_STRATEGIES
+from core.compression import COMPRESSIONS
+from core.tracing import TRACER
+from core.batch_export import BatchExporter, ExportJob, load_job_file
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='pyw2md',
+        description='代码转Markdown工具 - 命令行模式'
+    )
+    parser.add_argument('roots', nargs='*', help='要扫描的目录或文件')
+    parser.add_argument('-o', '--output', help='输出Markdown文件路径')
+    parser.add_argument('-i', '--include', action='append', default=[], metavar='GLOB',
+                        help='包含规则，可多次指定，例如 "*.py"')
+    parser.add_argument('-e', '--exclude', action='append', default=[], metavar='GLOB',
+                        help='排除规则，可多次指定，例如 "*/node_modules/*"')
+    parser.add_argument('-t', '--template', default='默认', choices=get_available_template_names(),
+                        help='Markdown模板名称')
+    parser.add_argument('--no-recursive', action='store_true', help='不递归扫描子目录')
+    parser.add_argument('--max-tokens', type=int, default=0,
+                        help='Token预算上限，超出时挑选并截断文件（0表示不限制）')
+    parser.add_argument('--budget-strategy', default='original', choices=BUDGET_STRATEGIES,
+                        help='预算装入策略：original按原顺序，smallest_first优先装入小文件')
+    parser.add_argument('--minify', action='store_true',
+                        help='剔除注释、文档字符串和空行，缩减输出体积')
+    parser.add_argument('--outline', action='store_true',
+                        help='大纲模式：只输出类和函数签名及说明首行，适合超大代码库')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='不对相同内容的文件去重，每个文件都完整输出')
+    parser.add_argument('--shard-bytes', type=int, default=0, metavar='N',
+                        help='按字节数切分输出，-o指定的文件作为分片索引（0表示不分片）')
+    parser.add_argument('--shard-tokens', type=int, default=0, metavar='N',
+                        help='按估算Token数切分输出')
+    parser.add_argument('--shard-files', type=int, default=0, metavar='N',
+                        help='按文件数切分输出')
+    parser.add_argument('--compress', choices=COMPRESSIONS, default=None,
+                        help='流式压缩输出（zstd需要安装zstandard），文件名自动追加.gz/.zst')
+    parser.add_argument('--jobs', metavar='FILE', help='JSON任务文件，批量执行多个导出任务')
+    parser.add_argument('--workers', type=int, default=None, help='共享工作线程数')
+    parser.add_argument('--parallel-jobs', type=int, default=4, help='同时执行的任务数')
+    parser.add_argument('--resume', action='store_true',
+                        help='输出文件存在断点时从中断处继续（仅单文件、未压缩输出）')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='记录扫描、转换和写入的耗时，导出Chrome Trace JSON（chrome://tracing或Perfetto打开）')
+    parser.add_argument('--list-templates', action='store_true', help='列出可用模板')
+    parser.add_argument('-q', '--quiet', action='store_true', help='只输出错误信息')
+    return parser
+
+
+def _build_jobs(args, parser) -> List[ExportJob]:
+    jobs: List[ExportJob] = []
+
+    if args.jobs:
+        try:
+            jobs.extend(load_job_file(args.jobs))
+        except (OSError, ValueError) as e:
+            parser.error(f"无法加载任务文件 {args.jobs}: {e}")
+
+    if args.roots:
+        if not args.output:
+            parser.error("指定根目录时必须提供 -o/--output")
+        jobs.append(ExportJob(
+            roots=args.roots,
+            output=args.output,
+            include=args.include,
+            exclude=args.exclude,
+            template=args.template,
+            recursive=not args.no_recursive,
+            max_tokens=args.max_tokens,
+            budget_strategy=args.budget_strategy,
+            minify=args.minify,
+            outline=args.outline,
+            shard_bytes=args.shard_bytes,
+            shard_tokens=args.shard_tokens,
+            shard_files=args.shard_files,
+            compression=args.compress
+        ))
+
+    if not jobs:
+        parser.error("请指定要扫描的根目录或 --jobs 任务文件")
+    return jobs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回进程退出码"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_templates:
+        for name in get_available_template_names():
+            print(name)
+        return 0
+
+    logging.basicConfig(
+        level=logging.ERROR if args.quiet else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    jobs = _build_jobs(args, parser)
+    TRACER.enabled = bool(args.trace)
+    exporter = BatchExporter(max_workers=args.workers, parallel_jobs=args.parallel_jobs,
+                             dedupe=not args.no_dedup, resume=args.resume)
+    try:
+        results = exporter.run(jobs)
+    except KeyboardInterrupt:
+        print("已取消，断点已保存，使用 --resume 重新执行可从中断处继续", file=sys.stderr)
+        return 130
+
+    failed = 0
+    for result in results:
+        if result['success']:
+            if not args.quiet:
+                print(f"✓ [{result['job']}] {result['message']} -> {result['output']}")
+                if result.get('duplicates'):
+                    print(f"  去重: {result['duplicates']} 个重复文件以引用形式输出")
+                if 'budget' in result:
+                    budget = result['budget']
+                    print(f"  Token: {budget['used_tokens']}/{budget['max_tokens']}，"
+                          f"截断 {budget['truncated']}，跳过 {budget['skipped']}")
+        else:
+            failed += 1
+            print(f"✗ [{result['job']}] {result['message']}", file=sys.stderr)
+
+    if not args.quiet:
+        print(f"完成 {len(results) - failed}/{len(results)} 个导出任务")
+
+    if args.trace:
+        TRACER.export_chrome_trace(args.trace)
+        if not args.quiet:
+            print(f"追踪: {TRACER.event_count} 个区间 -> {args.trace}")
+            print(f"  {TRACER.format_summary(top=5)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
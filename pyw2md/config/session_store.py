@@ -0,0 +1,111 @@
+"""
+会话索引 - 文件列表持久化
+
+设计思路：
+- 使用标准库sqlite3存储完整文件列表，不再受recent_files数量上限约束
+- 每个文件保存路径、选中状态、语言和stat快照（大小、修改时间）
+- 恢复时直接使用快照构建文件列表，不访问磁盘，数万文件也能立即显示
+- 快照在首次使用时（启动后后台线程）再统一校验，移除失效文件并更新变化的文件
+
+存储位置：
+- 与配置文件位于同一目录，文件名默认为session.db
+"""
+
+import os
+import sqlite3
+import logging
+from typing import Iterable, List
+
+from core.file_handler import FileInfo
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+
+class SessionStore:
+    """会话索引管理器"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+
+    @classmethod
+    def for_settings(cls, settings, filename: str = "session.db") -> 'SessionStore':
+        """在配置文件所在目录创建会话索引"""
+        config_dir = os.path.dirname(os.path.abspath(settings.config_file))
+        return cls(os.path.join(config_dir, filename))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " position INTEGER PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " marked INTEGER NOT NULL,"
+            " language TEXT,"
+            " size INTEGER,"
+            " mtime REAL)"
+        )
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_file)
+
+    def load(self) -> List[FileInfo]:
+        """
+        读取会话快照
+
+        返回按原顺序排列的FileInfo列表，缓存字段来自快照，未经磁盘校验。
+        索引损坏时记录日志并返回空列表。
+        """
+        if not self.exists():
+            return []
+
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT path, marked, language, size, mtime FROM files ORDER BY position"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"读取会话索引失败: {e}")
+            return []
+
+        return [
+            FileInfo(
+                path=path,
+                marked=bool(marked),
+                _cached_size=size,
+                _cached_mtime=mtime,
+                _cached_language=language
+            )
+            for path, marked, language, size, mtime in rows
+        ]
+
+    def save(self, files: Iterable[FileInfo]) -> bool:
+        """在单个事务中整体替换会话快照"""
+        rows = [
+            (i, f.path, int(f.marked), f.language, f._cached_size, f._cached_mtime)
+            for i, f in enumerate(files)
+        ]
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM files")
+                    conn.executemany(
+                        "INSERT INTO files (position, path, marked, language, size, mtime)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+            finally:
+                conn.close()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"保存会话索引失败: {e}")
+            return False
@@ -1,16 +1,33 @@
 """
 应用配置管理
+
+持久化策略：
+- save() 只登记保存请求，由后台防抖器合并短时间内的多次请求后统一写盘
+- 写盘采用临时文件 + 原子替换，进程中断不会留下半截的配置文件
+- 序列化结果与上次写入内容相同时跳过写盘
+- get/set 复制嵌套的字典和列表；写盘前在锁内深拷贝一份快照，
+  后台序列化时调用方的修改不会与之交错
+- 退出时调用 flush() 同步写入尚未落盘的修改
 """
 
+import copy
 import json
 import os
 import sys
-from typing import Dict, Any
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+from utils.debouncer import SimpleDebouncer
+
+# 保存请求合并窗口（秒）
+SAVE_DEBOUNCE_SECONDS = 0.5
+
 
 class Settings:
     """配置管理器"""
 
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", save_delay: float = SAVE_DEBOUNCE_SECONDS):
         # 检测是否为打包环境
         if hasattr(sys, '_MEIPASS'):
             # 打包环境下，配置文件放在用户数据目录
@@ -22,37 +39,92 @@ class Settings:
             self.config_file = config_file
 
         self.config: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # 串行化写盘，保证后写入的快照不会被先写入的覆盖
+        self._last_written: Optional[str] = None  # 最近一次写入（或读取）的序列化内容
+        self._save_debouncer = SimpleDebouncer(self.flush, delay=save_delay)
         self.load()
 
     def load(self):
         """加载配置"""
         if not os.path.exists(self.config_file):
             self.config = self._default_config()
-            self.save()
+            self.flush()
             return
 
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
+            self._last_written = self._serialize(self.config)
         except Exception as e:
             print(f"加载配置失败: {e}")
             self.config = self._default_config()
 
     def save(self):
-        """保存配置"""
+        """请求保存配置（后台合并写入，不阻塞调用线程）"""
+        self._save_debouncer.schedule()
+
+    def flush(self) -> bool:
+        """
+        立即写入配置
+
+        返回值：
+        - True: 内容有变化并已写入
+        - False: 内容未变化或写入失败
+        """
+        self._save_debouncer.cancel()
+
+        with self._write_lock:
+            with self._lock:
+                snapshot = copy.deepcopy(self.config)
+            data = self._serialize(snapshot)
+            if data == self._last_written:
+                return False
+
+            try:
+                self._atomic_write(data)
+                self._last_written = data
+                return True
+            except Exception as e:
+                print(f"保存配置失败: {e}")
+                return False
+
+    @staticmethod
+    def _serialize(config: Dict[str, Any]) -> str:
+        return json.dumps(config, indent=2, ensure_ascii=False)
+
+    def _atomic_write(self, data: str):
+        """写入同目录临时文件后原子替换目标文件"""
+        config_dir = os.path.dirname(os.path.abspath(self.config_file))
+        fd, tmp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=config_dir)
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
 
     def get(self, key: str, default=None):
-        """获取配置项"""
-        return self.config.get(key, default)
+        """获取配置项（嵌套的字典和列表返回副本）"""
+        with self._lock:
+            return copy.deepcopy(self.config.get(key, default))
 
     def set(self, key: str, value: Any):
-        """设置配置项"""
-        self.config[key] = value
+        """设置配置项（保存副本，调用方之后的修改不影响配置）"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self.config[key] = value
+
+    def remove(self, key: str):
+        """删除配置项"""
+        with self._lock:
+            self.config.pop(key, None)
 
     def _default_config(self) -> Dict[str, Any]:
         """默认配置"""
@@ -64,10 +136,22 @@ class Settings:
                 "min_height": 600
             },
             "template": "默认",
-            "recent_files": [],
-            "max_recent_files": 50,
             "auto_save_config": True,
             "preview_max_files": 5,
+            "token_budget": {  # LLM上下文Token预算
+                "max_tokens": 0,  # 0表示不限制
+                "strategy": "original"  # original / smallest_first
+            },
+            "dedupe_content": True,  # 相同内容的文件只输出一次，其余输出为引用
+            "minify_content": False,  # 剔除注释、文档字符串和空行，缩减LLM上下文
+            "outline_mode": False,  # 大纲模式：只输出声明签名，适合超大代码库
+            "output_compression": "",  # 输出压缩格式：空字符串不压缩 / gzip / zstd
+            "sharding": {  # 分片输出，任一上限大于0时启用
+                "max_bytes": 0,  # 单个分片最大字节数
+                "max_tokens": 0,  # 单个分片最大估算Token数
+                "max_files": 0  # 单个分片最大文件数
+            },
+            "enable_tracing": False,  # 记录热点路径耗时，转换后导出<输出名>.trace.json
             "auto_watch_files": True,  # 自动监控文件变化
             "watch_debounce_time": 1.0,  # 监控防抖时间（秒）
             "dpi_scaling": {  # DPI缩放配置
@@ -82,4 +166,4 @@ class Settings:
                 "language": 80,  # 语言列宽度
                 "size": 70  # 大小列宽度
             }
-        }
\ No newline at end of file
+        }
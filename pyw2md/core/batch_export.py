@@ -0,0 +1,366 @@
+"""
+批量导出核心模块 - 无界面批处理
+
+核心职责：
+- 描述单个导出任务（根目录、包含/排除规则、模板、输出路径）
+- 从任务文件加载大量导出任务
+- 并发执行多个导出任务，适用于CI环境批量生成文档
+
+设计思路：
+- 不依赖任何UI组件，仅使用core层的扫描和转换能力
+- 所有任务共享一个扫描缓存，相同根目录只遍历一次磁盘
+- 所有任务共享一个Token估算缓存，同一文件只估算一次
+- 所有任务共享一个转换缓存，多个任务包含同一文件时只读取和渲染一次
+- 所有任务共享一个工作线程池，文件转换的总并发度可控
+- 存在大纲模式的任务时，所有任务共享一个大纲提取进程池
+- 任务调度线程与文件转换线程分离，避免线程池内嵌套等待导致死锁
+- 每个任务定期写入断点，中断（Ctrl+C或进程被杀）后以resume方式重新执行时从断点继续
+
+任务文件格式（JSON）：
+    {
+        "defaults": {"template": "默认", "exclude": ["*/node_modules/*"]},
+        "jobs": [
+            {"name": "api", "roots": ["src/api"], "include": ["*.py"], "output": "out/api.md"}
+        ]
+    }
+也可以直接使用任务列表作为顶层结构。相对路径基于任务文件所在目录解析。
+"""
+
+import os
+import json
+import fnmatch
+import logging
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.file_handler import FileInfo, scan_folder
+from core.converter import Converter, TEMPLATES
+from core.conversion_job import ConversionJob
+from core.conversion_cache import ConversionCache
+from core.token_budget import TokenBudget, TokenCache
+from core.writers import ShardPolicy
+from core.compression import COMPRESSIONS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExportJob:
+    """导出任务数据类
+
+    核心属性：
+    - roots: 扫描的根目录或文件列表
+    - output: 输出Markdown文件路径
+    - include: 包含规则（glob），为空时包含全部支持的文件
+    - exclude: 排除规则（glob），优先级高于包含规则
+    - template: 使用的模板名称
+    - recursive: 是否递归扫描子目录
+    - name: 任务名称，用于日志和结果汇总
+    - max_tokens: Token预算上限，0表示不限制
+    - budget_strategy: 预算装入策略
+    - minify: 是否剔除注释、文档字符串和空行
+    - outline: 是否只输出声明签名（大纲模式）
+    - shard_bytes/shard_tokens/shard_files: 分片上限，均为0时输出单个文件
+    - compression: 输出压缩格式（gzip/zstd），为空时不压缩
+    """
+    roots: List[str]
+    output: str
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    template: str = "默认"
+    recursive: bool = True
+    name: str = ""
+    max_tokens: int = 0
+    budget_strategy: str = 'original'
+    minify: bool = False
+    outline: bool = False
+    shard_bytes: int = 0
+    shard_tokens: int = 0
+    shard_files: int = 0
+    compression: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict, base_dir: str = "") -> 'ExportJob':
+        """从任务文件中的字典构建任务，相对路径基于base_dir解析"""
+        roots = data.get('roots') or data.get('root') or []
+        if isinstance(roots, str):
+            roots = [roots]
+        if not roots:
+            raise ValueError("导出任务缺少 roots")
+        if not data.get('output'):
+            raise ValueError("导出任务缺少 output")
+
+        def resolve(path: str) -> str:
+            return os.path.normpath(os.path.join(base_dir, os.path.expanduser(path)))
+
+        return cls(
+            roots=[resolve(r) for r in roots],
+            output=resolve(data['output']),
+            include=list(data.get('include', [])),
+            exclude=list(data.get('exclude', [])),
+            template=data.get('template', "默认"),
+            recursive=bool(data.get('recursive', True)),
+            name=data.get('name', ""),
+            max_tokens=int(data.get('max_tokens', 0)),
+            budget_strategy=data.get('budget_strategy', 'original'),
+            minify=bool(data.get('minify', False)),
+            outline=bool(data.get('outline', False)),
+            shard_bytes=int(data.get('shard_bytes', 0)),
+            shard_tokens=int(data.get('shard_tokens', 0)),
+            shard_files=int(data.get('shard_files', 0)),
+            compression=data.get('compression') or None
+        )
+
+    @property
+    def display_name(self) -> str:
+        return self.name or os.path.basename(self.output)
+
+    def build_budget(self) -> Optional[TokenBudget]:
+        if self.max_tokens <= 0:
+            return None
+        return TokenBudget(self.max_tokens, self.budget_strategy)
+
+    def build_shard_policy(self) -> Optional[ShardPolicy]:
+        policy = ShardPolicy(self.shard_bytes, self.shard_tokens, self.shard_files)
+        return policy if policy.enabled else None
+
+
+def load_job_file(job_file: str) -> List[ExportJob]:
+    """
+    加载任务文件
+
+    - 支持 {"defaults": {...}, "jobs": [...]} 和纯列表两种格式
+    - defaults 中的字段作为每个任务的默认值
+    - 格式错误时抛出ValueError，并指出出错的任务序号
+    """
+    with open(job_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        defaults, entries = {}, data
+    else:
+        defaults, entries = data.get('defaults', {}), data.get('jobs', [])
+
+    base_dir = os.path.dirname(os.path.abspath(job_file))
+    jobs = []
+    for i, entry in enumerate(entries):
+        try:
+            jobs.append(ExportJob.from_dict({**defaults, **entry}, base_dir))
+        except ValueError as e:
+            raise ValueError(f"任务 #{i + 1}: {e}") from e
+    return jobs
+
+
+class ScanCache:
+    """
+    共享扫描缓存 - 线程安全
+
+    - 以(根目录, 是否递归)为键缓存扫描结果
+    - 多个任务同时请求同一根目录时，只有一个线程执行扫描，其余线程等待结果
+    - 扫描结果按路径排序，保证多次导出的输出顺序稳定
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, bool], List[str]] = {}
+        self._pending: Dict[Tuple[str, bool], threading.Event] = {}
+
+    def scan(self, root: str, recursive: bool = True) -> List[str]:
+        key = (os.path.abspath(root), recursive)
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            event = self._pending.get(key)
+            is_owner = event is None
+            if is_owner:
+                event = threading.Event()
+                self._pending[key] = event
+
+        if not is_owner:
+            event.wait()
+            return self._entries.get(key, [])
+
+        paths: List[str] = []
+        try:
+            if os.path.isdir(key[0]):
+                paths = sorted(scan_folder(key[0], recursive))
+            elif os.path.isfile(key[0]):
+                paths = [key[0]]
+            else:
+                logger.warning(f"扫描路径不存在: {root}")
+        finally:
+            with self._lock:
+                self._entries[key] = paths
+                self._pending.pop(key, None)
+            event.set()
+        return paths
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def match_patterns(relative_path: str, include: List[str], exclude: List[str]) -> bool:
+    """
+    按glob规则筛选相对路径
+
+    - 路径统一使用'/'分隔，便于跨平台编写规则
+    - 不含'/'的规则同时匹配文件名，例如"*.py"、"test_*"
+    - 排除规则优先于包含规则
+    """
+    path = relative_path.replace(os.sep, '/')
+    basename = path.rsplit('/', 1)[-1]
+
+    def matches(pattern: str) -> bool:
+        if fnmatch.fnmatch(path, pattern):
+            return True
+        return '/' not in pattern and fnmatch.fnmatch(basename, pattern)
+
+    if any(matches(p) for p in exclude):
+        return False
+    return not include or any(matches(p) for p in include)
+
+
+def collect_job_files(job: ExportJob, scan_cache: ScanCache) -> Tuple[List[FileInfo], str]:
+    """
+    收集任务需要转换的文件
+
+    返回值：
+    - 文件信息列表（跨根目录去重，保持根目录顺序）
+    - 计算相对路径使用的基准目录
+    """
+    roots = [os.path.abspath(r) for r in job.roots]
+    seen = set()
+    files: List[FileInfo] = []
+
+    for root in roots:
+        root_dir = root if os.path.isdir(root) else os.path.dirname(root)
+        for path in scan_cache.scan(root, job.recursive):
+            if path in seen:
+                continue
+            if not match_patterns(os.path.relpath(path, root_dir), job.include, job.exclude):
+                continue
+            seen.add(path)
+            files.append(FileInfo(path=path, marked=True))
+
+    dirs = [r if os.path.isdir(r) else os.path.dirname(r) for r in roots]
+    try:
+        base_path = os.path.commonpath(dirs) if dirs else os.getcwd()
+    except ValueError:
+        # 根目录位于不同驱动器时没有公共路径
+        base_path = dirs[0]
+    return files, base_path
+
+
+class BatchExporter:
+    """
+    批量导出执行器
+
+    核心职责：
+    - 持有共享的扫描缓存和工作线程池
+    - 并发调度多个导出任务，按任务顺序汇总结果
+    - 单个任务失败不影响其他任务
+
+    配置参数：
+    - max_workers: 文件转换工作线程数，所有任务共享
+    - parallel_jobs: 同时执行的任务数量
+    - dedupe: 是否对相同内容的文件去重（每个输出文档内独立去重）
+    - resume: 输出文件存在有效断点时是否从断点继续
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, parallel_jobs: int = 4,
+                 dedupe: bool = True, resume: bool = False):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.parallel_jobs = max(1, parallel_jobs)
+        self.dedupe = dedupe
+        self.resume = resume
+        self._running_jobs: List[ConversionJob] = []
+        self._jobs_lock = threading.Lock()
+        self.scan_cache = ScanCache()
+        self.token_cache = TokenCache()
+        self.conversion_cache = ConversionCache()
+
+    def run(self, jobs: List[ExportJob]) -> List[Dict]:
+        """执行全部任务，返回与任务顺序一致的结果列表"""
+        if not jobs:
+            return []
+
+        processes = ProcessPoolExecutor() if any(job.outline for job in jobs) else nullcontext(None)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='pyw2md-worker') as workers, \
+             ThreadPoolExecutor(max_workers=min(self.parallel_jobs, len(jobs)),
+                                thread_name_prefix='pyw2md-job') as job_pool, \
+             processes as process_pool:
+            futures = [job_pool.submit(self.run_job, job, workers, process_pool) for job in jobs]
+            try:
+                return [future.result() for future in futures]
+            except KeyboardInterrupt:
+                # 撤销未开始的任务，取消进行中的任务（写入断点），线程池退出时只需短暂等待
+                for future in futures:
+                    future.cancel()
+                self.cancel()
+                raise
+
+    def cancel(self):
+        """取消所有进行中的转换"""
+        with self._jobs_lock:
+            for conversion in self._running_jobs:
+                conversion.cancel()
+
+    def run_job(self, job: ExportJob, workers, process_pool=None) -> Dict:
+        """执行单个任务，异常转换为失败结果"""
+        try:
+            if job.template not in TEMPLATES:
+                raise ValueError(f"未知模板: {job.template}")
+            if job.compression and job.compression not in COMPRESSIONS:
+                raise ValueError(f"未知的压缩格式: {job.compression}")
+            budget = job.build_budget()
+            shard_policy = job.build_shard_policy()
+
+            files, base_path = collect_job_files(job, self.scan_cache)
+            if not files:
+                raise ValueError("没有匹配的文件")
+
+            output_dir = os.path.dirname(os.path.abspath(job.output))
+            os.makedirs(output_dir, exist_ok=True)
+
+            converter = Converter(job.template, executor=workers)
+            converter.token_cache = self.token_cache
+            converter.cache = self.conversion_cache
+            converter.dedupe = self.dedupe
+            converter.minify = job.minify
+            converter.outline = job.outline
+            converter.process_pool = process_pool
+            converter.shard_policy = shard_policy
+            converter.compression = job.compression
+            converter.set_output_directory(base_path)
+
+            conversion = ConversionJob(converter, files, job.output, budget,
+                                       resume_checkpoint=self.resume)
+            with self._jobs_lock:
+                self._running_jobs.append(conversion)
+            try:
+                result = conversion.run()
+            finally:
+                with self._jobs_lock:
+                    self._running_jobs.remove(conversion)
+        except Exception as e:
+            logger.error(f"导出任务失败 [{job.display_name}]: {e}")
+            result = {
+                'success': False,
+                'message': str(e),
+                'converted': 0,
+                'total': 0,
+                'errors': [],
+                'duplicates': 0,
+                'skipped': 0
+            }
+
+        result['job'] = job.display_name
+        result['output'] = result.get('outputs', [job.output])[0]
+        return result
@@ -0,0 +1,145 @@
+"""
+压缩输出模块 - 流式压缩写入
+
+核心职责：
+- 为写入器提供统一的文本输出流：write(str) / close()
+- 支持无压缩、gzip（标准库）和zstd（可选依赖zstandard）三种格式
+
+多线程压缩：
+- gzip: 文本按块（默认1MB）切分，每块在线程池中独立压缩为一个gzip成员，
+  按顺序写出。多成员gzip文件是标准格式，gunzip和gzip模块都能完整解压。
+  zlib压缩时释放GIL，多个块可真正并行压缩
+- zstd: 使用zstandard自带的多线程压缩（threads=-1表示使用全部CPU核心）
+
+依赖说明：
+- zstandard为可选依赖，未安装时zstd格式不可用，ZSTD_AVAILABLE为False
+"""
+
+import os
+import gzip
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+COMPRESSIONS = ('gzip', 'zstd')
+
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+# gzip每个成员的未压缩大小
+GZIP_CHUNK_SIZE = 1024 * 1024
+
+# 压缩级别：gzip默认6兼顾速度和压缩率，zstd默认3
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# 写入缓冲区大小，与写入器保持一致
+WRITE_BUFFER_SIZE = 8192 * 16
+
+
+def compressed_path(path: str, compression: Optional[str]) -> str:
+    """为输出路径追加压缩格式后缀（已有后缀时不重复追加）"""
+    if not compression:
+        return path
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return path if path.endswith(suffix) else path + suffix
+
+
+class ParallelGzipFile:
+    """
+    多线程gzip输出流
+
+    - 文本编码为UTF-8后累积到块大小再提交压缩
+    - 在途压缩块数量有上限，超过时等待最早的块完成并写出，内存占用可控
+    """
+
+    def __init__(self, path: str, level: int = GZIP_LEVEL,
+                 workers: Optional[int] = None, chunk_size: int = GZIP_CHUNK_SIZE):
+        self.level = level
+        self.chunk_size = chunk_size
+        workers = workers or min(8, os.cpu_count() or 1)
+        self._max_pending = workers * 2
+        self._raw = open(path, 'wb')
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pyw2md-gzip')
+        self._pending = deque()
+        self._buffer = []
+        self._buffered = 0
+        self.closed = False
+
+    def write(self, text: str):
+        data = text.encode('utf-8')
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.chunk_size:
+            self._submit()
+
+    def _submit(self):
+        chunk = b''.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._pending.append(self._pool.submit(gzip.compress, chunk, self.level, mtime=0))
+        while len(self._pending) > self._max_pending:
+            self._raw.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer:
+                self._submit()
+            while self._pending:
+                self._raw.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown(wait=True)
+            self._raw.close()
+
+
+class ZstdFile:
+    """zstd输出流（多线程压缩）"""
+
+    def __init__(self, path: str, level: int = ZSTD_LEVEL, threads: int = -1):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("未安装zstandard，无法使用zstd压缩（pip install zstandard）")
+        self._raw = open(path, 'wb')
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads)
+        self._stream = compressor.stream_writer(self._raw, write_size=WRITE_BUFFER_SIZE)
+        self.closed = False
+
+    def write(self, text: str):
+        self._stream.write(text.encode('utf-8'))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._stream.close()
+        finally:
+            if not self._raw.closed:
+                self._raw.close()
+
+
+def open_output(path: str, compression: Optional[str] = None):
+    """
+    打开文本输出流
+
+    - compression为None时返回普通的UTF-8文本文件
+    - 调用方负责传入已追加后缀的路径（见compressed_path）
+    """
+    if not compression:
+        return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+    if compression == 'gzip':
+        return ParallelGzipFile(path)
+    if compression == 'zstd':
+        return ZstdFile(path)
+    raise ValueError(f"未知的压缩格式: {compression}")
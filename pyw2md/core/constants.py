@@ -12,6 +12,7 @@ FILE_CHANGE_CREATED = 'created'
 DEFAULT_DEBOUNCE_MS = 300
 UI_UPDATE_DEBOUNCE_MS = 300
 MESSAGE_DISPLAY_MS = 3000
+STARTUP_DEFER_MS = 50  # 窗口首次绘制后再执行启动恢复
 
 # 文件监控配置
 MAX_WATCH_ERRORS = 10
@@ -25,6 +26,7 @@ MSG_NO_CHANGES = "没有需要刷新的文件变化"
 MSG_REFRESH_FAILED = "刷新失败: {error}"
 MSG_WATCH_FAILED = "文件监控启动失败: {error}"
 MSG_WATCH_RESTARTED = "文件监控已重新启动"
+MSG_SESSION_FILES_REMOVED = "已移除 {count} 个不存在的文件"
 
 # 状态栏消息类型
 MSG_TYPE_INFO = "info"
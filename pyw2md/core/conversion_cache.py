@@ -0,0 +1,85 @@
+"""
+转换缓存模块
+
+核心职责：
+- 缓存渲染完成的Markdown片段，重复导出时未变化的文件无需重新读取和格式化
+- 片段与内容摘要一同保存，命中时直接提供去重所需的摘要
+
+缓存键设计：
+- 文件路径 + 修改时间(ns) + 文件大小，文件变化后自动失效
+- 附加渲染选项（模板、基准路径、截断上限等），选项不同的片段互不复用
+
+内存控制：
+- 片段按LRU淘汰，总字符数不超过max_chars
+- 摘要随片段一起淘汰，缓存条目数不会无限增长
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+# 内容摘要长度（字节），16字节blake2b足以区分源码文件
+DIGEST_SIZE = 16
+
+# 默认片段缓存上限（字符数）
+DEFAULT_CACHE_CHARS = 64 * 1024 * 1024
+
+StatKey = Tuple[str, int, int]
+
+
+def content_digest(data: bytes) -> str:
+    """计算内容摘要"""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+class ConversionCache:
+    """转换缓存 - 线程安全"""
+
+    def __init__(self, max_chars: int = DEFAULT_CACHE_CHARS):
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        # (文件键, 渲染选项) -> (内容摘要, Markdown片段)
+        self._fragments: "OrderedDict[Tuple[StatKey, Hashable], Tuple[str, str]]" = OrderedDict()
+        self._fragment_chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_fragment(self, stat_key: StatKey, options: Hashable) -> Optional[Tuple[str, str]]:
+        """
+        查询缓存的片段
+
+        返回(摘要, Markdown片段)，未命中时返回None
+        """
+        key = (stat_key, options)
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._fragments.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, stat_key: StatKey, options: Hashable, digest: str, fragment: str):
+        """写入片段和摘要，超出上限时淘汰最久未使用的片段"""
+        if len(fragment) > self.max_chars:
+            return
+        key = (stat_key, options)
+        with self._lock:
+            old = self._fragments.pop(key, None)
+            if old is not None:
+                self._fragment_chars -= len(old[1])
+            self._fragments[key] = (digest, fragment)
+            self._fragment_chars += len(fragment)
+
+            while self._fragment_chars > self.max_chars and self._fragments:
+                _, (_, evicted) = self._fragments.popitem(last=False)
+                self._fragment_chars -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+            self._fragment_chars = 0
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,197 @@
+"""
+转换任务模块 - 可取消、可暂停、可断点续传的转换
+
+核心职责：
+- ConversionJob: 包装一次Converter.convert_files调用，提供取消、暂停和继续
+- Checkpoint: 断点文件，记录已写入的文件序号和输出文件的字节偏移
+- 再次转换同一文件列表到同一输出文件时，截断到断点偏移并从断点序号继续追加
+
+断点设计：
+- 断点文件为 <输出路径>.checkpoint.json，写入临时文件后原子替换，进程被杀也不会损坏
+- 签名覆盖文件列表（路径、大小、修改时间）和影响输出内容的转换选项，
+  任一变化都会使断点失效，避免把新旧内容拼接到同一文件中
+- 同时保存去重摘要表和统计计数，续传后的引用和尾部统计与一次完成时一致
+- 仅单文件、未压缩的输出支持续传（分片和压缩流无法在任意偏移处追加）
+
+取消与暂停：
+- 转换循环每处理一批完成的任务检查一次控制状态
+- 暂停时不再提交新任务，已在途的任务完成后停在原地，并写入一次断点
+- 取消时撤销所有未开始的任务并写入断点，线程池只需等待正在执行的少量任务
+
+使用方式：
+    job = ConversionJob(converter, files, 'out.md', progress_callback=cb)
+    job.start()
+    job.pause(); job.resume(); job.cancel()
+    result = job.wait()
+"""
+
+import os
+import json
+import hashlib
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+from core.file_handler import FileInfo
+
+# 断点文件后缀
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+
+# 断点写入间隔（秒），去重摘要表较大时避免频繁序列化
+CHECKPOINT_INTERVAL = 5.0
+
+
+class ConversionCancelled(Exception):
+    """转换被取消"""
+
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path + CHECKPOINT_SUFFIX
+
+
+def job_signature(files: List[FileInfo], options: Dict) -> str:
+    """文件列表和转换选项的签名，用于判断断点是否仍然有效"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(options, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    for file_info in files:
+        digest.update(f"\0{file_info.path}\0{file_info.size}\0{file_info.mtime}".encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """断点数据类
+
+    - signature: 文件列表和转换选项的签名
+    - next_index: 下一个待写入的文件序号
+    - offset: 已写入内容在输出文件中的字节偏移
+    - converted / duplicates / skipped / errors: 断点前的统计
+    - seen_digests: 去重摘要表（内容摘要 -> 首次出现的相对路径）
+    """
+    signature: str
+    next_index: int
+    offset: int
+    converted: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: List[Dict] = field(default_factory=list)
+    seen_digests: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str, signature: str, output_path: str) -> Optional['Checkpoint']:
+        """
+        读取断点
+
+        断点不存在、已损坏、签名不一致或输出文件比断点偏移短（已被替换）时返回None
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = cls(**json.load(f))
+            if checkpoint.signature != signature:
+                return None
+            if os.path.getsize(output_path) < checkpoint.offset:
+                return None
+            return checkpoint
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: str):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ConversionJob:
+    """
+    转换任务
+
+    - start(): 在后台线程中执行；run(): 在当前线程中执行
+    - pause() / resume() / cancel(): 可在任意线程调用
+    - resume_checkpoint: 存在有效断点时是否从断点继续，False时重新开始
+    - on_complete: 转换结束后的回调，参数为结果字典（在任务线程中调用，
+      调用完成后done才变为True，等待done的一方不会与回调竞争）
+    """
+
+    def __init__(self, converter, files: List[FileInfo], output_path: str,
+                 budget=None,
+                 progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                 resume_checkpoint: bool = True,
+                 on_complete: Optional[Callable[[dict], None]] = None):
+        self.converter = converter
+        self.files = files
+        self.output_path = output_path
+        self.budget = budget
+        self.progress_callback = progress_callback
+        self.resume_checkpoint = resume_checkpoint
+        self.on_complete = on_complete
+        self.checkpoint_path = checkpoint_path(output_path)
+        self.result: Optional[dict] = None
+
+        self._running = threading.Event()  # 清除表示已暂停
+        self._running.set()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def has_checkpoint(self) -> bool:
+        """输出路径是否存在断点文件（不校验签名）"""
+        return os.path.exists(self.checkpoint_path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='pyw2md-conversion', daemon=True)
+        self._thread.start()
+
+    def run(self) -> dict:
+        try:
+            self.result = self.converter.convert_files(
+                self.files, self.output_path, self.progress_callback, self.budget, job=self
+            )
+            if self.on_complete:
+                self.on_complete(self.result)
+        finally:
+            self._done.set()
+        return self.result
+
+    def pause(self):
+        if not self.done and not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        if not self.done and not self.cancelled:
+            self._running.set()
+
+    def cancel(self):
+        if not self.done:
+            self._cancelled.set()
+            # 唤醒暂停中的转换循环，使其尽快退出
+            self._running.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """等待转换结束，超时返回None"""
+        if not self._done.wait(timeout):
+            return None
+        return self.result
+
+    def wait_if_paused(self):
+        """转换循环调用：暂停时阻塞直到继续或取消"""
+        self._running.wait()
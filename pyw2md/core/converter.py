@@ -4,16 +4,15 @@ Markdown 转换核心模块 - 性能优化版
 核心设计思路：
 - 采用模板引擎模式，支持多种Markdown输出格式
 - 实现多线程并行处理，充分利用多核CPU性能
-- 使用StringIO缓冲区优化字符串拼接，减少内存分配
-- 批量写入磁盘，降低I/O操作频率
+- 转换结果按原顺序增量写入带缓冲的写入器，降低I/O操作频率
 - 提供完整的错误处理机制，确保转换过程的稳定性
 
 性能优化策略：
 - ThreadPoolExecutor实现并行文件读取和转换
-- 批量处理（chunk_size=50）减少磁盘写入次数
-- StringIO缓冲区避免频繁的字符串拼接操作
+- 有界提交窗口（chunk_size=50），在途和待写入的结果总数有上限，内存占用可控
 - 进度回调机制支持实时进度显示
 - 异常隔离，单个文件失败不影响整体转换
+- 可选Token预算阶段，转换前按预算挑选和截断文件
 
 模板系统设计：
 - 预定义6种常用模板格式
@@ -31,13 +30,48 @@ Markdown 转换核心模块 - 性能优化版
 import os
 import time
 import logging
-from typing import Callable, Optional
-from io import StringIO
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from core.file_handler import FileInfo
+from contextlib import nullcontext
+from typing import Callable, NamedTuple, Optional
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from core.file_handler import FileInfo, format_size
+from core.conversion_cache import ConversionCache, content_digest
+from core.encoding import decode_source, read_source
+from core.minifier import minify_source
+from core.outline import OUTLINE_INLINE_CHARS, extract_outline
+from core.writers import ShardPolicy, create_writer, supports_resume
+from core.conversion_job import (
+    CHECKPOINT_INTERVAL, Checkpoint, ConversionCancelled, job_signature
+)
+from core.tracing import TRACER, traced
+from core.token_budget import (
+    TokenBudget, TokenCache, BudgetPlan, estimate_tokens, plan_budget, truncate_to_tokens,
+    STATUS_FULL, STATUS_TRUNCATED
+)
 
 logger = logging.getLogger(__name__)
 
+# 参与去重的最小文件大小（字节），过小的文件引用文本并不比原文短
+DEDUP_MIN_BYTES = 256
+
+# 重复文件的占位内容，path为首次出现的相对路径
+DEDUP_REFERENCE = "（内容与 {path} 相同，已省略）"
+
+
+class ConvertedEntry(NamedTuple):
+    """
+    单个文件的转换结果
+
+    - digest为None表示读取失败或内容被截断，不参与去重
+    - skipped表示二进制文件被跳过
+    """
+    markdown: str
+    digest: Optional[str] = None
+    mtime: float = 0.0
+    size: int = 0
+    skipped: bool = False
+
 # Markdown 模板定义
 
 # 每个模板支持以下变量替换：
@@ -114,15 +148,15 @@ class Converter:
 
     性能特征：
     - 支持多线程并行处理，默认4个工作线程
-    - 批量写入策略，每50个文件写入一次磁盘
-    - StringIO缓冲区优化，减少内存分配
+    - 有界提交窗口，最多50个文件同时处于转换中或等待写入
     - 异常隔离机制，单文件失败不影响整体
 
     配置参数：
     - template: 输出模板名称，默认为"默认"
     - max_workers: 线程池大小，控制并行度
-    - chunk_size: 批量写入大小，平衡内存和I/O
+    - chunk_size: 提交窗口大小，平衡并行度和内存占用
     - base_path: 基准路径，用于计算相对路径
+    - executor: 外部共享的线程池（可选），批处理模式下多个转换器复用同一组工作线程
 
     设计思路：
     - 采用配置对象模式，支持运行时参数调整
@@ -131,17 +165,19 @@ class Converter:
     - 提供回调接口，支持进度监控和取消操作
     """
 
-    def __init__(self, template: str = "默认", max_workers: int = 4):
+    def __init__(self, template: str = "默认", max_workers: int = 4,
+                 executor: Optional[Executor] = None):
         """
         转换器初始化
 
         参数说明：
         - template: 默认使用的模板名称
         - max_workers: 线程池最大工作线程数
+        - executor: 共享线程池，传入时不再为每次转换单独创建线程池
 
         性能考量：
         - max_workers设置为4，适合大多数桌面CPU
-        - chunk_size设置为50，平衡内存使用和写入效率
+        - chunk_size设置为50，远大于线程数，慢文件不会让工作线程空闲
         - base_path默认为当前工作目录，可动态调整
 
         资源管理：
@@ -152,7 +188,16 @@ class Converter:
         self.template = template  # 当前使用的模板名称
         self.base_path = os.getcwd()  # 计算相对路径的基准
         self.max_workers = max_workers  # 线程池并发度
-        self.chunk_size = 50  # 批量写入大小，优化I/O性能
+        self.chunk_size = 50  # 提交窗口：在途和待写入的结果总数上限
+        self.executor = executor  # 外部共享线程池，由调用方负责关闭
+        self.token_cache = TokenCache()  # Token估算缓存，按修改时间失效
+        self.cache = ConversionCache()  # 片段缓存和内容摘要索引，可在多个转换器间共享
+        self.dedupe = True  # 相同内容的文件只输出一次，其余输出为引用
+        self.minify = False  # 输出前剔除注释、文档字符串和空行
+        self.outline = False  # 大纲模式：只输出声明签名和说明首行
+        self.process_pool = None  # 外部共享的大纲提取进程池，由调用方负责关闭
+        self.shard_policy: Optional[ShardPolicy] = None  # 分片策略，None表示输出单个文件
+        self.compression: Optional[str] = None  # 输出压缩格式：None / 'gzip' / 'zstd'
 
     def set_markdown_template(self, template: str):
         if template in TEMPLATES:
@@ -161,7 +206,7 @@ class Converter:
     def set_output_directory(self, path: str):
         self.base_path = path
 
-    def convert_file(self, file_info: FileInfo) -> str:
+    def convert_file(self, file_info: FileInfo, content_limit: Optional[int] = None) -> str:
         """
         转换单个文件为Markdown格式 - 优化字符串拼接
 
@@ -170,6 +215,7 @@ class Converter:
         - 自动计算相对路径和格式化文件信息
         - 处理编码错误和文件访问异常
         - 返回转换后的Markdown文本
+        - content_limit不为None时，内容按Token上限截断
 
         模板变量：
         - basename: 文件名（不含路径）
@@ -189,64 +235,153 @@ class Converter:
         - 一次读取整个文件内容，适合代码文件大小
         - 字符串格式化使用模板替换，避免重复拼接
         """
+        return self._convert_entry(file_info, content_limit).markdown
+
+    @traced('Converter.convert_file')
+    def _convert_entry(self, file_info: FileInfo, content_limit: Optional[int] = None,
+                       outline_pool: Optional[Executor] = None) -> ConvertedEntry:
+        """
+        转换单个文件并返回内容摘要
+
+        - 文件的修改时间和大小未变化且渲染选项相同时，直接复用缓存的片段
+        - 否则以二进制读取一次，同一份字节既用于计算摘要也用于解码
+        - 读取前先检查文件头部，二进制文件不读取剩余内容，直接标记为跳过
+        - 按BOM、UTF-8、声明的字符集、GB18030的顺序识别编码
+        - 摘要写入转换缓存，供写入阶段去重；内容被截断时不记录摘要，
+          避免后续相同的完整文件被替换为指向截断内容的引用
+        - 启用精简时在截断之前按语言剔除注释和空行，摘要仍基于原始内容
+        - 大纲模式优先于精简，较大的文件交给outline_pool中的工作进程解析
+        """
         try:
-            # 读取文件内容（使用with自动关闭文件句柄）
-            with open(file_info.path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with TRACER.span('convert.stat'):
+                st = os.stat(file_info.path)
+            stat_key = (file_info.path, st.st_mtime_ns, st.st_size)
+            options = (self.template, self.base_path, content_limit, self.minify, self.outline)
+
+            cached = self.cache.get_fragment(stat_key, options)
+            if cached is not None:
+                digest, markdown = cached
+                return ConvertedEntry(markdown, digest, st.st_mtime, st.st_size)
+
+            # 读取文件内容，二进制文件只读取头部
+            with TRACER.span('convert.read'):
+                data = read_source(file_info.path)
+            if data is None:
+                return ConvertedEntry(
+                    f"<!-- 已跳过二进制文件: {self._relative_path(file_info.path)} -->\n\n",
+                    mtime=st.st_mtime, size=st.st_size, skipped=True
+                )
+            with TRACER.span('convert.decode'):
+                digest = content_digest(data)
+                # 识别编码并统一换行符
+                content, _ = decode_source(data)
+
+            with TRACER.span('convert.transform'):
+                if self.outline:
+                    content = self._extract_outline(content, file_info.language, outline_pool)
+                elif self.minify:
+                    content = minify_source(content, file_info.language)
+                if content_limit is not None:
+                    truncated = truncate_to_tokens(content, content_limit)
+                    if truncated != content:
+                        content = truncated
+                        digest = None
+
+            with TRACER.span('convert.render'):
+                markdown = self._render(file_info, content, st.st_mtime, st.st_size)
+            self.cache.put(stat_key, options, digest, markdown)
+            return ConvertedEntry(markdown, digest, st.st_mtime, st.st_size)
 
-            # 准备模板变量
-            basename = os.path.basename(file_info.path)
+        except Exception as e:
+            # 转换失败时返回错误注释，不影响整体转换流程
+            return ConvertedEntry(f"<!-- ❌ 错误: 无法处理文件 {file_info.path}: {str(e)} -->\n\n")
+
+    def _extract_outline(self, content: str, language: str, outline_pool: Optional[Executor]) -> str:
+        """
+        提取大纲
 
-            # 计算相对路径，失败时回退到绝对路径
+        - 小文件直接在当前线程提取，避免进程间传输内容的开销
+        - 进程池不可用（如打包环境不支持多进程）时回退到当前线程
+        """
+        if outline_pool is not None and len(content) >= OUTLINE_INLINE_CHARS:
             try:
-                relative_path = os.path.relpath(file_info.path, self.base_path)
-            except ValueError:
-                # 当文件路径与基准路径不在同一驱动器时会发生ValueError
-                relative_path = file_info.path
-
-            # 格式化文件修改时间
-            mtime = time.strftime(
-                "%Y-%m-%d %H:%M:%S",
-                time.localtime(os.path.getmtime(file_info.path))
-            )
+                return outline_pool.submit(extract_outline, content, language).result()
+            except Exception as e:
+                logger.debug(f"大纲进程池不可用，回退到线程内提取: {e}")
+        return extract_outline(content, language)
+
+    def _render(self, file_info: FileInfo, content: str, mtime: float, size: int) -> str:
+        """应用当前模板生成Markdown文本"""
+        template = TEMPLATES.get(self.template, TEMPLATES["默认"])
+
+        # 执行模板格式化，生成最终的Markdown文本
+        return template.format(
+            basename=os.path.basename(file_info.path),
+            relative_path=self._relative_path(file_info.path),
+            language=file_info.language.lower(),
+            size=format_size(size),
+            mtime=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)),
+            content=content
+        )
+
+    def _relative_path(self, path: str) -> str:
+        """计算相对路径，失败时回退到绝对路径"""
+        try:
+            return os.path.relpath(path, self.base_path)
+        except ValueError:
+            # 当文件路径与基准路径不在同一驱动器时会发生ValueError
+            return path
 
-            # 格式化文件大小
-            from core.file_handler import format_size
-            size = format_size(file_info.size)
-
-            # 获取模板并应用变量替换
-            template = TEMPLATES.get(self.template, TEMPLATES["默认"])
-
-            # 执行模板格式化，生成最终的Markdown文本
-            return template.format(
-                basename=basename,
-                relative_path=relative_path,
-                language=file_info.language.lower(),
-                size=size,
-                mtime=mtime,
-                content=content
-            )
+    def plan_budget(self, files: list[FileInfo], budget: TokenBudget, executor=None) -> BudgetPlan:
+        """
+        Token预算规划
 
-        except Exception as e:
-            # 转换失败时返回错误注释，不影响整体转换流程
-            return f"<!-- ❌ 错误: 无法处理文件 {file_info.path}: {str(e)} -->\n\n"
+        - 并行估算每个文件的内容Token数（结果按修改时间缓存）
+        - 启用大纲或精简时按变换后的内容估算，与实际输出一致
+        - 模板开销按当前模板文本和相对路径估算
+        - 返回的规划保持文件原顺序
+        """
+        if executor is None:
+            with self._executor_scope() as pool:
+                return self.plan_budget(files, budget, pool)
+
+        mode = 'outline' if self.outline else 'minify' if self.minify else None
+        content_tokens = list(executor.map(
+            lambda f: self.token_cache.get_tokens(f, mode), files
+        ))
+        template_tokens = estimate_tokens(TEMPLATES.get(self.template, TEMPLATES["默认"]))
+        overheads = [
+            template_tokens + 2 * estimate_tokens(self._relative_path(f.path))
+            for f in files
+        ]
+        return plan_budget(files, content_tokens, overheads, budget)
 
     def convert_files(self,
                      files: list[FileInfo],
                      output_path: str,
-                     progress_callback: Optional[Callable[[int, int, str], None]] = None) -> dict:
+                     progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                     budget: Optional[TokenBudget] = None,
+                     job=None) -> dict:
         """
         批量转换文件 - 内存优化版
         
         核心优化策略：
         1. 线程池并行处理：使用ThreadPoolExecutor并行读取和转换文件
         2. 增量写入：转换完成且顺序正确时立即写入磁盘，避免内存积压
+           提交窗口限制在途和待写入的结果总数，慢文件不会导致后续结果无限堆积
         3. 异常隔离：单个文件失败不影响整体转换流程
+        4. 内容去重：相同内容的文件只输出首次出现的一份，其余输出为引用
+        5. 分片输出：设置shard_policy时按上限切分为多个分片，output_path写入索引
+        6. 压缩输出：设置compression时流式压缩写入，输出路径追加.gz/.zst后缀
+        7. 取消与续传：传入job时可暂停和取消，单文件未压缩输出定期写入断点，
+           存在有效断点时截断输出文件到断点偏移并从断点序号继续
         
         参数说明：
         - files: 待转换的文件信息列表
         - output_path: 输出Markdown文件路径
         - progress_callback: 进度回调函数，参数为(current, total, filename)
+        - budget: Token预算（可选），指定时只转换预算内的文件，total为装入的文件数
+        - job: 转换任务（ConversionJob，可选），提供暂停/取消控制和断点路径
         
         返回值：
         - success: 转换是否成功
@@ -254,83 +389,261 @@ class Converter:
         - converted: 成功转换的文件数量
         - total: 总文件数量
         - errors: 错误信息列表
+        - duplicates: 以引用形式输出的重复文件数
+        - skipped: 跳过的二进制文件数
+        - outputs: 写入的文件列表（分片模式下为索引文件和全部分片）
+        - budget: 预算汇总（仅指定budget时）
+        - cancelled: 是否被取消（仅取消时）
+        - resumed_from: 续传起始的文件序号（仅从断点继续时）
         """
-        total = len(files)
         success_count = 0
+        duplicate_count = 0
+        skipped_count = 0
         errors = []
+        plan = None
         
         # 缓冲区，用于存储已完成但尚未轮到写入的文件内容
-        # key: index (0-based), value: markdown content
+        # key: index (0-based), value: ConvertedEntry
         pending_results = {}
         next_write_index = 0
+
+        # 内容摘要 -> 首次出现的相对路径；按写入顺序登记，保证引用总指向前文
+        seen_digests = {}
+        outputs = [output_path]
+
+        # 断点续传：仅传入job且为单文件、未压缩输出时启用
+        resumable = job is not None and supports_resume(self.shard_policy, self.compression)
+        checkpoint = None
+        signature = None
+        if resumable:
+            signature = job_signature(files, self._checkpoint_options(budget))
+            if job.resume_checkpoint:
+                checkpoint = Checkpoint.load(job.checkpoint_path, signature, output_path)
+            if checkpoint is None:
+                Checkpoint.remove(job.checkpoint_path)
+            else:
+                success_count = checkpoint.converted
+                duplicate_count = checkpoint.duplicates
+                skipped_count = checkpoint.skipped
+                errors = list(checkpoint.errors)
+                seen_digests = dict(checkpoint.seen_digests)
+                next_write_index = checkpoint.next_index
+        checkpoint_index = next_write_index
+        checkpoint_time = time.monotonic()
         
         try:
-            with open(output_path, 'w', encoding='utf-8', buffering=8192*16) as f:
-                # 写入文档头部
-                f.write(self._generate_header(files))
+            with self._executor_scope() as executor, \
+                    self._outline_scope() as outline_pool, \
+                    create_writer(output_path, self.shard_policy, self.compression,
+                                  checkpoint.offset if checkpoint else None) as writer:
+
+                def save_checkpoint():
+                    """记录已写入的位置，只在写入位置变化后落盘"""
+                    nonlocal checkpoint_index, checkpoint_time
+                    checkpoint_time = time.monotonic()
+                    if not resumable or next_write_index == checkpoint_index:
+                        return
+                    Checkpoint(
+                        signature, next_write_index, writer.tell(), success_count,
+                        duplicate_count, skipped_count, errors, seen_digests
+                    ).save(job.checkpoint_path)
+                    checkpoint_index = next_write_index
+
+                # 预算阶段：挑选和截断文件
+                limits = [None] * len(files)
+                if budget is not None:
+                    plan = self.plan_budget(files, budget, executor)
+                    selected = plan.selected
+                    files = [e.file_info for e in selected]
+                    limits = [e.content_limit for e in selected]
+                total = len(files)
+
+                # 写入文档头部（续传时头部已在输出文件中）
+                if checkpoint is None:
+                    writer.begin(self._generate_header(files, plan))
                 
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    # 提交所有任务
-                    # future -> index mapping
-                    future_to_index = {
-                        executor.submit(self.convert_file, file_info): i
-                        for i, file_info in enumerate(files)
-                    }
-                    
+                # 分批提交任务
+                # future -> index mapping
+                window = max(1, self.chunk_size)
+                future_to_index = {}
+                next_submit = next_write_index
+
+                while True:
+                    # 暂停时先记录断点再等待；取消时撤销未开始的任务，只等待正在执行的任务
+                    if job is not None:
+                        if job.paused:
+                            save_checkpoint()
+                            job.wait_if_paused()
+                        if job.cancelled:
+                            for future in future_to_index:
+                                future.cancel()
+                            save_checkpoint()
+                            raise ConversionCancelled()
+
+                    # 补充提交，直到在途和待写入的结果总数达到窗口上限
+                    while (next_submit < total
+                           and len(future_to_index) + len(pending_results) < window):
+                        future = executor.submit(
+                            self._convert_entry, files[next_submit], limits[next_submit], outline_pool
+                        )
+                        future_to_index[future] = next_submit
+                        next_submit += 1
+
+                    if not future_to_index:
+                        break
+
                     # 处理完成的任务
-                    for future in as_completed(future_to_index):
-                        index = future_to_index[future]
+                    done, _ = wait(future_to_index, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = future_to_index.pop(future)
                         file_info = files[index]
-                        
+                
                         try:
-                            markdown = future.result()
-                            success_count += 1
-                            logger.debug(f"文件转换成功: {file_info.path}")
+                            entry = future.result()
+                            if entry.skipped:
+                                logger.debug(f"跳过二进制文件: {file_info.path}")
+                            else:
+                                success_count += 1
+                                logger.debug(f"文件转换成功: {file_info.path}")
                         except Exception as e:
-                            markdown = f"<!-- ❌ 错误: {str(e)} -->\n\n"
+                            entry = ConvertedEntry(f"<!-- ❌ 错误: {str(e)} -->\n\n")
                             errors.append({
                                 'file': file_info.path,
                                 'error': str(e)
                             })
                             logger.debug(f"文件转换失败: {file_info.path}, 错误: {str(e)}")
-                        
+                
                         # 存入缓冲区
-                        pending_results[index] = markdown
-                        
+                        pending_results[index] = entry
+                
                         # 尝试写入缓冲区中已就绪的内容
                         while next_write_index in pending_results:
-                            content = pending_results.pop(next_write_index)
-                            
+                            entry = pending_results.pop(next_write_index)
+                            content = entry.markdown
+                            write_info = files[next_write_index]
+                            relative_path = self._relative_path(write_info.path)
+
+                            if (self.dedupe and entry.digest is not None
+                                    and entry.size >= DEDUP_MIN_BYTES):
+                                first_path = seen_digests.get(entry.digest)
+                                if first_path is None:
+                                    seen_digests[entry.digest] = relative_path
+                                else:
+                                    content = self._render(
+                                        write_info, DEDUP_REFERENCE.format(path=first_path),
+                                        entry.mtime, entry.size
+                                    )
+                                    duplicate_count += 1
+                    
                             # 回调进度 (使用 next_write_index + 1 作为当前进度)
                             if progress_callback:
                                 progress_callback(next_write_index + 1, total, files[next_write_index].name)
-                            
-                            f.write(content)
+                    
+                            if entry.skipped:
+                                skipped_count += 1
+                            else:
+                                with TRACER.span('writer.add'):
+                                    writer.add(content, relative_path)
                             next_write_index += 1
-                
+
+                    if resumable and time.monotonic() - checkpoint_time >= CHECKPOINT_INTERVAL:
+                        save_checkpoint()
+            
                 # 写入文档尾部
-                f.write(self._generate_footer(success_count, total))
-                
+                with TRACER.span('writer.finish'):
+                    writer.finish(self._generate_footer(success_count, total, duplicate_count, skipped_count))
+                outputs = writer.outputs
+
+            if resumable:
+                Checkpoint.remove(job.checkpoint_path)
+
+        except ConversionCancelled:
+            message = f'转换已取消，已写入 {next_write_index}/{len(files)} 个文件'
+            if resumable:
+                message += '，再次转换到同一文件时可从断点继续'
+            result = {
+                'success': False,
+                'message': message,
+                'converted': success_count,
+                'total': len(files),
+                'errors': errors,
+                'duplicates': duplicate_count,
+                'skipped': skipped_count,
+                'outputs': outputs,
+                'cancelled': True
+            }
         except Exception as e:
-            return {
+            result = {
                 'success': False,
                 'message': f'写入输出文件失败: {str(e)}',
                 'converted': success_count,
+                'total': len(files),
+                'errors': errors,
+                'duplicates': duplicate_count,
+                'skipped': skipped_count,
+                'outputs': outputs
+            }
+        else:
+            message = f'成功转换 {success_count}/{total} 个文件'
+            if skipped_count:
+                message += f'，跳过 {skipped_count} 个二进制文件'
+            if len(outputs) > 1:
+                message += f'，共 {len(outputs) - 1} 个分片'
+            if checkpoint is not None:
+                message += f'（从第 {checkpoint.next_index + 1} 个文件继续）'
+            result = {
+                'success': True,
+                'message': message,
+                'converted': success_count,
                 'total': total,
-                'errors': errors
+                'errors': errors,
+                'duplicates': duplicate_count,
+                'skipped': skipped_count,
+                'outputs': outputs
             }
-        
+
+        if plan is not None:
+            result['budget'] = plan.summary()
+        if checkpoint is not None:
+            result['resumed_from'] = checkpoint.next_index
+        return result
+
+    def _checkpoint_options(self, budget: Optional[TokenBudget]) -> dict:
+        """影响输出内容的转换选项，作为断点签名的一部分"""
         return {
-            'success': True,
-            'message': f'成功转换 {success_count}/{total} 个文件',
-            'converted': success_count,
-            'total': total,
-            'errors': errors
+            'template': self.template,
+            'base_path': self.base_path,
+            'dedupe': self.dedupe,
+            'minify': self.minify,
+            'outline': self.outline,
+            'budget': [budget.max_tokens, budget.strategy, budget.truncate] if budget else None
         }
 
-    def _generate_header(self, files: list[FileInfo]) -> str:
-        from core.file_handler import format_size
+    def _executor_scope(self):
+        """
+        获取本次转换使用的线程池
+
+        - 注入了共享线程池时直接复用，退出时不关闭
+        - 否则按max_workers创建临时线程池，转换结束后自动关闭
+        """
+        if self.executor is not None:
+            return nullcontext(self.executor)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _outline_scope(self):
+        """
+        获取大纲提取使用的进程池
+
+        - 未启用大纲模式时为None
+        - 注入了共享进程池时直接复用，否则创建临时进程池，转换结束后自动关闭
+        """
+        if not self.outline:
+            return nullcontext(None)
+        if self.process_pool is not None:
+            return nullcontext(self.process_pool)
+        return ProcessPoolExecutor()
 
+    def _generate_header(self, files: list[FileInfo], plan: Optional[BudgetPlan] = None) -> str:
         total_size = sum(f.size for f in files)
         languages = set(f.language for f in files)
 
@@ -342,17 +655,51 @@ class Converter:
             f"**总大小:** {format_size(total_size)}\n",
             f"**编程语言:** {', '.join(sorted(languages))}\n",
             f"**使用模板:** {self.template}\n\n",
-            "---\n\n"
         ]
 
+        if self.outline:
+            header_parts.insert(-1, "**输出模式:** 大纲（仅声明签名和说明首行）\n")
+        elif self.minify:
+            header_parts.insert(-1, "**输出模式:** 精简（已剔除注释、文档字符串和空行）\n")
+
+        if plan is not None:
+            header_parts.append(self._generate_budget_table(plan))
+
+        header_parts.append("---\n\n")
         return ''.join(header_parts)
 
-    def _generate_footer(self, success: int, total: int) -> str:
+    def _generate_budget_table(self, plan: BudgetPlan) -> str:
+        """生成Token预算明细（每个文件的估算成本和装入状态）"""
+        summary = plan.summary()
+        status_labels = {STATUS_FULL: "完整", STATUS_TRUNCATED: "截断"}
+
+        parts = [
+            f"**Token预算:** {summary['used_tokens']}/{summary['max_tokens']}"
+            f"（完整 {summary['full']}，截断 {summary['truncated']}，跳过 {summary['skipped']}）\n\n",
+            "| 文件 | 估算Tokens | 计入Tokens | 状态 |\n",
+            "|------|-----------:|-----------:|------|\n"
+        ]
+        for entry in plan.entries:
+            label = status_labels.get(entry.status, "跳过")
+            parts.append(
+                f"| {self._relative_path(entry.file_info.path)} | {entry.tokens} "
+                f"| {entry.allotted} | {label} |\n"
+            )
+        parts.append("\n")
+        return ''.join(parts)
+
+    def _generate_footer(self, success: int, total: int, duplicates: int = 0, skipped: int = 0) -> str:
         footer_parts = [
             "\n\n---\n\n",
             "## 转换统计\n\n",
             f"- 成功转换: **{success}** 个文件\n",
             f"- 总计处理: **{total}** 个文件\n",
+        ]
+        if duplicates:
+            footer_parts.append(f"- 重复引用: **{duplicates}** 个文件（内容已省略）\n")
+        if skipped:
+            footer_parts.append(f"- 跳过二进制文件: **{skipped}** 个\n")
+        footer_parts += [
             f"- 完成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n",
             "---\n\n",
             "文档生成完成\n"
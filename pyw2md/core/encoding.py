@@ -0,0 +1,114 @@
+"""
+源码编码识别模块
+
+核心职责：
+- 读取文件前先检查头部（默认8KB），二进制文件只读取头部即被跳过
+- 识别BOM和文件内声明的字符集，正确解码GBK等非UTF-8源码
+
+识别顺序：
+1. BOM: UTF-8 / UTF-16 / UTF-32（带BOM的UTF-16/32含NUL字节，需先于二进制判断）
+2. 二进制判断: 头部含NUL字节视为二进制文件
+3. 严格UTF-8: 声明常因复制粘贴而与实际不符（如HTML模板中的meta charset），
+   而合法的UTF-8字节几乎不会是其他编码的文本，因此先于声明尝试
+4. 声明的字符集: Python编码声明（PEP 263）、XML声明、HTML meta charset
+5. 依次尝试 GB18030（兼容GBK/GB2312） -> Latin-1（总能解码）
+"""
+
+import re
+import codecs
+from typing import Optional, Tuple
+
+# 头部检查的字节数
+SNIFF_BYTES = 8192
+
+# 按长度从长到短排列，避免UTF-32 LE的BOM被误判为UTF-16 LE
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# PEP 263编码声明只在前两行有效
+_CODING_RE = re.compile(rb'^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)', re.MULTILINE)
+_MARKUP_CHARSET_RE = re.compile(
+    rb'<\?xml[^>]*encoding=["\']([-\w.]+)'
+    rb'|<meta[^>]*charset=["\']?([-\w.]+)',
+    re.IGNORECASE
+)
+
+# UTF-8和声明的字符集都解码失败时依次尝试的编码
+FALLBACK_ENCODINGS = ('gb18030', 'latin-1')
+
+
+def detect_bom(head: bytes) -> Optional[str]:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def is_binary(head: bytes) -> bool:
+    """头部含NUL字节且不是UTF-16/32文本时视为二进制文件"""
+    return b'\x00' in head and detect_bom(head) is None
+
+
+def declared_encoding(head: bytes) -> Optional[str]:
+    """查找文件头部声明的字符集，声明无效时返回None"""
+    first_lines = b'\n'.join(head.split(b'\n', 2)[:2])
+    match = _CODING_RE.search(first_lines) or _MARKUP_CHARSET_RE.search(head[:1024])
+    if match is None:
+        return None
+    name = next(g for g in match.groups() if g).decode('ascii', 'ignore')
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def decode_source(data: bytes) -> Tuple[str, str]:
+    """
+    解码源码字节
+
+    返回(文本, 实际使用的编码)，换行符统一为\\n
+    """
+    head = data[:SNIFF_BYTES]
+    candidates = []
+    bom = detect_bom(head)
+    if bom:
+        candidates.append(bom)
+    else:
+        # latin-1、cp1252等单字节编码总能解码成功，声明错误时会静默产生乱码，
+        # 所以合法的UTF-8优先于声明
+        candidates.append('utf-8')
+        declared = declared_encoding(head)
+        if declared and declared != 'utf-8':
+            candidates.append(declared)
+    candidates.extend(FALLBACK_ENCODINGS)
+
+    for encoding in candidates:
+        try:
+            text = data.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        return text.replace('\r\n', '\n').replace('\r', '\n'), encoding
+
+    # latin-1总能解码，不会执行到这里
+    raise UnicodeDecodeError('latin-1', data, 0, len(data), '无法识别的编码')
+
+
+def read_source(path: str) -> Optional[bytes]:
+    """
+    读取源码文件
+
+    - 先读取头部判断是否为二进制文件，是则返回None，不再读取剩余内容
+    - 否则返回完整的文件字节
+    """
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+        if is_binary(head):
+            return None
+        if len(head) < SNIFF_BYTES:
+            return head
+        return head + f.read()
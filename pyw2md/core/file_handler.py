@@ -33,9 +33,12 @@
 """
 
 import os
-from typing import List, Dict, Optional
+import stat
+from typing import List, Dict, Optional, Iterable, Tuple
 from dataclasses import dataclass
 
+from core.tracing import TRACER, traced
+
 
 LANGUAGE_EXTENSIONS = {
     'Python': ['.py', '.pyw', '.pyi'],
@@ -78,11 +81,13 @@ class FileInfo:
     - marked: 是否被标记为选中状态，用于批量操作
     - _cached_size: 缓存的文件大小，避免重复获取
     - _cached_mtime: 缓存的修改时间，用于变更检测
+    - _cached_language: 缓存的语言类型，避免重复匹配扩展名
     """
     path: str                # 文件完整路径
     marked: bool = True      # 是否被标记选中
     _cached_size: int = None # 缓存的文件大小
     _cached_mtime: float = None # 缓存的修改时间
+    _cached_language: str = None # 缓存的语言类型
     
     @property
     def name(self) -> str:
@@ -92,11 +97,15 @@ class FileInfo:
     @property
     def language(self) -> str:
         """获取文件对应的编程语言"""
-        return get_language(self.path)
+        if self._cached_language is None:
+            self._cached_language = get_language(self.path)
+        return self._cached_language
 
     @property
     def size(self) -> int:
-        """获取文件大小（字节）"""
+        """获取文件大小（字节），优先使用缓存避免重复stat"""
+        if self._cached_size is not None:
+            return self._cached_size
         try:
             return os.path.getsize(self.path)
         except:
@@ -123,9 +132,17 @@ class FileInfo:
         return self.mtime != self._cached_mtime
 
     def update_cache(self):
-        """手动更新缓存信息"""
-        self._cached_size = self.size
-        self._cached_mtime = self.mtime
+        """手动更新缓存信息（单次stat同时获取大小和修改时间）"""
+        try:
+            self.apply_stat(os.stat(self.path))
+        except OSError:
+            self._cached_size = 0
+            self._cached_mtime = 0
+
+    def apply_stat(self, st: os.stat_result):
+        """使用已有的stat结果填充缓存"""
+        self._cached_size = st.st_size
+        self._cached_mtime = st.st_mtime
 
 class FileHandler:
     """
@@ -164,7 +181,9 @@ class FileHandler:
         支持动态添加和删除文件操作
         """
         self.files: List[FileInfo] = []
+        self._paths = set()  # 路径索引，O(1)重复检测
     
+    @traced('FileHandler.add_file')
     def add_file(self, path: str) -> bool:
         """
         添加单个文件到处理列表
@@ -188,24 +207,86 @@ class FileHandler:
         - 文件访问异常时安全降级
 
         性能考虑：
-        - 使用列表推导式进行重复检测
-        - 立即初始化文件缓存，避免后续重复访问
+        - 使用路径索引进行重复检测
+        - 单次stat同时完成存在性检查和缓存初始化
         """
-        # 验证文件存在且为普通文件
-        if not os.path.isfile(path):
+        # 检查文件是否已存在于列表中
+        if path in self._paths:
             return False
 
-        # 检查文件是否已存在于列表中
-        if any(f.path == path for f in self.files):
+        # 验证文件存在且为普通文件
+        try:
+            with TRACER.span('FileHandler.stat'):
+                st = os.stat(path)
+        except OSError:
+            return False
+        if not stat.S_ISREG(st.st_mode):
             return False
 
         # 创建文件信息对象并初始化缓存
         file_info = FileInfo(path=path, marked=True)
-        file_info.update_cache()  # 立即获取文件元数据
+        file_info.apply_stat(st)
 
         # 添加到文件列表
-        self.files.append(file_info)
+        self._append(file_info)
         return True
+
+    def add_stat_entries(self, entries: Iterable[Tuple[str, os.stat_result]]) -> int:
+        """
+        批量添加已完成stat的文件
+
+        与add_file相比不再重复访问磁盘，适合启动恢复等
+        在后台线程预先批量stat的场景
+        """
+        count = 0
+        for path, st in entries:
+            if path in self._paths:
+                continue
+            file_info = FileInfo(path=path, marked=True)
+            file_info.apply_stat(st)
+            self._append(file_info)
+            count += 1
+        return count
+
+    def add_file_infos(self, file_infos: Iterable[FileInfo]) -> int:
+        """
+        批量添加已构建的文件信息（如会话快照），不访问磁盘
+
+        快照中的缓存字段被直接信任，需要时通过apply_validation校验
+        """
+        count = 0
+        for file_info in file_infos:
+            if file_info.path in self._paths:
+                continue
+            self._append(file_info)
+            count += 1
+        return count
+
+    def apply_validation(self, missing: Iterable[str], changed: Iterable[Tuple[str, os.stat_result]]) -> int:
+        """
+        应用快照校验结果
+
+        - missing: 已不存在的文件路径，从列表中移除
+        - changed: 大小或修改时间发生变化的文件及其最新stat结果
+
+        返回移除的文件数量
+        """
+        missing = set(missing) & self._paths
+        if missing:
+            self.files = [f for f in self.files if f.path not in missing]
+            self._paths -= missing
+
+        changed = dict(changed)
+        if changed:
+            for file_info in self.files:
+                st = changed.get(file_info.path)
+                if st is not None:
+                    file_info.apply_stat(st)
+        return len(missing)
+
+    def _append(self, file_info: FileInfo):
+        self.files.append(file_info)
+        self._paths.add(file_info.path)
     
     def add_files(self, paths: List[str]) -> int:
         count = 0
@@ -225,14 +306,18 @@ class FileHandler:
         return count
     
     def remove_file(self, path: str) -> bool:
+        if path not in self._paths:
+            return False
         for i, file in enumerate(self.files):
             if file.path == path:
                 self.files.pop(i)
+                self._paths.discard(path)
                 return True
         return False
     
     def clear(self):
         self.files.clear()
+        self._paths.clear()
     
     def toggle_mark(self, path: str) -> bool:
         for file in self.files:
@@ -298,6 +383,7 @@ class FileHandler:
         for file_info in self.files[:]:  # 使用切片创建副本进行迭代
             if not file_info.exists:
                 self.files.remove(file_info)
+                self._paths.discard(file_info.path)
                 removed.append(file_info.path)
             else:
                 if file_info.is_modified():
@@ -320,6 +406,49 @@ def get_language(file_path: str) -> str:
     
     return "Text"
 
+def stat_paths(paths: Iterable[str]) -> List[Tuple[str, os.stat_result]]:
+    """
+    批量stat文件路径（stat缓存）
+
+    - 每个路径只访问一次磁盘，结果可直接交给add_stat_entries
+    - 不存在或不是普通文件的路径被跳过
+    - 不修改任何共享状态，可在后台线程中调用
+    """
+    entries = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            entries.append((path, st))
+    return entries
+
+def validate_snapshot(snapshot: Iterable[Tuple[str, int, float]]):
+    """
+    校验会话快照（可在后台线程调用）
+
+    参数：
+    - snapshot: (路径, 快照大小, 快照修改时间) 序列
+
+    返回值：
+    - missing: 不存在或不再是普通文件的路径列表
+    - changed: 与快照不一致的 (路径, stat结果) 列表
+    """
+    missing = []
+    changed = []
+    for path, size, mtime in snapshot:
+        try:
+            st = os.stat(path)
+        except OSError:
+            missing.append(path)
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            missing.append(path)
+        elif st.st_size != size or st.st_mtime != mtime:
+            changed.append((path, st))
+    return missing, changed
+
 def get_all_languages() -> List[str]:
     return sorted(LANGUAGE_EXTENSIONS.keys())
 
@@ -328,14 +457,23 @@ def scan_folder(folder_path: str, recursive: bool = True):
     all_extensions = {ext for exts in LANGUAGE_EXTENSIONS.values() for ext in exts}
     
     if recursive:
-        for root, _, files in os.walk(folder_path):
+        walker = os.walk(folder_path)
+        while True:
+            # 只计时目录读取本身，不包含调用方处理产出文件的时间
+            with TRACER.span('scan_folder.walk'):
+                step = next(walker, None)
+            if step is None:
+                break
+            root, _, files = step
             for file in files:
                 file_path = os.path.join(root, file)
                 _, ext = os.path.splitext(file_path.lower())
                 if ext in all_extensions:
                     yield file_path
     else:
-        for file in os.listdir(folder_path):
+        with TRACER.span('scan_folder.listdir'):
+            names = os.listdir(folder_path)
+        for file in names:
             file_path = os.path.join(folder_path, file)
             if os.path.isfile(file_path):
                 _, ext = os.path.splitext(file_path.lower())
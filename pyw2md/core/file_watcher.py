@@ -5,6 +5,7 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileDeletedEvent
 from .file_state_manager import FileStateManager
 from utils.debouncer import SimpleDebouncer
+from .tracing import TRACER
 from .constants import (
     DEFAULT_DEBOUNCE_MS, MAX_WATCH_ERRORS, MSG_WATCH_FAILED, MSG_WATCH_RESTARTED,
     FILE_CHANGE_MODIFIED, FILE_CHANGE_DELETED
@@ -36,8 +37,9 @@ class FileChangeHandler(FileSystemEventHandler):
         try:
             changes = self.file_state_manager.get_and_clear_changes()
             if changes:
-                for change in changes:
-                    self.file_change_callback(change.change_type, change.path)
+                with TRACER.span('watcher.process_changes', changes=len(changes)):
+                    for change in changes:
+                        self.file_change_callback(change.change_type, change.path)
         except Exception as e:
             self.error_callback(f"处理文件变化时发生错误: {e}", "change_processing_error", e)
     
@@ -51,8 +53,9 @@ class FileChangeHandler(FileSystemEventHandler):
             if file_path not in self.monitored_files:
                 return
 
-            self.file_state_manager.add_change(file_path, 'modified')
-            self.debouncer.schedule()
+            with TRACER.span('watcher.on_modified'):
+                self.file_state_manager.add_change(file_path, 'modified')
+                self.debouncer.schedule()
             
         except Exception as e:
             self.error_callback(f"处理文件修改事件时发生错误: {e}", "file_modified_error", e)
@@ -67,8 +70,9 @@ class FileChangeHandler(FileSystemEventHandler):
             if file_path not in self.monitored_files:
                 return
 
-            self.file_state_manager.add_change(file_path, 'deleted')
-            self.debouncer.schedule()
+            with TRACER.span('watcher.on_deleted'):
+                self.file_state_manager.add_change(file_path, 'deleted')
+                self.debouncer.schedule()
             
         except Exception as e:
             self.error_callback(f"处理文件删除事件时发生错误: {e}", "file_deleted_error", e)
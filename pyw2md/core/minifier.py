@@ -0,0 +1,262 @@
+"""
+源码精简模块 - 面向LLM上下文的注释与空白剔除
+
+核心职责：
+- 按FileInfo.language选择精简器，剔除注释、文档字符串和空行
+- 保留字符串字面量原样不变，精简后的代码语义不变
+
+实现方式：
+- Python: tokenize识别注释和空行，ast定位文档字符串
+  - 文档字符串是函数/类体中唯一语句时替换为"..."，保证代码仍可解析
+  - 代码无法解析时（如Python 2语法）只删除空行
+- 其他语言: 单次正则扫描的轻量词法器，字符串优先匹配，注释被删除
+  - C风格: // 和 /* */（JavaScript、Java、C/C++、Go、Rust等）
+  - JavaScript/TypeScript另外识别正则字面量，其中的 // 不会被当作注释
+  - 井号风格: 仅在行首或空白后出现的 # 视为注释（Shell、Ruby、YAML等）
+  - SQL/Lua: -- 行注释及各自的块注释
+  - HTML/XML/Vue/Svelte: <!-- -->
+- Markdown和纯文本的空行有语义，不做处理
+
+性能考虑：
+- 每种语言的正则只编译一次
+- 精简在转换工作线程中执行，结果随渲染片段一起缓存
+"""
+
+import io
+import re
+import ast
+import token
+import tokenize
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# 连续空白行和行尾空白
+_BLANK_LINES_RE = re.compile(r'[ \t]*\n(?:[ \t]*\n)+')
+_TRAILING_WS_RE = re.compile(r'[ \t]+(?=\n)')
+
+# 常用字符串字面量
+_DQ_STRING = r'"(?:\\.|[^"\\\n])*"'
+_SQ_STRING = r"'(?:\\.|[^'\\\n])*'"
+_BACKTICK_STRING = r'`(?:\\.|[^`\\])*`'
+# Rust的单引号既用于字符字面量也用于生命周期，只匹配单个字符
+_CHAR_LITERAL = r"'(?:\\[^']{1,10}|[^'\\\n])'"
+# JavaScript正则字面量候选：字符类[...]中的 / 不结束正则；是否为正则由前文决定（见_Lexer）
+_REGEX_LITERAL = r'/(?![/*])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*'
+
+# 正则字面量之前（忽略空白）可以出现的字符和关键字，其余情况的 / 是除号
+_REGEX_PRECEDING_CHARS = frozenset('(,=:[!&|?{};+-*%<>~^\n')
+_REGEX_PRECEDING_WORDS = ('return', 'typeof', 'case')
+
+# 常用注释
+_LINE_COMMENT = r'//[^\n]*'
+_BLOCK_COMMENT = r'/\*.*?\*/'
+_HASH_COMMENT = r'(?:(?<=[ \t])|(?<=^))#[^\n]*'
+# PHP 8的 #[...] 是属性而不是注释
+_PHP_HASH_COMMENT = r'(?:(?<=[ \t])|(?<=^))#(?!\[)[^\n]*'
+_SQL_LINE_COMMENT = r'--[^\n]*'
+_LUA_BLOCK_COMMENT = r'--\[(?P<eq>=*)\[.*?\](?P=eq)\]'
+_HTML_COMMENT = r'<!--.*?-->'
+_POWERSHELL_BLOCK_COMMENT = r'<#.*?#>'
+
+# 不产生代码内容的token类型
+_NON_CODE_TOKENS = {
+    token.COMMENT, token.NL, token.NEWLINE, token.INDENT, token.DEDENT,
+    token.ENDMARKER, token.ENCODING
+}
+
+
+def _collapse_blank_lines(code: str) -> str:
+    """删除代码片段中的行尾空白和空行"""
+    code = _TRAILING_WS_RE.sub('', code)
+    return _BLANK_LINES_RE.sub('\n', code)
+
+
+class _Lexer:
+    """
+    轻量词法器
+
+    - 字符串和注释合并为一个正则，单次扫描完成识别
+    - 字符串原样保留，注释删除，其余代码片段合并后清理空行
+    - regex: 正则字面量候选（JavaScript），只有前文允许开始正则时才按字符串保留，
+      否则 / 作为除号，从下一个字符继续扫描；误判为正则时只会多保留注释，不会破坏代码
+    """
+
+    def __init__(self, strings: List[str], comments: List[str], regex: Optional[str] = None):
+        parts = [f'(?P<s>{"|".join(strings)})'] if strings else []
+        if regex:
+            parts.append(f'(?P<r>{regex})')
+        parts.append(f'(?P<c>{"|".join(comments)})')
+        self._pattern = re.compile('|'.join(parts), re.DOTALL | re.MULTILINE)
+
+    @staticmethod
+    def _regex_allowed(text: str, start: int) -> bool:
+        """start处的 / 之前（跳过空白）是行首、运算符或关键字时开始正则字面量"""
+        i = start - 1
+        while i >= 0 and text[i] in ' \t':
+            i -= 1
+        if i < 0 or text[i] in _REGEX_PRECEDING_CHARS:
+            return True
+        for word in _REGEX_PRECEDING_WORDS:
+            begin = i + 1 - len(word)
+            if (text.startswith(word, begin)
+                    and (begin == 0 or not (text[begin - 1].isalnum() or text[begin - 1] in '_$'))):
+                return True
+        return False
+
+    def minify(self, text: str) -> str:
+        pieces: List[str] = []
+        code: List[str] = []
+        pos = 0
+        search = self._pattern.search
+
+        match = search(text)
+        while match is not None:
+            if match.lastgroup == 'r' and not self._regex_allowed(text, match.start()):
+                # 除号：保留为代码，从 / 之后继续识别
+                match = search(text, match.start() + 1)
+                continue
+            code.append(text[pos:match.start()])
+            if match.lastgroup != 'c':
+                pieces.append(_collapse_blank_lines(''.join(code)))
+                pieces.append(match.group())
+                code = []
+            pos = match.end()
+            match = search(text, pos)
+        code.append(text[pos:])
+        pieces.append(_collapse_blank_lines(''.join(code)))
+
+        return ''.join(pieces).strip('\n') + '\n'
+
+
+_C_FAMILY = _Lexer([_DQ_STRING, _SQ_STRING, _BACKTICK_STRING], [_LINE_COMMENT, _BLOCK_COMMENT])
+_JS_FAMILY = _Lexer([_DQ_STRING, _SQ_STRING, _BACKTICK_STRING], [_LINE_COMMENT, _BLOCK_COMMENT],
+                    regex=_REGEX_LITERAL)
+_RUST = _Lexer([_DQ_STRING, _CHAR_LITERAL], [_LINE_COMMENT, _BLOCK_COMMENT])
+_CSS = _Lexer([_DQ_STRING, _SQ_STRING], [_BLOCK_COMMENT])
+_PHP = _Lexer([_DQ_STRING, _SQ_STRING], [_LINE_COMMENT, _BLOCK_COMMENT, _PHP_HASH_COMMENT])
+_HASH_FAMILY = _Lexer([_DQ_STRING, _SQ_STRING], [_HASH_COMMENT])
+_POWERSHELL = _Lexer([_DQ_STRING, _SQ_STRING], [_POWERSHELL_BLOCK_COMMENT, _HASH_COMMENT])
+_SQL = _Lexer([_SQ_STRING, _DQ_STRING], [_SQL_LINE_COMMENT, _BLOCK_COMMENT])
+_LUA = _Lexer([_DQ_STRING, _SQ_STRING], [_LUA_BLOCK_COMMENT, _SQL_LINE_COMMENT])
+_MARKUP = _Lexer([], [_HTML_COMMENT])
+
+
+def _char_col(line: str, byte_col: int) -> int:
+    """ast的列偏移是UTF-8字节偏移，转换为字符偏移"""
+    return len(line.encode('utf-8')[:byte_col].decode('utf-8', 'ignore'))
+
+
+def _docstring_nodes(tree: ast.AST) -> List[Tuple[ast.Expr, bool]]:
+    """返回(文档字符串语句, 是否为所在函数/类体的唯一语句)列表"""
+    nodes = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if not node.body:
+            continue
+        first = node.body[0]
+        if (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+                and isinstance(first.value.value, str)):
+            sole = len(node.body) == 1 and not isinstance(node, ast.Module)
+            nodes.append((first, sole))
+    return nodes
+
+
+def minify_python(text: str) -> str:
+    """
+    精简Python源码
+
+    - 删除注释、文档字符串和空行
+    - 多行字符串内部的空行属于字符串内容，保持不变
+    """
+    try:
+        tree = ast.parse(text)
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (SyntaxError, ValueError, tokenize.TokenError):
+        return _collapse_blank_lines(text).strip('\n') + '\n'
+
+    lines = text.splitlines(keepends=True)
+    code_rows: Set[int] = set()
+    comment_cols: Dict[int, int] = {}
+
+    for tok in tokens:
+        if tok.type == token.COMMENT:
+            comment_cols[tok.start[0]] = tok.start[1]
+        elif tok.type not in _NON_CODE_TOKENS:
+            code_rows.update(range(tok.start[0], tok.end[0] + 1))
+
+    # 行号(1起) -> 替换后的行内容，None表示删除该行
+    replaced: Dict[int, Optional[str]] = {}
+
+    for node, sole in _docstring_nodes(tree):
+        start, end = node.lineno, node.end_lineno
+        first_line, last_line = lines[start - 1], lines[end - 1]
+        start_col = _char_col(first_line, node.col_offset)
+        end_col = _char_col(last_line, node.end_col_offset)
+        rest = last_line[end_col:].strip()
+        own_lines = not first_line[:start_col].strip() and (not rest or rest.startswith('#'))
+
+        if own_lines:
+            for row in range(start, end + 1):
+                replaced[row] = None
+            if sole:
+                replaced[start] = first_line[:start_col] + '...\n'
+        elif sole and start == end:
+            # 形如 def f(): """doc""" 的单行定义
+            replaced[start] = first_line[:start_col] + '...' + first_line[end_col:]
+
+    output = []
+    for row, line in enumerate(lines, 1):
+        if row in replaced:
+            line = replaced[row]
+            if line is None:
+                continue
+        elif row not in code_rows:
+            # 空行或只有注释的行
+            continue
+        elif row in comment_cols:
+            line = line[:comment_cols[row]].rstrip() + '\n'
+        output.append(line)
+
+    return ''.join(output)
+
+
+_MINIFIERS: Dict[str, Callable[[str], str]] = {
+    'Python': minify_python,
+    'JavaScript': _JS_FAMILY.minify,
+    'TypeScript': _JS_FAMILY.minify,
+    'Java': _C_FAMILY.minify,
+    'C': _C_FAMILY.minify,
+    'C++': _C_FAMILY.minify,
+    'C#': _C_FAMILY.minify,
+    'Go': _C_FAMILY.minify,
+    'Swift': _C_FAMILY.minify,
+    'Kotlin': _C_FAMILY.minify,
+    'Dart': _C_FAMILY.minify,
+    'Rust': _RUST.minify,
+    'PHP': _PHP.minify,
+    'CSS': _CSS.minify,
+    'Ruby': _HASH_FAMILY.minify,
+    'Shell': _HASH_FAMILY.minify,
+    'YAML': _HASH_FAMILY.minify,
+    'Perl': _HASH_FAMILY.minify,
+    'R': _HASH_FAMILY.minify,
+    'PowerShell': _POWERSHELL.minify,
+    'SQL': _SQL.minify,
+    'Lua': _LUA.minify,
+    'HTML': _MARKUP.minify,
+    'XML': _MARKUP.minify,
+    'Vue': _MARKUP.minify,
+    'Svelte': _MARKUP.minify,
+}
+
+
+def minify_source(text: str, language: str) -> str:
+    """
+    按语言精简源码
+
+    不支持的语言（Markdown、Text、JSON等）原样返回
+    """
+    minifier = _MINIFIERS.get(language)
+    if minifier is None:
+        return text
+    return minifier(text)
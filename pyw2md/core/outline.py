@@ -0,0 +1,285 @@
+"""
+大纲提取模块 - 超大代码库的骨架模式
+
+核心职责：
+- 只保留类、函数等声明的签名以及文档说明的首行，省略全部实现
+- 使超大代码库（GB级）也能汇总为单个可供LLM阅读的文档
+
+实现方式：
+- Python: ast解析，还原装饰器、类继承、函数参数和返回值注解
+  - 类中带注解的字段（如dataclass字段）一并保留
+  - 模块和类中 if/try/with/for/while 块内的声明同样提取，块头一并保留
+    （如 if TYPE_CHECKING:、except ImportError:），不含声明的块省略
+  - 无法解析的代码退化为按行匹配def/class
+- 其他语言: 按语言族的声明正则逐行匹配（轻量词法），声明上方紧邻注释的首行作为说明
+- Markdown: 保留标题行
+- 其余语言（JSON、YAML等）只输出行数说明
+
+进程模型：
+- extract_outline为模块级纯函数，可直接提交到ProcessPoolExecutor
+- ast解析是CPU密集型操作，在多进程中执行才能绕过GIL
+"""
+
+import re
+import ast
+from typing import List, Optional, Tuple
+
+# 文本小于该字符数时直接在当前线程提取，省去进程间传输的开销
+OUTLINE_INLINE_CHARS = 4096
+
+_INDENT = '    '
+
+
+def _first_line(text: Optional[str]) -> str:
+    if not text:
+        return ''
+    stripped = text.strip()
+    return stripped.splitlines()[0].strip() if stripped else ''
+
+
+def _python_signature(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases]
+        bases += [
+            f"{k.arg}={ast.unparse(k.value)}" if k.arg else f"**{ast.unparse(k.value)}"
+            for k in node.keywords
+        ]
+        return f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature + ':'
+
+
+# try语句节点（Python 3.11起except*为单独的TryStar节点）
+_TRY_NODES = (ast.Try, ast.TryStar) if hasattr(ast, 'TryStar') else (ast.Try,)
+
+
+def _python_blocks(node: ast.stmt) -> Optional[List[Tuple[str, List[ast.stmt]]]]:
+    """复合语句的各子块 [(块头, 语句列表)]，不是复合语句时返回None"""
+    if isinstance(node, ast.If):
+        blocks = [(f"if {ast.unparse(node.test)}:", node.body)]
+        orelse = node.orelse
+        while len(orelse) == 1 and isinstance(orelse[0], ast.If):
+            blocks.append((f"elif {ast.unparse(orelse[0].test)}:", orelse[0].body))
+            orelse = orelse[0].orelse
+    elif isinstance(node, _TRY_NODES):
+        keyword = 'except' if isinstance(node, ast.Try) else 'except*'
+        blocks = [('try:', node.body)]
+        for handler in node.handlers:
+            header = keyword
+            if handler.type is not None:
+                header += f" {ast.unparse(handler.type)}"
+            if handler.name:
+                header += f" as {handler.name}"
+            blocks.append((header + ':', handler.body))
+        orelse = node.orelse
+    elif isinstance(node, (ast.With, ast.AsyncWith)):
+        prefix = 'async with' if isinstance(node, ast.AsyncWith) else 'with'
+        items = ', '.join(ast.unparse(item) for item in node.items)
+        return [(f"{prefix} {items}:", node.body)]
+    elif isinstance(node, (ast.For, ast.AsyncFor)):
+        prefix = 'async for' if isinstance(node, ast.AsyncFor) else 'for'
+        blocks = [(f"{prefix} {ast.unparse(node.target)} in {ast.unparse(node.iter)}:", node.body)]
+        orelse = node.orelse
+    elif isinstance(node, ast.While):
+        blocks = [(f"while {ast.unparse(node.test)}:", node.body)]
+        orelse = node.orelse
+    else:
+        return None
+
+    if orelse:
+        blocks.append(('else:', orelse))
+    if isinstance(node, _TRY_NODES) and node.finalbody:
+        blocks.append(('finally:', node.finalbody))
+    return blocks
+
+
+def _outline_python_body(body: List[ast.stmt], depth: int, out: List[str], in_class: bool):
+    indent = _INDENT * depth
+    for node in body:
+        blocks = _python_blocks(node)
+        if blocks is not None:
+            # 只要任一子块含有声明，就输出全部块头，空的子块以...占位
+            rendered = []
+            for header, block in blocks:
+                inner: List[str] = []
+                _outline_python_body(block, depth + 1, inner, in_class)
+                rendered.append((header, inner))
+            if any(inner for _, inner in rendered):
+                for header, inner in rendered:
+                    out.append(indent + header)
+                    out.extend(inner or [f"{indent}{_INDENT}..."])
+            continue
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for decorator in node.decorator_list:
+                out.append(f"{indent}@{ast.unparse(decorator)}")
+            out.append(indent + _python_signature(node))
+
+            inner = indent + _INDENT
+            start = len(out)
+            doc = _first_line(ast.get_docstring(node, clean=True))
+            if doc:
+                out.append(f'{inner}"""{doc}"""')
+            if isinstance(node, ast.ClassDef):
+                _outline_python_body(node.body, depth + 1, out, in_class=True)
+            if len(out) == start or not isinstance(node, ast.ClassDef):
+                out.append(f"{inner}...")
+
+        elif in_class and isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            out.append(f"{indent}{node.target.id}: {ast.unparse(node.annotation)}")
+
+
+_PYTHON_FALLBACK = re.compile(r'^\s*(?:@|(?:async\s+)?def\s|class\s)')
+
+
+def outline_python(text: str) -> str:
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return '\n'.join(
+            line.rstrip() for line in text.splitlines() if _PYTHON_FALLBACK.match(line)
+        )
+
+    out: List[str] = []
+    doc = _first_line(ast.get_docstring(tree, clean=True))
+    if doc:
+        out.append(f'"""{doc}"""')
+    _outline_python_body(tree.body, 0, out, in_class=False)
+    return '\n'.join(out)
+
+
+class _DeclarationRules:
+    """
+    按行匹配的声明规则
+
+    - declaration: 匹配声明行的正则
+    - comment: (注释行正则, 输出说明时使用的注释前缀)，正则的text分组为注释文本
+    - 控制语句（if/for/while等）总是被排除，避免误匹配
+    """
+
+    _CONTROL = re.compile(r'^\s*(?:if|for|while|switch|catch|return|else|do|using|lock|foreach)\b')
+
+    def __init__(self, declaration: str, comment: Optional[Tuple[str, str]] = None, flags: int = 0):
+        self.declaration = re.compile(declaration, flags)
+        self.comment = re.compile(comment[0]) if comment else None
+        self.doc_prefix = comment[1] if comment else ''
+
+    def outline(self, text: str) -> str:
+        out: List[str] = []
+        doc: Optional[str] = None  # 紧邻上方注释块的首行
+        block_indent: Optional[str] = None  # 注释块起始行的缩进
+
+        for line in text.splitlines():
+            if self.comment is not None:
+                match = self.comment.match(line)
+                if match:
+                    if block_indent is None:
+                        block_indent = line[:len(line) - len(line.lstrip())]
+                    body = match.group('text').strip()
+                    if doc is None and body:
+                        doc = f"{block_indent}{self.doc_prefix} {body}"
+                    continue
+
+            if self.declaration.match(line) and not self._CONTROL.match(line):
+                if doc:
+                    out.append(doc.rstrip())
+                out.append(line.rstrip().rstrip('{').rstrip())
+            doc = None
+            block_indent = None
+
+        return '\n'.join(out)
+
+
+_C_COMMENT = (r'^\s*(?:///?|/\*\*?|\*/?)\s*(?P<text>.*?)(?:\*/)?\s*$', '//')
+_HASH_COMMENT = (r'^\s*#(?![!\[])\s*(?P<text>.*)$', '#')
+_DASH_COMMENT = (r'^\s*--\s*(?P<text>.*)$', '--')
+
+_MODIFIERS = (r'(?:(?:public|private|protected|internal|static|final|abstract|override|virtual|'
+              r'async|synchronized|open|suspend|inline|sealed|partial|extern|unsafe|readonly|'
+              r'export|default|declare|fileprivate|mutating|external|factory|const)\s+)')
+
+_RULES = {
+    'JavaScript': _DeclarationRules(
+        r'^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:function\*?|class)\s*[\w$]'
+        r'|^\s*(?:export\s+)?(?:const|let|var)\s+[\w$]+\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|[\w$]+\s*=>)'
+        r'|^\s+(?:static\s+|async\s+|get\s+|set\s+)*[\w$]+\s*\([^;]*\)\s*\{\s*$',
+        _C_COMMENT),
+    'TypeScript': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:function\*?|class|interface|type|enum|namespace|module)\s+[\w$]'
+        r'|^\s*(?:export\s+)?(?:const|let|var)\s+[\w$]+\s*(?::[^=]+)?=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[\w$]+\s*=>)'
+        r'|^\s+' + _MODIFIERS + r'*[\w$]+\s*(?:<[^>]*>)?\s*\([^;]*\)\s*(?::[^{;]+)?\{\s*$',
+        _C_COMMENT),
+    'Java': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:class|interface|enum|record|@interface)\s+\w'
+        r'|^\s*' + _MODIFIERS + r'+[\w<>\[\],.?\s]+\s+\w+\s*\([^;]*$',
+        _C_COMMENT),
+    'C#': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:class|interface|enum|struct|record|namespace)\s+\w'
+        r'|^\s*' + _MODIFIERS + r'+[\w<>\[\],.?\s]+\s+\w+\s*\([^;]*$',
+        _C_COMMENT),
+    'Kotlin': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:data\s+|enum\s+|annotation\s+)?(?:class|interface|object|fun|typealias)\s+\S',
+        _C_COMMENT),
+    'Swift': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:class|struct|enum|protocol|extension|func|init|actor|typealias)\b',
+        _C_COMMENT),
+    'Dart': _DeclarationRules(
+        r'^\s*(?:abstract\s+)?(?:class|mixin|extension|enum|typedef)\s+\w'
+        r'|^\s*' + _MODIFIERS + r'*[\w<>?,\s]+\s+\w+\s*\([^;]*\)\s*(?:async\s*)?\{\s*$',
+        _C_COMMENT),
+    'Go': _DeclarationRules(r'^(?:func|type)\s', _C_COMMENT),
+    'Rust': _DeclarationRules(
+        r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+|const\s+|unsafe\s+|extern\s+"[^"]*"\s+)*'
+        r'(?:fn|struct|enum|trait|impl|mod|type|union|macro_rules!)\b',
+        _C_COMMENT),
+    'C': _DeclarationRules(
+        r'^(?:static\s+|inline\s+|extern\s+)*[A-Za-z_][\w\s\*]*[\s\*]\**\w+\s*\([^;]*$'
+        r'|^\s*(?:typedef\s+)?(?:struct|union|enum)\s+\w+\s*\{',
+        _C_COMMENT),
+    'C++': _DeclarationRules(
+        r'^\s*(?:template\s*<.*>\s*)?(?:class|struct|namespace|union|enum(?:\s+class)?)\s+\w+[^;]*$'
+        r'|^(?:template\s*<.*>\s*)?(?:static\s+|inline\s+|virtual\s+|constexpr\s+|extern\s+)*'
+        r'[A-Za-z_~][\w:\s\*&<>,~]*\([^;]*$'
+        r'|^\s+(?:virtual\s+|static\s+|inline\s+|explicit\s+)*[\w:\*&<>,~\s]+\([^;]*\)\s*(?:const\s*)?(?:override\s*)?\{?\s*$',
+        _C_COMMENT),
+    'PHP': _DeclarationRules(
+        r'^\s*' + _MODIFIERS + r'*(?:function|class|interface|trait|enum)\s+\w',
+        _C_COMMENT),
+    'Ruby': _DeclarationRules(r'^\s*(?:def|class|module)\s', _HASH_COMMENT),
+    'Shell': _DeclarationRules(r'^\s*(?:function\s+[\w-]+|[\w-]+\s*\(\s*\))', _HASH_COMMENT),
+    'PowerShell': _DeclarationRules(r'^\s*(?:function|filter|class|enum)\s', _HASH_COMMENT, re.IGNORECASE),
+    'Perl': _DeclarationRules(r'^\s*(?:sub|package)\s', _HASH_COMMENT),
+    'R': _DeclarationRules(r'^\s*[\w.]+\s*(?:<-|=)\s*function\s*\(', _HASH_COMMENT),
+    'Lua': _DeclarationRules(r'^\s*(?:local\s+)?function\s', _DASH_COMMENT),
+    'SQL': _DeclarationRules(
+        r'^\s*create\s+(?:or\s+replace\s+)?(?:temporary\s+|temp\s+|unique\s+)?'
+        r'(?:table|view|function|procedure|index|trigger|type|schema)\b',
+        _DASH_COMMENT, re.IGNORECASE),
+    'Markdown': _DeclarationRules(r'^#{1,6}\s'),
+}
+_RULES['Vue'] = _RULES['TypeScript']
+_RULES['Svelte'] = _RULES['TypeScript']
+
+
+def extract_outline(text: str, language: str) -> str:
+    """
+    提取源码大纲
+
+    - 模块级函数，可在工作进程中执行
+    - 没有可提取的声明时返回行数说明，保证每个文件在文档中都有位置
+    - 与minify_source一致，结果总以单个换行结尾
+    """
+    if language == 'Python':
+        outline = outline_python(text)
+    elif language in _RULES:
+        outline = _RULES[language].outline(text)
+    else:
+        outline = ''
+
+    if not outline:
+        return f"（大纲模式：共 {text.count(chr(10)) + 1} 行，无可提取的声明）\n"
+    return outline + '\n'
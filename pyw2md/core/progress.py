@@ -0,0 +1,114 @@
+"""
+进度汇总模块 - 限频进度发布
+
+核心职责：
+- 接收转换线程逐文件的进度回调，按固定频率（默认20Hz）向界面发布
+- 计算已用时间、文件/秒、字节/秒和预计剩余时间（ETA）
+
+设计思路：
+- 逐文件回调只记录时间和计数，距上次发布不足间隔时直接返回，
+  5万个文件的转换只产生几百次界面刷新，而不是5万次Tk回调
+- 最后一个文件总会发布，保证进度最终停在100%
+- 速率按开始以来的平均值计算，数值稳定，不会随单个大文件剧烈跳动
+- 以首次回调为计时起点，速率只统计此后完成的文件（断点续传时不计入已完成部分）
+
+使用方式：
+    aggregator = ProgressAggregator(lambda s: widget.after(0, lambda: panel.update_progress(s)),
+                                    sizes=[f.size for f in files])
+    converter.convert_files(files, output, aggregator)
+"""
+
+import time
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+# 默认发布间隔（秒），20Hz
+PUBLISH_INTERVAL = 0.05
+
+
+class ProgressSnapshot(NamedTuple):
+    """进度快照
+
+    - eta: 预计剩余秒数，速率未知时为None
+    """
+    current: int
+    total: int
+    filename: str
+    elapsed: float
+    files_per_sec: float
+    bytes_per_sec: float
+    eta: Optional[float]
+
+    @property
+    def fraction(self) -> float:
+        return self.current / self.total if self.total > 0 else 0.0
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """格式化时长：1:05:09 / 05:09，未知时为--:--"""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class ProgressAggregator:
+    """
+    进度汇总器，可直接作为Converter.convert_files的progress_callback
+
+    - publish: 发布回调，参数为ProgressSnapshot，在转换线程中调用
+    - sizes: 按转换顺序排列的文件大小，用于计算字节/秒；
+      与回调的total不一致时（如Token预算只选中部分文件）按平均大小估算
+    - interval: 最小发布间隔（秒）
+    """
+
+    def __init__(self, publish: Callable[[ProgressSnapshot], None],
+                 sizes: Optional[List[int]] = None,
+                 interval: float = PUBLISH_INTERVAL):
+        self.publish = publish
+        self.interval = interval
+        self._prefix = [0]
+        for size in sizes or ():
+            self._prefix.append(self._prefix[-1] + size)
+
+        self._lock = threading.Lock()
+        self._start: Optional[float] = None
+        self._baseline = 0
+        self._last_publish = 0.0
+
+    def __call__(self, current: int, total: int, filename: str = ""):
+        now = time.monotonic()
+        with self._lock:
+            if self._start is None:
+                # 首次回调前的耗时包含线程池启动和首个文件的转换，不计入速率
+                self._start = now
+                self._baseline = current
+            if current < total and now - self._last_publish < self.interval:
+                return
+            self._last_publish = now
+        self.publish(self.snapshot(current, total, filename, now))
+
+    def snapshot(self, current: int, total: int, filename: str = "",
+                 now: Optional[float] = None) -> ProgressSnapshot:
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._start if self._start is not None else 0.0
+        done = current - self._baseline
+        if elapsed <= 0 or done <= 0:
+            return ProgressSnapshot(current, total, filename, elapsed, 0.0, 0.0, None)
+
+        files_per_sec = done / elapsed
+        bytes_per_sec = self._bytes_between(self._baseline, current, total) / elapsed
+        eta = (total - current) / files_per_sec if files_per_sec > 0 else None
+        return ProgressSnapshot(current, total, filename, elapsed, files_per_sec, bytes_per_sec, eta)
+
+    def _bytes_between(self, start: int, end: int, total: int) -> float:
+        prefix = self._prefix
+        if len(prefix) - 1 == total:
+            return prefix[end] - prefix[start]
+        if len(prefix) > 1:
+            return (end - start) * prefix[-1] / (len(prefix) - 1)
+        return 0.0
@@ -0,0 +1,242 @@
+"""
+Token预算模块 - 控制LLM上下文文档的规模
+
+核心职责：
+- 使用本地近似分词估算文件的Token数量，无需加载真实分词器
+- 按文件修改时间缓存估算结果，重复导出时不再读取未变化的文件
+- 启用大纲或精简模式时按变换后的内容估算，预算与实际输出一致
+- 在转换前按预算挑选、截断文件，生成可在文档头部展示的预算明细
+
+估算策略：
+- 英文单词按最长6个字母切分，数字按最长3位切分（接近BPE分词的平均粒度）
+- 中日韩字符每个字符计为一个Token
+- 标点、换行和缩进空白分别计为一个Token
+- 整个估算只执行一次正则扫描，速度远高于真实分词器，误差在可接受范围
+
+预算策略：
+- original: 按文件列表原顺序依次装入
+- smallest_first: 优先装入Token较少的文件，使尽可能多的文件进入文档
+- 放不下的文件在剩余预算足够时被截断，否则跳过
+- 无论采用哪种策略，输出顺序都保持文件列表的原顺序
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.file_handler import FileInfo
+from core.encoding import decode_source, read_source
+from core.minifier import minify_source
+from core.outline import extract_outline
+
+_TOKEN_RE = re.compile(
+    r"[A-Za-z]{1,6}"
+    r"|\d{1,3}"
+    r"|[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]"
+    r"|[^\sA-Za-z\d]"
+    r"|\n"
+    r"|[ \t]{2,}"
+)
+
+# 截断后剩余预算过小时不再截断，直接跳过
+MIN_TRUNCATED_TOKENS = 64
+
+TRUNCATION_MARKER = "\n...（内容已按Token预算截断）\n"
+
+BUDGET_STRATEGIES = ('original', 'smallest_first')
+
+STATUS_FULL = 'full'
+STATUS_TRUNCATED = 'truncated'
+STATUS_SKIPPED = 'skipped'
+
+# 内容变换模式 -> 变换函数(文本, 语言)，与转换时的大纲/精简处理一致
+CONTENT_TRANSFORMS = {
+    'minify': minify_source,
+    'outline': extract_outline,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的Token数量"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    按行截断文本，使其估算Token数不超过max_tokens
+
+    截断位置总在行尾，避免切断标识符；被截断时追加截断说明
+    """
+    if max_tokens <= 0:
+        return TRUNCATION_MARKER
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    used = 0
+    kept = []
+    for line in text.splitlines(keepends=True):
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return ''.join(kept).rstrip('\n') + TRUNCATION_MARKER
+
+
+class TokenCache:
+    """
+    Token估算缓存 - 线程安全
+
+    - 以(文件路径, 变换模式)为键，记录(修改时间, 大小, Token数)
+    - 文件修改时间或大小变化时重新估算
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Optional[str]], Tuple[int, int, int]] = {}
+
+    def get_tokens(self, file_info: FileInfo, mode: Optional[str] = None) -> int:
+        """
+        估算文件内容的Token数
+
+        - mode: 内容变换模式（见CONTENT_TRANSFORMS），None表示原样输出
+        """
+        try:
+            st = os.stat(file_info.path)
+        except OSError:
+            return 0
+
+        key = (file_info.path, mode)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        try:
+            data = read_source(file_info.path)
+        except OSError:
+            return 0
+        # 二进制文件在转换时会被跳过，不占用预算
+        if data is None:
+            tokens = 0
+        else:
+            text = decode_source(data)[0]
+            if mode is not None:
+                text = CONTENT_TRANSFORMS[mode](text, file_info.language)
+            tokens = estimate_tokens(text)
+
+        with self._lock:
+            self._entries[key] = (st.st_mtime_ns, st.st_size, tokens)
+        return tokens
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class TokenBudget:
+    """Token预算配置
+
+    - max_tokens: 文档中文件内容（含模板开销）的Token上限
+    - strategy: 装入策略，见BUDGET_STRATEGIES
+    - truncate: 是否允许截断放不下的文件
+    """
+    max_tokens: int
+    strategy: str = 'original'
+    truncate: bool = True
+
+    def __post_init__(self):
+        if self.max_tokens <= 0:
+            raise ValueError("Token预算必须大于0")
+        if self.strategy not in BUDGET_STRATEGIES:
+            raise ValueError(f"未知的预算策略: {self.strategy}")
+
+
+@dataclass
+class BudgetEntry:
+    """单个文件的预算明细
+
+    - tokens: 估算的完整Token数（含模板开销）
+    - allotted: 实际分配的Token数，跳过时为0
+    - content_limit: 文件内容的Token上限，None表示完整输出
+    """
+    file_info: FileInfo
+    tokens: int
+    allotted: int = 0
+    status: str = STATUS_SKIPPED
+    content_limit: Optional[int] = None
+
+
+@dataclass
+class BudgetPlan:
+    """预算规划结果"""
+    budget: TokenBudget
+    entries: List[BudgetEntry] = field(default_factory=list)
+
+    @property
+    def selected(self) -> List[BudgetEntry]:
+        """按原顺序返回被装入文档的文件"""
+        return [e for e in self.entries if e.status != STATUS_SKIPPED]
+
+    @property
+    def used_tokens(self) -> int:
+        return sum(e.allotted for e in self.entries)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(e.tokens for e in self.entries)
+
+    def count(self, status: str) -> int:
+        return sum(1 for e in self.entries if e.status == status)
+
+    def summary(self) -> Dict:
+        return {
+            'max_tokens': self.budget.max_tokens,
+            'used_tokens': self.used_tokens,
+            'total_tokens': self.total_tokens,
+            'full': self.count(STATUS_FULL),
+            'truncated': self.count(STATUS_TRUNCATED),
+            'skipped': self.count(STATUS_SKIPPED)
+        }
+
+
+def plan_budget(files: List[FileInfo], content_tokens: List[int],
+                overheads: List[int], budget: TokenBudget) -> BudgetPlan:
+    """
+    按预算规划文件的装入方式
+
+    参数说明：
+    - files: 文件列表（决定输出顺序）
+    - content_tokens: 与files一一对应的内容Token估算值
+    - overheads: 与files一一对应的模板开销（标题、路径、代码围栏等）
+    - budget: 预算配置
+    """
+    entries = [
+        BudgetEntry(file_info=f, tokens=tokens + overhead)
+        for f, tokens, overhead in zip(files, content_tokens, overheads)
+    ]
+
+    order = list(range(len(entries)))
+    if budget.strategy == 'smallest_first':
+        order.sort(key=lambda i: entries[i].tokens)
+
+    remaining = budget.max_tokens
+    for i in order:
+        entry = entries[i]
+        overhead = overheads[i]
+        if entry.tokens <= remaining:
+            entry.status = STATUS_FULL
+            entry.allotted = entry.tokens
+        elif budget.truncate and remaining - overhead >= MIN_TRUNCATED_TOKENS:
+            entry.status = STATUS_TRUNCATED
+            entry.allotted = remaining
+            entry.content_limit = remaining - overhead
+        else:
+            continue
+        remaining -= entry.allotted
+
+    return BudgetPlan(budget=budget, entries=entries)
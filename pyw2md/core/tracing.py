@@ -0,0 +1,191 @@
+"""
+性能追踪模块 - 热点路径计时
+
+核心职责：
+- 提供上下文管理器形式的计时区间（span），记录名称、线程、开始时间和耗时
+- 导出Chrome Trace格式（chrome://tracing、Perfetto可直接打开）
+- 按区间名称汇总次数、总耗时、分位数和对数直方图
+
+性能考虑：
+- 未启用时span()直接返回共享的空上下文，不读取时钟、不分配对象，开销接近零
+- 启用时每个区间只记录一个元组，list.append在GIL下线程安全，无需加锁
+- 事件数量有上限（MAX_EVENTS），超过后只计数不记录，长时间运行内存可控
+
+使用方式：
+    from core.tracing import TRACER, traced
+
+    with TRACER.span('convert.read', path=path):
+        data = f.read()
+
+    @traced('FileHandler.add_file')
+    def add_file(self, path): ...
+"""
+
+import os
+import json
+import time
+import threading
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+# 最多记录的事件数，约100万个事件占用百MB以内内存
+MAX_EVENTS = 1_000_000
+
+# 事件：(名称, 线程ID, 开始时间ns, 耗时ns, 参数)
+_Event = Tuple[str, int, int, int, Optional[Dict]]
+
+
+class _NullSpan:
+    """未启用追踪时使用的空区间"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_tracer', '_name', '_args', '_start')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: Optional[Dict]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._tracer._record(self._name, self._start, time.perf_counter_ns() - self._start, self._args)
+        return False
+
+
+class Tracer:
+    """
+    追踪器
+
+    - enabled: 是否记录区间，可在运行时切换
+    - dropped: 超过事件上限后未记录的区间数
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = MAX_EVENTS):
+        self.enabled = enabled
+        self.max_events = max_events
+        self.dropped = 0
+        self._events: List[_Event] = []
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, **args):
+        """创建计时区间；未启用时返回共享的空区间"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def _record(self, name: str, start: int, duration: int, args: Optional[Dict]):
+        if len(self._events) < self.max_events:
+            self._events.append((name, threading.get_ident(), start, duration, args))
+        else:
+            self.dropped += 1
+
+    def reset(self):
+        self._events = []
+        self.dropped = 0
+        self._origin = time.perf_counter_ns()
+
+    @property
+    def event_count(self) -> int:
+        return len(self._events)
+
+    def export_chrome_trace(self, path: str):
+        """导出Chrome Trace JSON（完整事件，ph='X'）"""
+        pid = os.getpid()
+        events = []
+        for name, tid, start, duration, args in list(self._events):
+            event = {
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (start - self._origin) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': tid
+            }
+            if args:
+                event['args'] = {k: str(v) for k, v in args.items()}
+            events.append(event)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped}
+            }, f, ensure_ascii=False)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        按区间名称汇总
+
+        - count / total_ms / mean_ms / p50_ms / p90_ms / p99_ms / max_ms
+        - histogram: 以2的幂（微秒）为上界的分桶计数，上界包含在桶内（耗时恰为4us计入<=4us）
+        """
+        durations: Dict[str, List[int]] = {}
+        for name, _, _, duration, _ in list(self._events):
+            durations.setdefault(name, []).append(duration)
+
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            count = len(values)
+
+            def pick(q: float) -> float:
+                return round(values[min(count - 1, int(q * count))] / 1e6, 4)
+
+            histogram: Dict[str, int] = {}
+            for value in values:
+                micros = -(-value // 1000)  # 向上取整，保证耗时不超过桶的上界
+                bucket = f"<={1 << (micros - 1).bit_length() if micros > 1 else 1}us"
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+
+            total = sum(values)
+            result[name] = {
+                'count': count,
+                'total_ms': round(total / 1e6, 3),
+                'mean_ms': round(total / count / 1e6, 4),
+                'p50_ms': pick(0.5),
+                'p90_ms': pick(0.9),
+                'p99_ms': pick(0.99),
+                'max_ms': round(values[-1] / 1e6, 4),
+                'histogram': histogram
+            }
+        return result
+
+    def format_summary(self, top: int = 3) -> str:
+        """生成简短的耗时摘要（总耗时最多的几个区间），用于状态栏显示"""
+        summary = self.summary()
+        ranked = sorted(summary.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:top]
+        return '  '.join(
+            f"{name} {stats['total_ms']:.0f}ms/{stats['count']}次" for name, stats in ranked
+        )
+
+
+# 全局追踪器，默认关闭
+TRACER = Tracer()
+
+
+def traced(name: str):
+    """函数计时装饰器，未启用时只多一次属性判断"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with _Span(TRACER, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
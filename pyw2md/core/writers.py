@@ -0,0 +1,289 @@
+"""
+输出写入模块 - 单文件与分片写入器
+
+核心职责：
+- 为Converter提供统一的顺序写入接口：begin(头部) -> add(片段) -> finish(尾部)
+- MarkdownWriter: 写入单个Markdown文件（默认行为）
+- ShardedMarkdownWriter: 按字节数、Token数或文件数切分为多个分片文件
+
+分片设计：
+- 分片文件命名为 <输出名>.part001.md、<输出名>.part002.md ...
+- 原输出路径写入索引文件：文档头部统计、分片链接表和文档尾部统计
+- 每个分片由独立的写入线程负责，上一个分片仍在落盘时下一个分片已开始写入
+- 写入队列有上限，磁盘跟不上时转换线程自动等待，内存占用可控
+- 片段不会被拆开，单个片段超过上限时独占一个分片
+
+断点续传：
+- MarkdownWriter支持从指定字节偏移处继续追加（见core.conversion_job）
+- tell()刷新缓冲区并返回已落盘的字节偏移，用于记录断点
+
+压缩输出：
+- 指定compression时单文件输出和每个分片都以流式压缩写入（见core.compression）
+- 分片索引文件很小，始终保持为普通Markdown，链接指向压缩后的分片
+- 索引中的大小为分片落盘后的文件大小，压缩时另列压缩前大小
+
+使用方式：
+    with create_writer(output_path, policy) as writer:
+        writer.begin(header)
+        writer.add(fragment, relative_path)
+        writer.finish(footer)
+"""
+
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+from core.file_handler import format_size
+from core.token_budget import estimate_tokens
+from core.compression import WRITE_BUFFER_SIZE, compressed_path, open_output
+
+# 每个分片写入线程的队列上限（片段数）
+SHARD_QUEUE_SIZE = 256
+
+
+@dataclass
+class ShardPolicy:
+    """分片策略
+
+    - max_bytes: 单个分片的最大字节数（UTF-8编码）
+    - max_tokens: 单个分片的最大估算Token数
+    - max_files: 单个分片的最大文件数
+    所有上限为0时表示不分片，多个上限同时设置时任意一个达到即切换分片
+    """
+    max_bytes: int = 0
+    max_tokens: int = 0
+    max_files: int = 0
+
+    def __post_init__(self):
+        if min(self.max_bytes, self.max_tokens, self.max_files) < 0:
+            raise ValueError("分片上限不能为负数")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_bytes or self.max_tokens or self.max_files)
+
+    def exceeds(self, size: int, tokens: int, files: int) -> bool:
+        return ((self.max_bytes and size > self.max_bytes)
+                or (self.max_tokens and tokens > self.max_tokens)
+                or (self.max_files and files > self.max_files))
+
+
+class MarkdownWriter:
+    """
+    单文件顺序写入器，指定compression时输出路径追加压缩后缀
+
+    - resume_offset: 续传时的字节偏移，输出文件先截断到该偏移再追加写入（仅未压缩输出）
+    """
+
+    def __init__(self, output_path: str, compression: Optional[str] = None,
+                 resume_offset: Optional[int] = None):
+        self.output_path = compressed_path(output_path, compression)
+        if resume_offset is None:
+            self._file = open_output(self.output_path, compression)
+        else:
+            if compression:
+                raise ValueError("压缩输出不支持断点续传")
+            os.truncate(self.output_path, resume_offset)
+            self._file = open(self.output_path, 'a', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+    @property
+    def outputs(self) -> List[str]:
+        return [self.output_path]
+
+    def begin(self, header: str):
+        self._file.write(header)
+
+    def add(self, fragment: str, label: str):
+        self._file.write(fragment)
+
+    def finish(self, footer: str):
+        self._file.write(footer)
+
+    def tell(self) -> int:
+        """刷新缓冲区并返回已写入的字节数（仅未压缩输出）"""
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ShardThread(threading.Thread):
+    """
+    分片写入线程
+
+    - 从队列取出片段顺序写入分片文件，None表示分片结束
+    - 写入失败时记录异常并继续清空队列，避免生产者在满队列上永久阻塞
+    """
+
+    def __init__(self, index: int, path: str, compression: Optional[str] = None):
+        super().__init__(name=f'pyw2md-shard-{index}', daemon=True)
+        self.index = index
+        self.path = path
+        self.compression = compression
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=SHARD_QUEUE_SIZE)
+        self.error: Optional[Exception] = None
+        self.closed = False
+
+        # 分片统计，由生产者线程维护；size为压缩前的UTF-8字节数
+        self.files = 0
+        self.size = 0
+        self.tokens = 0
+        self.first_label = ''
+        self.last_label = ''
+
+    def run(self):
+        f = None
+        try:
+            f = open_output(self.path, self.compression)
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                f.write(item)
+        except Exception as e:
+            self.error = e
+            while self.queue.get() is not None:
+                pass
+        finally:
+            if f is not None:
+                try:
+                    f.close()
+                except Exception as e:
+                    self.error = self.error or e
+
+    def put(self, text: str):
+        self.queue.put(text)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+
+
+class ShardedMarkdownWriter:
+    """
+    分片写入器
+
+    - add按顺序接收片段，达到分片上限时关闭当前分片并开启新分片
+    - finish等待全部分片落盘后写入索引文件
+    - 任一分片写入失败时finish抛出该异常
+    """
+
+    def __init__(self, output_path: str, policy: ShardPolicy, compression: Optional[str] = None):
+        self.output_path = output_path
+        self.policy = policy
+        self.compression = compression
+        base, ext = os.path.splitext(output_path)
+        self._shard_pattern = f"{base}.part{{:03d}}{ext or '.md'}"
+        self._index_name = os.path.basename(output_path)
+        self._header = ''
+        self.shards: List[_ShardThread] = []
+
+    @property
+    def outputs(self) -> List[str]:
+        return [self.output_path] + [shard.path for shard in self.shards]
+
+    def begin(self, header: str):
+        # 头部统计写入索引文件，在finish时与分片表一起输出
+        self._header = header
+
+    def add(self, fragment: str, label: str):
+        size = len(fragment.encode('utf-8'))
+        tokens = estimate_tokens(fragment) if self.policy.max_tokens else 0
+
+        shard = self.shards[-1] if self.shards else None
+        if shard is None or (shard.files and self.policy.exceeds(
+                shard.size + size, shard.tokens + tokens, shard.files + 1)):
+            shard = self._open_shard()
+
+        shard.put(fragment)
+        shard.files += 1
+        shard.size += size
+        shard.tokens += tokens
+        if not shard.first_label:
+            shard.first_label = label
+        shard.last_label = label
+
+    def _open_shard(self) -> _ShardThread:
+        if self.shards:
+            self.shards[-1].close()
+
+        index = len(self.shards) + 1
+        path = compressed_path(self._shard_pattern.format(index), self.compression)
+        shard = _ShardThread(index, path, self.compression)
+        shard.start()
+
+        shard_header = (
+            f"# 代码转Markdown文档 - 第 {index} 部分\n\n"
+            f"[返回索引]({self._index_name})\n\n---\n\n"
+        )
+        shard.put(shard_header)
+        shard.size = len(shard_header.encode('utf-8'))
+        self.shards.append(shard)
+        return shard
+
+    def finish(self, footer: str):
+        self._join_shards()
+        for shard in self.shards:
+            if shard.error is not None:
+                raise shard.error
+
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(self._header)
+            f.write(self._generate_index())
+            f.write(footer)
+
+    def _generate_index(self) -> str:
+        """生成分片链接表（在全部分片落盘后调用）"""
+        raw_title, raw_rule = (" 压缩前 |", "-------:|") if self.compression else ("", "")
+        parts = [
+            f"## 分片索引\n\n共 {len(self.shards)} 个分片\n\n",
+            f"| 分片 | 文件数 | 大小 |{raw_title} 估算Tokens | 起始文件 | 结束文件 |\n",
+            f"|------|-------:|-----:|{raw_rule}-----------:|----------|----------|\n"
+        ]
+        for shard in self.shards:
+            name = os.path.basename(shard.path)
+            tokens = shard.tokens if self.policy.max_tokens else '-'
+            raw_size = f" {format_size(shard.size)} |" if self.compression else ""
+            parts.append(
+                f"| [{name}]({name}) | {shard.files} | {format_size(os.path.getsize(shard.path))} |"
+                f"{raw_size} {tokens} | {shard.first_label} | {shard.last_label} |\n"
+            )
+        return ''.join(parts)
+
+    def _join_shards(self):
+        for shard in self.shards:
+            shard.close()
+        for shard in self.shards:
+            shard.join()
+
+    def close(self):
+        self._join_shards()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def supports_resume(policy: Optional[ShardPolicy] = None, compression: Optional[str] = None) -> bool:
+    """该输出配置是否支持断点续传：只有单文件、未压缩的输出可以在任意偏移处追加"""
+    return not (policy is not None and policy.enabled) and not compression
+
+
+def create_writer(output_path: str, policy: Optional[ShardPolicy] = None,
+                  compression: Optional[str] = None, resume_offset: Optional[int] = None):
+    """按分片策略创建写入器，未启用分片时返回单文件写入器；resume_offset仅用于单文件写入器"""
+    if policy is not None and policy.enabled:
+        return ShardedMarkdownWriter(output_path, policy, compression)
+    return MarkdownWriter(output_path, compression, resume_offset)
@@ -11,10 +11,11 @@
 - 使用customtkinter替代标准tkinter，获得更好的视觉效果
 - 预设主题配置，确保应用启动即呈现统一的视觉风格
 - 通过main函数封装应用启动逻辑，便于测试和维护
+- `python main.py cli ...` 进入无界面命令行模式，不加载任何UI依赖
 """
 
-import customtkinter as ctk
-from ui.app import MaterialApp
+import sys
+import multiprocessing
 
 def main():
     """
@@ -32,6 +33,10 @@ def main():
     - 蓝色主题提供专业的开发环境氛围
     - DPI感知设置必须在任何UI创建之前完成
     """
+    # UI依赖在函数内部导入，命令行模式无需加载
+    import customtkinter as ctk
+    from ui.app import MaterialApp
+
     # 导入DPI相关模块（在函数内部导入避免循环依赖）
     from utils.dpi_helper import set_dpi_awareness, get_dpi_helper
     from config.settings import Settings
@@ -55,6 +60,7 @@ def main():
         logger.warning("Failed to set DPI awareness, continuing with default settings")
 
     # 加载配置以获取DPI设置
+    settings = None
     try:
         settings = Settings()
         dpi_config = settings.get("dpi_scaling", {})
@@ -76,8 +82,8 @@ def main():
     # 设置默认颜色主题为蓝色，营造专业的开发氛围
     ctk.set_default_color_theme("blue")
 
-    # 创建应用主窗口实例
-    app = MaterialApp()
+    # 创建应用主窗口实例（复用已加载的配置，避免重复读取）
+    app = MaterialApp(settings)
 
     # 启动应用主循环，开始处理用户交互
     app.mainloop()
@@ -85,4 +91,10 @@ def main():
 if __name__ == "__main__":
     # 当脚本直接运行时启动应用
     # 使用此模式便于开发调试和打包部署
+    # 大纲模式使用多进程，打包为可执行文件后子进程需要从这里返回
+    multiprocessing.freeze_support()
+    if sys.argv[1:2] == ['cli']:
+        # 命令行模式：python main.py cli <参数>
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[2:]))
     main()
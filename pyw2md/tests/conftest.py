@@ -0,0 +1,6 @@
+"""测试配置：将项目根目录加入导入路径，与main.py的运行方式一致"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
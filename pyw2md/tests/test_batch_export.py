@@ -0,0 +1,146 @@
+"""批量导出测试（core.batch_export、cli）"""
+
+import json
+
+import pytest
+
+import cli
+from core.batch_export import BatchExporter, ExportJob, ScanCache, load_job_file, match_patterns
+
+
+def _write_tree(root):
+    """生成一个包含Python、JavaScript和忽略目录的小型代码树"""
+    for relative, content in {
+        'api/views.py': 'def view():\n    return 1\n',
+        'api/tests/test_views.py': 'def test_view():\n    pass\n',
+        'web/app.js': 'function app() {}\n',
+        'web/node_modules/lib.js': 'function lib() {}\n',
+        'README.md': '# Readme\n',
+    }.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def _write_job_file(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('path, include, exclude, expected', [
+    ('api/views.py', [], [], True),
+    ('api/views.py', ['*.py'], [], True),
+    ('web/app.js', ['*.py'], [], False),
+    ('api/tests/test_views.py', ['*.py'], ['test_*'], False),
+    ('web/node_modules/lib.js', [], ['*/node_modules/*'], False),
+    ('api/views.py', ['api/*'], [], True),
+    ('web/app.js', ['api/*'], [], False),
+])
+def test_match_patterns(path, include, exclude, expected):
+    assert match_patterns(path, include, exclude) is expected
+
+
+def test_load_job_file_with_defaults(tmp_path):
+    job_file = _write_job_file(tmp_path / 'jobs.json', {
+        'defaults': {'template': '简洁模式', 'exclude': ['*/node_modules/*']},
+        'jobs': [
+            {'name': 'api', 'roots': 'src/api', 'output': 'out/api.md'},
+            {'roots': ['src/web'], 'output': 'out/web.md', 'template': '默认', 'max_tokens': '500'},
+        ]
+    })
+    api, web = load_job_file(job_file)
+
+    assert api.roots == [str(tmp_path / 'src' / 'api')]
+    assert api.output == str(tmp_path / 'out' / 'api.md')
+    assert api.template == '简洁模式'
+    assert api.exclude == ['*/node_modules/*']
+    assert web.template == '默认'
+    assert web.max_tokens == 500
+    assert web.display_name == 'web.md'
+
+
+def test_load_job_file_accepts_plain_list(tmp_path):
+    job_file = _write_job_file(tmp_path / 'jobs.json', [{'root': 'src', 'output': 'a.md'}])
+    assert [job.roots for job in load_job_file(job_file)] == [[str(tmp_path / 'src')]]
+
+
+@pytest.mark.parametrize('entry, message', [
+    ({'output': 'a.md'}, 'roots'),
+    ({'roots': ['src']}, 'output'),
+    ({'roots': ['src'], 'output': 'a.md', 'max_tokens': 'many'}, 'many'),
+])
+def test_load_job_file_reports_invalid_job(tmp_path, entry, message):
+    job_file = _write_job_file(tmp_path / 'jobs.json', {'jobs': [{'roots': ['src'], 'output': 'ok.md'}, entry]})
+    with pytest.raises(ValueError, match=r'任务 #2: .*' + message):
+        load_job_file(job_file)
+
+
+def test_scan_cache_reuses_results(tmp_path):
+    _write_tree(tmp_path)
+    cache = ScanCache()
+    first = cache.scan(str(tmp_path))
+    (tmp_path / 'new.py').write_text('x = 1\n', encoding='utf-8')
+
+    assert cache.scan(str(tmp_path)) is first
+    assert first == sorted(first)
+    assert cache.scan(str(tmp_path), recursive=False) != first
+    assert cache.scan(str(tmp_path / 'missing')) == []
+
+
+def test_parallel_export_of_two_jobs(tmp_path):
+    _write_tree(tmp_path)
+    jobs = [
+        ExportJob(roots=[str(tmp_path)], output=str(tmp_path / 'out' / 'py.md'),
+                  include=['*.py'], exclude=['test_*'], name='py'),
+        ExportJob(roots=[str(tmp_path)], output=str(tmp_path / 'out' / 'js.md'),
+                  exclude=['*/node_modules/*', '*.py'], name='js'),
+    ]
+    results = BatchExporter(max_workers=2, parallel_jobs=2).run(jobs)
+
+    assert [r['job'] for r in results] == ['py', 'js']
+    assert all(r['success'] for r in results)
+    assert [r['converted'] for r in results] == [1, 2]
+
+    py = (tmp_path / 'out' / 'py.md').read_text(encoding='utf-8')
+    js = (tmp_path / 'out' / 'js.md').read_text(encoding='utf-8')
+    assert 'def view()' in py and 'test_view' not in py
+    assert 'function app()' in js and 'function lib()' not in js and '# Readme' in js
+
+
+def test_failed_job_does_not_stop_others(tmp_path):
+    _write_tree(tmp_path)
+    jobs = [
+        ExportJob(roots=[str(tmp_path)], output=str(tmp_path / 'bad.md'), template='不存在'),
+        ExportJob(roots=[str(tmp_path)], output=str(tmp_path / 'none.md'), include=['*.go']),
+        ExportJob(roots=[str(tmp_path)], output=str(tmp_path / 'ok.md'), include=['*.md']),
+    ]
+    bad, empty, ok = BatchExporter(max_workers=2).run(jobs)
+
+    assert not bad['success'] and '不存在' in bad['message']
+    assert not empty['success'] and empty['output'] == str(tmp_path / 'none.md')
+    assert ok['success'] and ok['converted'] == 1
+
+
+def test_cli_exit_codes(tmp_path, capsys):
+    _write_tree(tmp_path)
+    output = tmp_path / 'bundle.md'
+
+    assert cli.main([str(tmp_path), '-i', '*.py', '-o', str(output), '-q']) == 0
+    assert 'def view()' in output.read_text(encoding='utf-8')
+
+    job_file = _write_job_file(tmp_path / 'jobs.json', [
+        {'roots': ['.'], 'include': ['*.js'], 'output': 'js.md'},
+        {'roots': ['.'], 'include': ['*.go'], 'output': 'go.md'},
+    ])
+    assert cli.main(['--jobs', job_file, '-q']) == 1
+    assert (tmp_path / 'js.md').exists()
+    assert 'go.md' in capsys.readouterr().err
+
+
+def test_cli_argument_errors(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path)])  # 缺少 -o
+    with pytest.raises(SystemExit):
+        cli.main([])
+    with pytest.raises(SystemExit):
+        cli.main(['--jobs', str(tmp_path / 'missing.json')])
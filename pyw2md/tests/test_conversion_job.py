@@ -0,0 +1,83 @@
+"""断点续传测试（core.conversion_job）"""
+
+import re
+
+from core.conversion_job import Checkpoint, ConversionJob, checkpoint_path, job_signature
+from core.converter import Converter
+from core.file_handler import FileInfo
+
+
+def _write_sources(directory, count=6):
+    files = []
+    for i in range(count):
+        path = directory / f'mod{i}.py'
+        path.write_text(f'def f{i}():\n    return {i}\n' * 20, encoding='utf-8')
+        files.append(FileInfo(str(path)))
+    return files
+
+
+def _converter(base_path):
+    converter = Converter(max_workers=1)
+    converter.chunk_size = 1
+    converter.base_path = str(base_path)
+    return converter
+
+
+def _strip_times(text):
+    """去掉头部和尾部的生成时间，便于比较两次转换的输出"""
+    return re.sub(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', '<time>', text)
+
+
+def test_checkpoint_save_load_round_trip(tmp_path):
+    output = tmp_path / 'out.md'
+    output.write_text('x' * 100, encoding='utf-8')
+    path = checkpoint_path(str(output))
+    checkpoint = Checkpoint('sig', 3, 80, converted=3, duplicates=1, skipped=0,
+                            errors=[{'file': 'a', 'error': 'e'}], seen_digests={'d': 'a.py'})
+    checkpoint.save(path)
+
+    assert Checkpoint.load(path, 'sig', str(output)) == checkpoint
+    assert Checkpoint.load(path, 'other', str(output)) is None
+
+    # 输出文件比断点偏移短（已被替换）时断点无效
+    output.write_text('x' * 10, encoding='utf-8')
+    assert Checkpoint.load(path, 'sig', str(output)) is None
+
+    Checkpoint.remove(path)
+    Checkpoint.remove(path)
+    assert Checkpoint.load(path, 'sig', str(output)) is None
+
+
+def test_signature_changes_with_options(tmp_path):
+    files = _write_sources(tmp_path, 2)
+    assert job_signature(files, {'minify': False}) == job_signature(files, {'minify': False})
+    assert job_signature(files, {'minify': False}) != job_signature(files, {'minify': True})
+
+
+def test_cancelled_job_resumes_to_identical_output(tmp_path):
+    files = _write_sources(tmp_path)
+
+    expected_path = tmp_path / 'expected.md'
+    _converter(tmp_path).convert_files(files, str(expected_path))
+
+    output = tmp_path / 'out.md'
+    job = None
+
+    def cancel_after_two(current, total, name):
+        if current == 2:
+            job.cancel()
+
+    job = ConversionJob(_converter(tmp_path), files, str(output), progress_callback=cancel_after_two)
+    result = job.run()
+    assert result['cancelled']
+    assert job.has_checkpoint()
+
+    resumed = ConversionJob(_converter(tmp_path), files, str(output))
+    result = resumed.run()
+    assert result['success']
+    assert 0 < result['resumed_from'] < len(files)
+    assert result['converted'] == len(files)
+    assert not resumed.has_checkpoint()
+
+    assert (_strip_times(output.read_text(encoding='utf-8'))
+            == _strip_times(expected_path.read_text(encoding='utf-8')))
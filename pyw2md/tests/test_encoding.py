@@ -0,0 +1,75 @@
+"""源码编码识别测试（core.encoding）"""
+
+import codecs
+
+from core.encoding import decode_source, read_source, SNIFF_BYTES
+
+
+def test_bom_takes_precedence_over_declaration():
+    data = codecs.BOM_UTF8 + '# -*- coding: latin-1 -*-\nname = "中文"\n'.encode('utf-8')
+    text, encoding = decode_source(data)
+    assert encoding == 'utf-8-sig'
+    assert text.endswith('name = "中文"\n')
+
+
+def test_utf16_bom_is_text_not_binary(tmp_path):
+    path = tmp_path / 'utf16.txt'
+    path.write_bytes('hello\n'.encode('utf-16'))
+    data = read_source(str(path))
+    assert data is not None
+    assert decode_source(data) == ('hello\n', 'utf-16')
+
+
+def test_declared_encoding_when_not_utf8():
+    data = '# coding: gbk\ns = "中文"\n'.encode('gbk')
+    assert decode_source(data) == ('# coding: gbk\ns = "中文"\n', 'gbk')
+
+
+def test_valid_utf8_wins_over_wrong_declaration():
+    html = '<html><head><meta charset="iso-8859-1"></head><body>中文 café</body></html>'
+    assert decode_source(html.encode('utf-8')) == (html, 'utf-8')
+
+    source = '# -*- coding: cp1252 -*-\nname = "café"\n'
+    assert decode_source(source.encode('utf-8')) == (source, 'utf-8')
+
+
+def test_declared_single_byte_encoding():
+    data = '<meta charset="windows-1252">\n<p>café “quoted”</p>\n'.encode('cp1252')
+    text, encoding = decode_source(data)
+    assert encoding == 'cp1252'
+    assert 'café “quoted”' in text
+
+
+def test_declaration_after_second_line_is_ignored():
+    data = '\n\n# coding: latin-1\n'.encode('ascii') + 'é'.encode('utf-8')
+    assert decode_source(data)[1] == 'utf-8'
+
+
+def test_xml_declaration():
+    data = '<?xml version="1.0" encoding="GB2312"?>\n<a>中</a>'.encode('gb2312')
+    text, encoding = decode_source(data)
+    assert encoding == 'gb2312'
+    assert '<a>中</a>' in text
+
+
+def test_utf8_then_gb18030_then_latin1():
+    assert decode_source('中文'.encode('utf-8')) == ('中文', 'utf-8')
+    assert decode_source('中文'.encode('gbk')) == ('中文', 'gb18030')
+    assert decode_source(b'\x80\xff')[1] == 'latin-1'
+
+
+def test_newlines_are_normalized():
+    assert decode_source(b'a\r\nb\rc\n')[0] == 'a\nb\nc\n'
+
+
+def test_binary_file_reads_only_head(tmp_path):
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(b'\x00' * (SNIFF_BYTES * 2))
+    assert read_source(str(path)) is None
+
+
+def test_large_text_file_is_read_completely(tmp_path):
+    path = tmp_path / 'big.txt'
+    data = b'x' * (SNIFF_BYTES * 3 + 1)
+    path.write_bytes(data)
+    assert read_source(str(path)) == data
@@ -0,0 +1,69 @@
+"""源码精简测试（core.minifier）"""
+
+import ast
+
+import pytest
+
+from core.minifier import minify_source
+
+
+def test_python_strips_comments_docstrings_and_blank_lines():
+    source = (
+        'def f():\n'
+        '    """Doc."""\n'
+        '\n'
+        '    # comment\n'
+        '    return "# not a comment"  # trailing\n'
+        '\n\n'
+        'class A:\n'
+        '    """Only a docstring."""\n'
+    )
+    result = minify_source(source, 'Python')
+    assert result == 'def f():\n    return "# not a comment"\nclass A:\n    ...\n'
+    ast.parse(result)
+
+
+def test_python_syntax_error_only_collapses_blank_lines():
+    assert minify_source('def f(:\n\n\n  x\n', 'Python') == 'def f(:\n  x\n'
+
+
+def test_c_family_keeps_string_literals():
+    source = '// c\nconst s = "// keep"; /* block\n more */\nlet t = `a /* b */`;\n\n\nfoo();\n'
+    assert minify_source(source, 'JavaScript') == 'const s = "// keep";\nlet t = `a /* b */`;\nfoo();\n'
+
+
+def test_rust_lifetimes_are_not_strings():
+    source = "fn f<'a>(x: &'a str) -> char { // c\n    '/' /* x */\n}\n"
+    assert minify_source(source, 'Rust') == "fn f<'a>(x: &'a str) -> char {\n    '/'\n}\n"
+
+
+def test_hash_comments_need_leading_whitespace():
+    source = '# comment\necho "#x" $#  # tail\nurl=a#b\n'
+    assert minify_source(source, 'Shell') == 'echo "#x" $#\nurl=a#b\n'
+
+
+@pytest.mark.parametrize('language, source, expected', [
+    ('SQL', "SELECT '--x' -- c\n/* b */ FROM t;\n", "SELECT '--x'\n FROM t;\n"),
+    ('Lua', "print('--x') -- c\n--[[ block\n]] x = 1\n", "print('--x')\n x = 1\n"),
+    ('HTML', '<!-- c -->\n<p>text</p>\n', '<p>text</p>\n'),
+    ('CSS', 'a { color: red; /* c */ content: "/* k */"; }\n', 'a { color: red;  content: "/* k */"; }\n'),
+])
+def test_language_comment_styles(language, source, expected):
+    assert minify_source(source, language) == expected
+
+
+@pytest.mark.parametrize('language', ['Markdown', 'Text', 'JSON'])
+def test_unsupported_languages_are_unchanged(language):
+    source = '# Title\n\n\n// text\n'
+    assert minify_source(source, language) == source
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('const re = /https?:\\/\\//; // c\n', 'const re = /https?:\\/\\//;\n'),
+    ('if (/[/]x/.test(s)) return /a\\/b/g; // c\n', 'if (/[/]x/.test(s)) return /a\\/b/g;\n'),
+    ('const r = s.replace(/\\/\\*/g, "") /* b */ + 1\n', 'const r = s.replace(/\\/\\*/g, "")  + 1\n'),
+    ('x = a / b / c; // c\n', 'x = a / b / c;\n'),
+])
+def test_javascript_regex_literals(source, expected):
+    assert minify_source(source, 'JavaScript') == expected
+    assert minify_source(source, 'TypeScript') == expected
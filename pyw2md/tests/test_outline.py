@@ -0,0 +1,72 @@
+"""大纲提取测试（core.outline）"""
+
+from core.outline import extract_outline
+
+
+def test_python_signatures_and_docstrings():
+    source = (
+        '"""Module doc.\n\nMore."""\n'
+        '@dataclass\n'
+        'class Point(Base, metaclass=Meta):\n'
+        '    """A point."""\n'
+        '    x: int\n'
+        '    def norm(self, *, p: int = 2) -> float:\n'
+        '        return 0.0\n'
+        'async def fetch(url):\n'
+        '    pass\n'
+    )
+    assert extract_outline(source, 'Python') == (
+        '"""Module doc."""\n'
+        '@dataclass\n'
+        'class Point(Base, metaclass=Meta):\n'
+        '    """A point."""\n'
+        '    x: int\n'
+        '    def norm(self, *, p: int=2) -> float:\n'
+        '        ...\n'
+        'async def fetch(url):\n'
+        '    ...\n'
+    )
+
+
+def test_python_definitions_in_compound_statements():
+    source = (
+        'if TYPE_CHECKING:\n'
+        '    from x import Y\n'
+        '    def typed(a: "Y") -> None: ...\n'
+        'try:\n'
+        '    import ujson as json\n'
+        'except ImportError:\n'
+        '    def loads(s):\n'
+        '        return s\n'
+        'if sys.platform == "win32":\n'
+        '    x = 1\n'
+        'else:\n'
+        '    class Path:\n'
+        '        with lock:\n'
+        '            def join(self): pass\n'
+        'for i in range(3):\n'
+        '    print(i)\n'
+    )
+    assert extract_outline(source, 'Python') == (
+        'if TYPE_CHECKING:\n'
+        "    def typed(a: 'Y') -> None:\n"
+        '        ...\n'
+        'try:\n'
+        '    ...\n'
+        'except ImportError:\n'
+        '    def loads(s):\n'
+        '        ...\n'
+        "if sys.platform == 'win32':\n"
+        '    ...\n'
+        'else:\n'
+        '    class Path:\n'
+        '        with lock:\n'
+        '            def join(self):\n'
+        '                ...\n'
+    )
+
+
+def test_declaration_rules_and_fallback():
+    source = '// Adds two numbers.\nfunc Add(a, b int) int {\n\treturn a + b\n}\n'
+    assert extract_outline(source, 'Go') == '// Adds two numbers.\nfunc Add(a, b int) int\n'
+    assert extract_outline('{"a": 1}\n', 'JSON') == '（大纲模式：共 2 行，无可提取的声明）\n'
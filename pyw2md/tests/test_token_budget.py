@@ -0,0 +1,92 @@
+"""Token预算测试（core.token_budget）"""
+
+import pytest
+
+from core.file_handler import FileInfo
+from core.token_budget import (
+    MIN_TRUNCATED_TOKENS, STATUS_FULL, STATUS_SKIPPED, STATUS_TRUNCATED, TRUNCATION_MARKER,
+    TokenBudget, TokenCache, estimate_tokens, plan_budget, truncate_to_tokens
+)
+
+
+def _files(*names):
+    return [FileInfo(f'/src/{name}') for name in names]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('abcdefghij') == 2  # 单词按6个字母切分
+    assert estimate_tokens('12345') == 2  # 数字按3位切分
+    assert estimate_tokens('中文') == 2
+    assert estimate_tokens('a = 1\n') == 4
+
+
+def test_truncate_keeps_text_within_limit():
+    text = 'x\n' * 10
+    assert truncate_to_tokens(text, 100) is text
+
+
+def test_truncate_cuts_at_line_end():
+    text = ''.join(f'line{i}\n' for i in range(100))
+    limit = 50
+    result = truncate_to_tokens(text, limit)
+    assert result.endswith(TRUNCATION_MARKER)
+    assert estimate_tokens(result) <= limit
+    kept = result[:-len(TRUNCATION_MARKER)]
+    assert text.startswith(kept + '\n')
+
+
+def test_truncate_with_no_budget():
+    assert truncate_to_tokens('abc', 0) == TRUNCATION_MARKER
+
+
+def test_plan_original_order():
+    files = _files('a', 'b', 'c')
+    budget = TokenBudget(250)
+    plan = plan_budget(files, [100, 200, 50], [10, 10, 10], budget)
+
+    assert [e.status for e in plan.entries] == [STATUS_FULL, STATUS_TRUNCATED, STATUS_SKIPPED]
+    truncated = plan.entries[1]
+    assert truncated.allotted == 140
+    assert truncated.content_limit == 130
+    assert plan.used_tokens == 250
+    assert [e.file_info for e in plan.selected] == files[:2]
+
+
+def test_plan_smallest_first_keeps_output_order():
+    files = _files('a', 'b', 'c')
+    plan = plan_budget(files, [100, 200, 50], [10, 10, 10], TokenBudget(200, 'smallest_first'))
+
+    assert [e.status for e in plan.entries] == [STATUS_FULL, STATUS_SKIPPED, STATUS_FULL]
+    assert [e.file_info for e in plan.selected] == [files[0], files[2]]
+
+
+def test_plan_skips_when_remaining_is_too_small():
+    files = _files('a', 'b')
+    budget = TokenBudget(100 + MIN_TRUNCATED_TOKENS - 1)
+    plan = plan_budget(files, [100, 500], [0, 0], budget)
+    assert plan.entries[1].status == STATUS_SKIPPED
+
+    plan = plan_budget(files, [100, 500], [0, 0], TokenBudget(100, truncate=False))
+    assert plan.summary()['skipped'] == 1
+
+
+def test_budget_validation():
+    with pytest.raises(ValueError):
+        TokenBudget(0)
+    with pytest.raises(ValueError):
+        TokenBudget(10, 'largest_first')
+
+
+def test_token_cache_applies_transform(tmp_path):
+    path = tmp_path / 'mod.py'
+    path.write_text('# comment\n' * 50 + 'x = 1\n', encoding='utf-8')
+    info = FileInfo(str(path))
+    cache = TokenCache()
+
+    raw = cache.get_tokens(info)
+    minified = cache.get_tokens(info, 'minify')
+    assert minified == estimate_tokens('x = 1\n')
+    assert raw > minified
+    # 不同模式分别缓存
+    assert cache.get_tokens(info) == raw
@@ -5,10 +5,13 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
+import time
 import logging
+import threading
 from core.constants import (
     MSG_FILE_MODIFIED, MSG_FILE_DELETED, MSG_REFRESH_COMPLETE,
-    MSG_NO_CHANGES, MSG_REFRESH_FAILED, UI_UPDATE_DEBOUNCE_MS
+    MSG_NO_CHANGES, MSG_REFRESH_FAILED, UI_UPDATE_DEBOUNCE_MS,
+    STARTUP_DEFER_MS, MSG_SESSION_FILES_REMOVED
 )
 
 logger = logging.getLogger(__name__)
@@ -33,17 +36,26 @@ except ImportError:
 
 from config.theme import MD
 from config.settings import Settings
-from core.file_handler import FileHandler
+from config.session_store import SessionStore
+from core.file_handler import FileHandler, FileInfo, stat_paths, validate_snapshot
 from core.converter import Converter
-from core.file_watcher import FileWatcher
+from core.conversion_job import ConversionJob
+from core.progress import ProgressAggregator
+from core.token_budget import TokenBudget
+from core.writers import ShardPolicy
+from core.tracing import TRACER
 from ui.components.file_list_panel import FileListPanel
 from ui.components.control_panel import ControlPanel
 from ui.components.status_bar import StatusBar
-from ui.components.dialogs import TemplatePreviewDialog, ConversionPreviewDialog
+# 说明：core.file_watcher（watchdog）和对话框模块在首次绘制后延迟导入
 
 # UI更新防抖时间常量（毫秒）
 UI_UPDATE_DEBOUNCE = UI_UPDATE_DEBOUNCE_MS
 
+# 关闭窗口时等待转换取消（写入断点）的轮询间隔（毫秒）和最长时间（秒）
+CLOSE_POLL_MS = 50
+CLOSE_CANCEL_TIMEOUT = 5.0
+
 
 # ============ 优雅降级基类 ============
 class DragDropMixin:
@@ -119,20 +131,19 @@ class MaterialApp(AppBase):
     - 异步文件处理避免界面卡顿
     - 文件变化批量处理和通知合并
     - 延迟加载和按需初始化策略
+    - 先显示窗口，再在后台恢复文件列表和启动文件监控
     """
 
-    def __init__(self):
+    def __init__(self, settings: Settings = None):
         """
         应用初始化
 
         初始化流程：
         1. 调用父类构造函数建立基础框架
         2. 初始化核心组件（设置、文件处理器、转换器）
-        3. 配置文件监控系统
-        4. 设置UI组件和布局
-        5. 加载保存的应用状态
-        6. 启动后台服务（文件监控）
-        7. 绑定系统事件处理函数
+        3. 设置UI组件和布局
+        4. 绑定系统事件处理函数
+        5. 首次绘制后延迟执行：导入文件监控模块、后台批量恢复文件列表、启动文件监控
 
         设计考量：
         - 按照依赖关系顺序初始化组件
@@ -142,8 +153,11 @@ class MaterialApp(AppBase):
         """
         super().__init__()
 
-        # 初始化配置管理器，负责应用设置的读写和持久化
-        self.settings = Settings()
+        # 初始化配置管理器，负责应用设置的读写和持久化（可由入口函数传入，避免重复加载）
+        self.settings = settings or Settings()
+
+        # 会话索引，保存完整文件列表及stat快照
+        self.session_store = SessionStore.for_settings(self.settings)
 
         # 初始化文件处理器，管理文件列表和元数据
         self.file_handler = FileHandler()
@@ -151,10 +165,20 @@ class MaterialApp(AppBase):
         # 初始化转换器，负责代码到Markdown的转换逻辑
         self.converter = Converter()
 
-        # 初始化文件监控器，实时跟踪文件系统变化
+        # 当前转换任务（支持暂停、取消和断点续传）
+        self._conversion_job = None
+        self._closing = False  # 开始关闭后，转换线程的回调不再投递到Tk事件队列
+
+        # 热点路径追踪（默认关闭，关闭时埋点开销接近零）
+        TRACER.enabled = self.settings.get('enable_tracing', False)
+
+        # 文件监控器在首次绘制后创建（导入watchdog较慢），创建前的监控请求暂存在队列中
         # 使用回调模式处理文件变化事件，FileWatcher内部使用统一状态管理
-        self.file_watcher = FileWatcher(self._on_file_changed)
+        self.file_watcher = None
         self.watch_enabled = self.settings.get('auto_watch_files', True)
+        self._pending_watch_paths = []
+        self._watch_lock = threading.Lock()
+        self._state_restored = False  # 后台恢复完成前不覆盖会话索引
 
         # 窗口调整防抖机制，避免频繁的UI重绘
         self._resize_after_id = None  # 存储防抖定时器ID
@@ -166,15 +190,13 @@ class MaterialApp(AppBase):
         self._setup_window()      # 配置窗口属性
         self._build_ui()          # 构建用户界面
         self._setup_drag_drop()   # 配置拖放功能
-        self._load_saved_state()  # 加载保存的状态
-
-        # 启动文件监控系统（如果启用）
-        if self.watch_enabled:
-            self.file_watcher.start()
 
         # 绑定系统事件处理
         self.protocol("WM_DELETE_WINDOW", self._on_closing)  # 窗口关闭事件
         self.bind('<Configure>', self._on_window_configure)  # 窗口调整事件
+
+        # 窗口显示后再执行较重的启动工作（状态恢复、文件监控）
+        self.after(STARTUP_DEFER_MS, self._deferred_startup)
     
     def _setup_window(self):
         """
@@ -355,8 +377,6 @@ class MaterialApp(AppBase):
         - 使用daemon线程确保应用退出时能够正确清理
         - 避免共享状态竞争，使用局部变量存储处理结果
         """
-        import threading
-
         def process():
             # 统计处理结果
             added_files = 0    # 添加的文件数量
@@ -369,16 +389,14 @@ class MaterialApp(AppBase):
                     if self.file_handler.add_file(path):
                         added_files += 1
                         # 如果启用了文件监控，添加监控
-                        if self.watch_enabled:
-                            self.file_watcher.add_file(path)
+                        self._watch_files([path])
                 elif os.path.isdir(path):
                     # 处理文件夹，递归添加所有支持的文件
                     count = self.file_handler.add_folder(path)
                     added_folders += count
                     # 为文件夹中的所有文件添加监控
-                    if self.watch_enabled:
-                        for file_info in self.file_handler.files[-count:]:
-                            self.file_watcher.add_file(file_info.path)
+                    if count:
+                        self._watch_files([f.path for f in self.file_handler.files[-count:]])
 
             # UI更新必须在主线程执行
             self.after(0, lambda: self._on_drop_complete(added_files, added_folders))
@@ -471,7 +489,8 @@ class MaterialApp(AppBase):
                 if change.change_type == 'deleted':
                     # 从文件处理器中移除已删除的文件
                     self.file_handler.remove_file(change.path)
-                    self.file_watcher.remove_file(change.path)
+                    if self.file_watcher is not None:
+                        self.file_watcher.remove_file(change.path)
                     deleted_count += 1
                 elif change.change_type == 'modified':
                     # 更新已修改文件的缓存
@@ -501,7 +520,7 @@ class MaterialApp(AppBase):
         self.grid_rowconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=0)  # 为StatusBar预留空间
         
-        self.file_panel = FileListPanel(self, self.file_handler)
+        self.file_panel = FileListPanel(self, self.file_handler, self.settings)
         self.file_panel.grid(row=0, column=0, sticky='nsew', 
                            padx=(MD.PAD_M, MD.PAD_S), 
                            pady=MD.PAD_M)
@@ -526,11 +545,26 @@ class MaterialApp(AppBase):
             self.after(100, self._setup_drag_drop)
     
     def _on_files_added_to_list(self, file_paths: list):
-        if not self.watch_enabled:
+        self._watch_files(file_paths)
+
+    def _watch_files(self, file_paths: list):
+        """
+        为文件添加监控
+
+        - 监控器尚未创建时暂存到队列，创建完成后统一注册
+        - 可在后台线程调用，FileWatcher不涉及Tk对象
+        """
+        if not self.watch_enabled or not file_paths:
             return
-        
+
+        with self._watch_lock:
+            if self.file_watcher is None:
+                self._pending_watch_paths.extend(file_paths)
+                return
+            watcher = self.file_watcher
+
         for file_path in file_paths:
-            self.file_watcher.add_file(file_path)
+            watcher.add_file(file_path)
     
     def _on_window_configure(self, event):
         if event.widget != self:
@@ -568,6 +602,9 @@ class MaterialApp(AppBase):
         )
     
     def _on_preview(self, preview_type: str, data):
+        # 对话框模块按需导入，不影响启动速度
+        from ui.components.dialogs import TemplatePreviewDialog, ConversionPreviewDialog
+
         if preview_type == 'template':
             TemplatePreviewDialog(self, data)
         
@@ -586,6 +623,18 @@ class MaterialApp(AppBase):
         
         if action == 'start':
             self._perform_conversion(data)
+            return
+
+        job = self._conversion_job
+        if job is None or job.done:
+            return
+        if action == 'pause':
+            job.pause()
+            self._show_toast("转换已暂停", 'info')
+        elif action == 'resume':
+            job.resume()
+        elif action == 'cancel':
+            job.cancel()
     
     def _perform_conversion(self, files):
         output_file = filedialog.asksaveasfilename(
@@ -596,28 +645,133 @@ class MaterialApp(AppBase):
         
         if not output_file:
             return
+
+        if self._conversion_job is not None and not self._conversion_job.done:
+            self._show_toast("警告: 已有转换正在进行", 'warning')
+            return
+
+        # Token预算（配置中max_tokens大于0时启用），配置无效时提示用户而不开始转换
+        try:
+            budget = self._budget_from_settings()
+        except ValueError as e:
+            self._show_config_error("Token预算", e)
+            return
+
+        # 分片输出（配置中任一上限大于0时启用，输出文件作为分片索引）
+        try:
+            shard_policy = self._shard_policy_from_settings()
+        except ValueError as e:
+            self._show_config_error("分片", e)
+            return
         
         self.control_panel.show_progress()
         
         template = self.control_panel.get_template()
         self.converter.set_markdown_template(template)
-        
-        # 异步转换
-        import threading
-        
-        def convert_thread():
-            def progress_callback(current, total, filename):
-                self.after(0, lambda: self.control_panel.update_progress(current, total, filename))
-            
-            result = self.converter.convert_files(files, output_file, progress_callback)
-            self.after(0, lambda: self._on_conversion_complete(result, output_file))
-        
-        threading.Thread(target=convert_thread, daemon=True).start()
+        self.converter.dedupe = self.settings.get('dedupe_content', True)
+        self.converter.minify = self.settings.get('minify_content', False)
+        self.converter.outline = self.settings.get('outline_mode', False)
+
+        # 压缩输出（gzip/zstd，输出文件名追加压缩后缀）
+        self.converter.compression = self.settings.get('output_compression') or None
+        self.converter.shard_policy = shard_policy
+
+        # 每次转换单独统计（包含此前扫描和监控的区间会混淆本次耗时）
+        if TRACER.enabled:
+            TRACER.reset()
+
+        # 进度按20Hz限频发布，避免每个文件都向Tk事件队列投递回调
+        progress_callback = ProgressAggregator(
+            lambda snapshot: self._post_to_ui(lambda: self.control_panel.update_progress(snapshot)),
+            sizes=[f.size for f in files]
+        )
+
+        def on_complete(result):
+            # 启用压缩时实际输出路径带有压缩后缀
+            saved_path = result.get('outputs', [output_file])[0]
+            if TRACER.enabled:
+                self._export_trace(output_file)
+            self._post_to_ui(lambda: self._on_conversion_complete(result, saved_path))
+
+        # 异步转换；输出文件存在未完成的断点时询问是否继续
+        job = ConversionJob(self.converter, files, output_file, budget,
+                            progress_callback=progress_callback, on_complete=on_complete)
+        if job.has_checkpoint():
+            job.resume_checkpoint = messagebox.askyesno(
+                "继续转换",
+                "该输出文件有未完成的转换，是否从中断处继续？\n\n选择“否”将重新开始转换。"
+            )
+        self._conversion_job = job
+        job.start()
     
+    def _budget_from_settings(self):
+        """
+        按配置创建Token预算
+
+        - max_tokens为0时不启用预算，返回None
+        - 配置不是整数、为负数或策略未知时抛出ValueError
+        """
+        config = self.settings.get('token_budget', {})
+        if not isinstance(config, dict):
+            raise ValueError("token_budget 必须为对象")
+        try:
+            max_tokens = int(config.get('max_tokens', 0))
+        except (TypeError, ValueError):
+            raise ValueError(f"max_tokens 必须为整数: {config.get('max_tokens')!r}") from None
+        if max_tokens == 0:
+            return None
+        return TokenBudget(max_tokens, config.get('strategy', 'original'))
+
+    def _shard_policy_from_settings(self) -> ShardPolicy:
+        """按配置创建分片策略，上限不是整数或为负数时抛出ValueError"""
+        config = self.settings.get('sharding', {})
+        if not isinstance(config, dict):
+            raise ValueError("sharding 必须为对象")
+        limits = {}
+        for key in ('max_bytes', 'max_tokens', 'max_files'):
+            try:
+                limits[key] = int(config.get(key, 0))
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} 必须为整数: {config.get(key)!r}") from None
+        return ShardPolicy(**limits)
+
+    def _show_config_error(self, section: str, error: Exception):
+        """配置无效时在状态栏和对话框中提示，指出需要修改的配置文件"""
+        self._show_toast(f"错误: {section}配置无效 - {error}", 'error')
+        messagebox.showerror(
+            "配置错误",
+            f"{section}配置无效: {error}\n\n请检查配置文件: {self.settings.config_file}"
+        )
+
+    def _export_trace(self, output_file: str):
+        """导出本次转换的追踪文件，并在状态栏显示耗时最多的区间"""
+        try:
+            TRACER.export_chrome_trace(output_file + '.trace.json')
+        except OSError as e:
+            logger.warning(f"导出追踪文件失败: {e}")
+        summary = TRACER.format_summary()
+        self._post_to_ui(lambda: self.status_bar.update_trace_summary(summary))
+
+    def _post_to_ui(self, callback):
+        """
+        从转换线程向主线程投递回调
+
+        窗口开始关闭后直接丢弃，避免在销毁过程中跨线程调用Tk
+        """
+        if self._closing:
+            return
+        try:
+            self.after(0, callback)
+        except RuntimeError:
+            # 主循环已退出（如等待超时后窗口已销毁）
+            pass
+
     def _on_conversion_complete(self, result, output_file):
         self.after(1000, self.control_panel.hide_progress)
         
-        if result['success']:
+        if result.get('cancelled'):
+            self._show_toast(result['message'], 'warning')
+        elif result['success']:
             self._show_toast(f"成功: {result['message']}", 'success')
             messagebox.showinfo(
                 "转换完成",
@@ -630,16 +784,85 @@ class MaterialApp(AppBase):
     def _show_toast(self, message: str, type: str = 'info'):
         self.status_bar.show_message(message, type)
     
-    def _load_saved_state(self):
-        recent_files = self.settings.get('recent_files', [])
-        for file_path in recent_files:
-            if os.path.exists(file_path):
-                self.file_handler.add_file(file_path)
-                if self.watch_enabled:
-                    self.file_watcher.add_file(file_path)
+    def _deferred_startup(self):
+        """
+        首次绘制后的启动流程
 
+        后台线程：
+        1. 读取会话索引快照（不访问源文件，数万文件也能立即恢复）
+        2. 首次使用时批量校验快照（每个文件一次stat），找出失效和变化的文件
+        3. 导入文件监控模块（watchdog）并为有效文件注册监控
+        主线程：
+        4. 快照读取后立即加入文件列表并刷新界面，校验完成后再应用校验结果
+
+        兼容旧版配置：会话索引为空时从recent_files列表迁移
+        """
+        legacy_files = self.settings.get('recent_files', [])
+
+        def restore():
+            snapshot = self.session_store.load()
+            needs_validation = True
+            if not snapshot and legacy_files:
+                snapshot = []
+                for path, st in stat_paths(legacy_files):
+                    file_info = FileInfo(path=path)
+                    file_info.apply_stat(st)
+                    snapshot.append(file_info)
+                needs_validation = False
+
+            # 交给主线程前先取出快照数据，避免与主线程修改缓存竞争
+            entries = [(f.path, f._cached_size, f._cached_mtime) for f in snapshot]
+            self.after(0, lambda: self._on_saved_state_loaded(snapshot))
+
+            missing = []
+            if needs_validation:
+                missing, changed = validate_snapshot(entries)
+                if missing or changed:
+                    self.after(0, lambda: self._on_snapshot_validated(missing, changed))
+
+            missing = set(missing)
+            self._start_file_watcher([path for path, _, _ in entries if path not in missing])
+
+        threading.Thread(target=restore, daemon=True).start()
+
+    def _on_saved_state_loaded(self, snapshot):
+        """会话快照恢复回调（主线程）"""
+        self.file_handler.add_file_infos(snapshot)
+        self._state_restored = True
         self.file_panel.refresh()
         self._update_status_bar_stats()
+
+    def _on_snapshot_validated(self, missing, changed):
+        """快照校验完成回调（主线程）"""
+        removed = self.file_handler.apply_validation(missing, changed)
+        self.file_panel.refresh()
+        self._update_status_bar_stats()
+        if removed:
+            self._show_toast(MSG_SESSION_FILES_REMOVED.format(count=removed), 'warning')
+
+    def _start_file_watcher(self, restored_paths: list):
+        """创建文件监控器并注册已恢复及暂存的文件（后台线程）"""
+        if not self.watch_enabled:
+            return
+
+        try:
+            from core.file_watcher import FileWatcher
+        except ImportError as e:
+            logger.warning(f"文件监控不可用: {e}")
+            self.watch_enabled = False
+            return
+
+        watcher = FileWatcher(self._on_file_changed)
+        for file_path in restored_paths:
+            watcher.add_file(file_path)
+        watcher.start()
+
+        # 发布监控器，并补注册等待期间新增的文件
+        with self._watch_lock:
+            self.file_watcher = watcher
+            pending, self._pending_watch_paths = self._pending_watch_paths, []
+        for file_path in pending:
+            watcher.add_file(file_path)
     
     def _save_state(self):
         geometry = self.geometry().split('+')[0]
@@ -652,16 +875,42 @@ class MaterialApp(AppBase):
             'min_height': 600
         })
         
-        max_recent = self.settings.get('max_recent_files', 50)
-        recent_files = [f.path for f in self.file_handler.files[:max_recent]]
-        self.settings.set('recent_files', recent_files)
+        # 完整文件列表写入会话索引，成功后移除旧版recent_files配置
+        if self._state_restored and self.session_store.save(self.file_handler.files):
+            self.settings.remove('recent_files')
         
         self.settings.set('template', self.control_panel.get_template())
         
-        self.settings.save()
+        # 退出前同步写入，确保未落盘的修改不会丢失
+        self.settings.flush()
     
     def _on_closing(self):
-        if self.watch_enabled:
+        """
+        关闭窗口
+
+        进行中的转换先取消，再由主循环轮询等待断点写入完成，等待期间界面保持响应；
+        超过CLOSE_CANCEL_TIMEOUT仍未结束时不再等待（断点按间隔写入，最多丢失最近一段进度）
+        """
+        if self._closing:
+            return
+        self._closing = True
+
+        job = self._conversion_job
+        if job is not None and not job.done:
+            job.cancel()
+            self.status_bar.show_message("正在取消转换并保存断点...", 'info')
+            self._close_when_job_done(job, time.monotonic() + CLOSE_CANCEL_TIMEOUT)
+            return
+        self._finish_closing()
+
+    def _close_when_job_done(self, job, deadline: float):
+        if job.done or time.monotonic() >= deadline:
+            self._finish_closing()
+        else:
+            self.after(CLOSE_POLL_MS, lambda: self._close_when_job_done(job, deadline))
+
+    def _finish_closing(self):
+        if self.file_watcher is not None:
             self.file_watcher.stop()
         
         # 清理StatusBar定时器
@@ -8,6 +8,7 @@ from config.theme import MD
 from ui.widgets.material_card import Card, Btn
 from core.converter import get_available_template_names, Converter
 from core.file_handler import FileHandler, format_size
+from core.progress import ProgressSnapshot, format_duration
 
 class ControlPanel(Card):
     """控制面板"""
@@ -153,6 +154,28 @@ class ControlPanel(Card):
             text_color=MD.TEXT_SECONDARY
         )
         self.progress_label.pack()
+
+        # 暂停/继续和取消按钮，通过转换回调通知应用
+        job_actions = ctk.CTkFrame(progress_content, fg_color='transparent')
+        job_actions.pack(fill='x', pady=(MD.PAD_S, 0))
+
+        self.pause_button = Btn(
+            job_actions,
+            text="暂停",
+            command=self._toggle_pause,
+            kind='normal',
+            height=32
+        )
+        self.pause_button.pack(side='left', fill='x', expand=True, padx=(0, MD.PAD_S))
+
+        Btn(
+            job_actions,
+            text="取消",
+            command=self._cancel_conversion,
+            kind='danger',
+            height=32
+        ).pack(side='left', fill='x', expand=True)
+        self._paused = False
         
         # 初始隐藏
         self.hide_progress()
@@ -191,27 +214,46 @@ class ControlPanel(Card):
         if self.on_convert_callback:
             self.on_convert_callback('start', marked_files)
     
+    def _toggle_pause(self):
+        """暂停或继续转换"""
+        self._paused = not self._paused
+        self.pause_button.configure(text="继续" if self._paused else "暂停")
+        if self.on_convert_callback:
+            self.on_convert_callback('pause' if self._paused else 'resume', None)
+
+    def _cancel_conversion(self):
+        """取消转换"""
+        if self.on_convert_callback:
+            self.on_convert_callback('cancel', None)
+
     def show_progress(self):
         """显示进度条"""
         self.progress_container.pack(side='bottom', fill='x', padx=MD.PAD_M, pady=(0, MD.PAD_M))
         self.progress_bar.set(0)
+        self._paused = False
+        self.pause_button.configure(text="暂停")
     
     def hide_progress(self):
         """隐藏进度条"""
         self.progress_container.pack_forget()
     
-    def update_progress(self, current: int, total: int, filename: str = ""):
-        """更新进度"""
-        progress = current / total if total > 0 else 0
-        self.progress_bar.set(progress)
+    def update_progress(self, snapshot: ProgressSnapshot):
+        """更新进度（由ProgressAggregator限频调用）"""
+        self.progress_bar.set(snapshot.fraction)
         
         # 截断过长的文件名
+        filename = snapshot.filename
         if len(filename) > 30:
             filename = "..." + filename[-27:]
-        
-        self.progress_label.configure(
-            text=f"正在处理: {filename} ({current}/{total})"
-        )
+
+        text = f"正在处理: {filename} ({snapshot.current}/{snapshot.total})"
+        if snapshot.files_per_sec > 0:
+            text += (
+                f"\n{snapshot.files_per_sec:.0f} 文件/秒  •  "
+                f"{format_size(int(snapshot.bytes_per_sec))}/秒  •  "
+                f"剩余 {format_duration(snapshot.eta)}"
+            )
+        self.progress_label.configure(text=text)
     
     def set_preview_callback(self, callback):
         """设置预览回调"""
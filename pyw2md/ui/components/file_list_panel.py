@@ -13,7 +13,7 @@ from config.settings import Settings
 
 class FileListPanel(Card):
     
-    def __init__(self, master, file_handler: FileHandler, **kwargs):
+    def __init__(self, master, file_handler: FileHandler, settings: Settings = None, **kwargs):
         super().__init__(master, **kwargs)
         
         self.file_handler = file_handler
@@ -23,8 +23,8 @@ class FileListPanel(Card):
         self._loading = False
         self._loading_animation_id = None
 
-        # 初始化配置管理器
-        self.settings = Settings()
+        # 配置管理器，优先与主窗口共享同一实例，避免多个实例互相覆盖配置文件
+        self.settings = settings or Settings()
 
         self._build_ui()
     
@@ -670,7 +670,11 @@ class FileListPanel(Card):
                 'size': self.file_tree.column('size', 'width')
             }
 
-            # 保存到配置
+            # 列宽未变化时不触发保存
+            if column_widths == self.settings.get('column_widths'):
+                return
+
+            # 保存到配置（后台合并写入，不阻塞界面）
             self.settings.set('column_widths', column_widths)
             if self.settings.get('auto_save_config', True):
                 self.settings.save()
@@ -20,6 +20,8 @@ class StatusBar(ctk.CTkFrame):
             'size': 0,
             'languages': 0
         }
+        # 最近一次转换的追踪摘要（启用追踪时显示）
+        self._trace_summary = ''
 
         self._label = ctk.CTkLabel(
             self,
@@ -67,6 +69,8 @@ class StatusBar(ctk.CTkFrame):
             f"{format_size(stats['size'])}  •  "
             f"{stats['languages']} 语言"
         )
+        if self._trace_summary:
+            text += f"  •  {self._trace_summary}"
 
         self._label.configure(
             text=text,
@@ -84,6 +88,12 @@ class StatusBar(ctk.CTkFrame):
         if self._timer_id is None:
             self.show_default()
 
+    def update_trace_summary(self, summary: str):
+        self._trace_summary = summary
+
+        if self._timer_id is None:
+            self.show_default()
+
     def cleanup(self):
         if self._timer_id is not None:
             self.after_cancel(self._timer_id)